@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Alert Engine - Schwellwert-basierte, inkrementelle Alert-Auswertung.
+Metriken liegen spaltenweise pro Gerät vor; ausgewertet werden nur Zeilen,
+deren Werte sich geändert haben. Ausgegeben werden nur Zustandswechsel
+(raised / ongoing / cleared) mit echten Zeitstempeln. Zeilen, die mehrere
+Zyklen keine Werte mehr bekommen (Gerät verschwunden), werden aufgehoben.
+"""
+
+import math
+import logging
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Schwere der Level (für Eskalation/Deeskalation)
+LEVEL_ORDER = {"info": 0, "warning": 1, "critical": 2}
+
+DEFAULT_THRESHOLDS = {
+    "bandwidth_warning_gbps": 8.0,
+    "bandwidth_critical_gbps": 9.5,
+    "latency_warning_ms": 20,
+    "latency_critical_ms": 50,
+    "packet_loss_warning_percent": 1,
+    "packet_loss_critical_percent": 5,
+    "cpu_warning_percent": 80,
+    "cpu_critical_percent": 95,
+    "tcp_retransmissions_warning": 1000,
+    # Abweichung vom Normalverlauf in Standardabweichungen (baselines.py)
+    "anomaly_warning_score": 4,
+    "anomaly_critical_score": 6,
+    "hysteresis_percent": 10,
+    # Zyklen ohne neue Werte, nach denen die Alerts einer Zeile aufgehoben werden
+    "expire_cycles": 3,
+}
+
+
+class AlertRule:
+    """Regel: Metrik überschreitet Schwellwert(e) -> Alert mit Level"""
+
+    __slots__ = ("name", "metric", "levels", "message")
+
+    def __init__(self, name: str, metric: str, levels: List[Tuple[str, float]], message: str):
+        self.name = name
+        self.metric = metric
+        # Aufsteigend nach Schwere sortiert
+        self.levels = sorted(levels, key=lambda lv: LEVEL_ORDER[lv[0]])
+        self.message = message
+
+    def level_for(self, value: float, current: Optional[str], hysteresis: float) -> Optional[str]:
+        """Ermittelt das Level für einen Wert (mit Hysterese beim Absteigen)"""
+        if math.isnan(value):
+            return current
+
+        level = None
+        for name, threshold in self.levels:
+            # Ein bereits erreichtes Level wird erst unterhalb der Hysterese-Schwelle verlassen
+            held = current is not None and LEVEL_ORDER[current] >= LEVEL_ORDER[name]
+            limit = threshold * (1 - hysteresis) if held else threshold
+            if value > limit:
+                level = name
+        return level
+
+
+def build_rules(thresholds: Dict[str, Any]) -> List[AlertRule]:
+    """Erzeugt die Regeln aus dem alert_thresholds-Block der Config"""
+    t = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    return [
+        AlertRule("bandwidth", "in_mbps", [
+            ("warning", t["bandwidth_warning_gbps"] * 1000),
+            ("critical", t["bandwidth_critical_gbps"] * 1000),
+        ], "Hohe Bandbreite: {value:.1f} Mbps"),
+        AlertRule("cpu", "cpu", [
+            ("warning", t["cpu_warning_percent"]),
+            ("critical", t["cpu_critical_percent"]),
+        ], "Hohe CPU-Auslastung: {value:.0f}%"),
+        AlertRule("interfaces_down", "interfaces_down", [
+            ("info", 0),
+        ], "{value:.0f} Interface(s) down"),
+        AlertRule("restart", "restarted", [
+            ("warning", 0),
+        ], "Neustart erkannt"),
+        AlertRule("latency", "latency_ms", [
+            ("warning", t["latency_warning_ms"]),
+            ("critical", t["latency_critical_ms"]),
+        ], "Hohe Latenz: {value:.1f} ms"),
+        AlertRule("packet_loss", "packet_loss", [
+            ("warning", t["packet_loss_warning_percent"]),
+            ("critical", t["packet_loss_critical_percent"]),
+        ], "Paketverlust: {value:.1f}%"),
+        AlertRule("ntopng_errors", "engaged_alerts_error", [
+            ("critical", 0),
+        ], "{value:.0f} kritische Alerts aktiv"),
+        AlertRule("ntopng_warnings", "engaged_alerts_warning", [
+            ("warning", 0),
+        ], "{value:.0f} Warnungen aktiv"),
+        AlertRule("tcp_retransmissions", "tcp_retransmissions", [
+            ("warning", t["tcp_retransmissions_warning"]),
+        ], "Hohe TCP Retransmissions: {value:.0f}"),
+        AlertRule("anomaly", "anomaly_score", [
+            ("warning", t["anomaly_warning_score"]),
+            ("critical", t["anomaly_critical_score"]),
+        ], "Ungewöhnlich: {value:.1f}σ Abweichung vom Normalverlauf"),
+    ]
+
+
+class MetricTable:
+    """Spaltenweise Metrik-Ablage: eine array('d')-Spalte pro Metrik, eine Zeile pro Gerät"""
+
+    def __init__(self, metrics: List[str]):
+        self.index: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.labels: List[str] = []
+        self.columns: Dict[str, array] = {m: array("d") for m in metrics}
+        self.dirty: set = set()
+        # Zeilen, die seit dem letzten Zyklus Werte bekommen haben
+        self.seen: set = set()
+
+    def row(self, key: str, label: str) -> int:
+        row = self.index.get(key)
+        if row is None:
+            row = len(self.keys)
+            self.index[key] = row
+            self.keys.append(key)
+            self.labels.append(label)
+            for column in self.columns.values():
+                column.append(math.nan)
+        elif label and self.labels[row] != label:
+            self.labels[row] = label
+        return row
+
+    def update(self, key: str, label: str, metrics: Dict[str, float]):
+        """Schreibt Werte; nur tatsächlich geänderte Zeilen werden als dirty markiert"""
+        row = self.row(key, label)
+        self.seen.add(row)
+        for metric, value in metrics.items():
+            column = self.columns.get(metric)
+            if column is None:
+                continue
+            value = math.nan if value is None else float(value)
+            old = column[row]
+            if old != value and not (math.isnan(old) and math.isnan(value)):
+                column[row] = value
+                self.dirty.add(row)
+
+    def clear(self, row: int):
+        """Setzt alle Werte einer Zeile zurück (ein wiederkehrendes Gerät wird neu ausgewertet)"""
+        for column in self.columns.values():
+            column[row] = math.nan
+
+
+class AlertEngine:
+    """Wertet Regeln über geänderte Zeilen aus und verwaltet den Alert-Lebenszyklus"""
+
+    def __init__(self, config: Dict[str, Any]):
+        thresholds = config.get("alert_thresholds", {})
+        self.rules = build_rules(thresholds)
+        self.hysteresis = {**DEFAULT_THRESHOLDS, **thresholds}["hysteresis_percent"] / 100.0
+        self.expire_cycles = {**DEFAULT_THRESHOLDS, **thresholds}["expire_cycles"]
+        self.table = MetricTable(sorted({rule.metric for rule in self.rules}))
+        # (row, rule.name) -> aktiver Alert
+        self.active: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        # row -> Zyklen in Folge ohne neue Werte (nur Zeilen mit aktiven Alerts)
+        self.missed: Dict[int, int] = {}
+
+    def update(self, key: str, label: str, metrics: Dict[str, Optional[float]]):
+        """Übernimmt die aktuellen Metriken eines Geräts"""
+        self.table.update(key, label, metrics)
+
+    def evaluate(self, cycle: bool = True) -> List[Dict[str, Any]]:
+        """
+        Wertet alle geänderten Zeilen aus und liefert nur Zustandswechsel.
+        cycle=False: Zwischenauswertung (z.B. nach Traps), zählt nicht für expire_cycles.
+        """
+        now = datetime.now()
+        transitions = []
+        rows = sorted(self.table.dirty)
+        self.table.dirty.clear()
+
+        for rule in self.rules:
+            column = self.table.columns[rule.metric]
+            for row in rows:
+                value = column[row]
+                state_key = (row, rule.name)
+                current = self.active.get(state_key)
+                current_level = current["level"] if current else None
+                level = rule.level_for(value, current_level, self.hysteresis)
+
+                if level == current_level:
+                    if current:
+                        current["value"] = value
+                    continue
+
+                label = self.table.labels[row]
+                if level is None:
+                    del self.active[state_key]
+                    transitions.append(self._alert(current, "cleared", value, now, rule))
+                elif current is None:
+                    alert = {
+                        "id": f"{self.table.keys[row]}:{rule.name}:{int(now.timestamp())}",
+                        "device": label,
+                        "level": level,
+                        "since": now.isoformat(),
+                        "value": value,
+                    }
+                    self.active[state_key] = alert
+                    transitions.append(self._alert(alert, "raised", value, now, rule))
+                else:
+                    current["level"] = level
+                    current["value"] = value
+                    transitions.append(self._alert(current, "ongoing", value, now, rule))
+
+        if cycle:
+            transitions.extend(self._expire(now))
+        return transitions
+
+    def _expire(self, now: datetime) -> List[Dict[str, Any]]:
+        """Hebt die Alerts von Zeilen auf, die expire_cycles Zyklen lang keine Werte bekamen"""
+        seen = self.table.seen
+        self.table.seen = set()
+        transitions = []
+        for row in sorted({row for row, _ in self.active}):
+            if row in seen:
+                self.missed.pop(row, None)
+                continue
+            self.missed[row] = self.missed.get(row, 0) + 1
+            if self.missed[row] < self.expire_cycles:
+                continue
+            del self.missed[row]
+            self.table.clear(row)
+            for rule in self.rules:
+                alert = self.active.pop((row, rule.name), None)
+                if alert:
+                    transitions.append(self._alert(alert, "cleared", alert["value"], now, rule))
+        return transitions
+
+    def _alert(self, alert: Dict[str, Any], state: str, value: float, now: datetime, rule: AlertRule) -> Dict[str, Any]:
+        msg = rule.message.format(value=0 if math.isnan(value) else value)
+        if state == "cleared":
+            msg += " (behoben)"
+        return {
+            "id": alert["id"],
+            "device": alert["device"],
+            # Aufgehobene Alerts behalten ihr Level, erkennbar an state == "cleared"
+            "level": alert["level"],
+            "msg": msg,
+            "time": now.strftime("%H:%M:%S"),
+            "state": state,
+            "since": alert["since"],
+        }
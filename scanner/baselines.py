@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Baselines - Streaming-Normalverlauf pro Interface-Rate und Gaming-Latenz.
+Pro Serie: EWMA-Mittelwert und -Varianz plus ein kurzes saisonales Profil
+(Standard: Wochentag x 3-Stunden-Fenster). Jeder Messwert kostet O(1) und
+es wird keine Historie gespeichert; Werte liegen spaltenweise in array('d').
+Der Anomalie-Score ist die Abweichung vom erwarteten Wert in Standardabweichungen.
+"""
+
+import math
+import time
+import logging
+import threading
+from array import array
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASELINES = {
+    "enabled": False,
+    # Gewicht eines neuen Messwerts in Mittelwert und Varianz
+    "alpha": 0.1,
+    # Messwerte, bevor ein Score geliefert wird
+    "warmup_samples": 10,
+    # Saisonales Profil: season_slots Fenster über season_period Sekunden (lokale Zeit)
+    "season_period": 7 * 86400,
+    "season_slots": 56,
+    # Gewicht eines Besuchs im Fenster (z.B. letzter Freitagabend) gegenüber den früheren
+    "season_alpha": 0.3,
+    # Fenster mit so vielen Messwerten ersetzen den EWMA-Mittelwert als Erwartung
+    "season_min_samples": 3,
+    # Ausreißer fließen höchstens mit clip_score Standardabweichungen ein
+    "clip_score": 3.0,
+    # Mindest-Standardabweichung relativ zum erwarteten Wert
+    "min_std_percent": 5,
+    # Mindest-Standardabweichung absolut pro Serienart
+    "min_std": {"bps": 1_000_000, "latency_ms": 1.0},
+}
+
+
+class BaselineTracker:
+    """EWMA-Baselines und Anomalie-Scores für viele Serien (baselines-Block der Config)"""
+
+    def __init__(self, config: Dict[str, Any]):
+        baseline_config = config.get("baselines", {})
+        c = {**DEFAULT_BASELINES, **baseline_config}
+        self.enabled = c["enabled"]
+        self.alpha = c["alpha"]
+        self.warmup = c["warmup_samples"]
+        self.period = float(c["season_period"])
+        self.slots = max(1, int(c["season_slots"]))
+        self.season_min = c["season_min_samples"]
+        self.clip = c["clip_score"]
+        self.min_std_ratio = c["min_std_percent"] / 100.0
+        self.min_std = {**DEFAULT_BASELINES["min_std"], **baseline_config.get("min_std", {})}
+        # Ein Fenster wird pro Besuch etwa slot_seconds / scan_interval Mal gemessen
+        samples_per_visit = max(1.0, self.period / self.slots / config.get("scan_interval", 30))
+        self.season_step = c["season_alpha"] / samples_per_visit
+
+        self.index: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.kinds: List[str] = []
+        self.mean = array("d")
+        self.var = array("d")
+        self.count = array("d")
+        self.score = array("d")
+        # Zähler-Serien (Interface-Octets): letzter Stand und Zeitpunkt
+        self.last_counter = array("d")
+        self.last_time = array("d")
+        # Saisonales Profil: slots Einträge pro Serie
+        self.season_mean = array("d")
+        self.season_count = array("d")
+
+        self._lock = threading.Lock()
+        self._slot_time: Optional[float] = None
+        self._slot = 0
+
+    def _row(self, key: str, kind: str) -> int:
+        row = self.index.get(key)
+        if row is None:
+            row = len(self.keys)
+            self.index[key] = row
+            self.keys.append(key)
+            self.kinds.append(kind)
+            for column in (self.mean, self.var, self.count, self.last_counter, self.last_time):
+                column.append(0.0)
+            self.score.append(math.nan)
+            self.season_mean.extend([0.0] * self.slots)
+            self.season_count.extend([0.0] * self.slots)
+        return row
+
+    def slot(self, now: float) -> int:
+        """Saisonales Fenster eines Zeitpunkts (lokale Zeit, pro Zyklus nur einmal berechnet)"""
+        if now != self._slot_time:
+            local = now + time.localtime(now).tm_gmtoff
+            self._slot = int((local % self.period) / self.period * self.slots) % self.slots
+            self._slot_time = now
+        return self._slot
+
+    def observe(self, key: str, value: float, now: Optional[float] = None, kind: str = "latency_ms") -> Optional[float]:
+        """Übernimmt einen Messwert; liefert den Score (None in der Aufwärmphase)"""
+        if not self.enabled or value is None or math.isnan(value):
+            return None
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._update(self._row(key, kind), float(value), now)
+
+    def observe_counter(self, key: str, counter: float, now: Optional[float] = None) -> Optional[float]:
+        """Übernimmt einen Octet-Zähler; bewertet wird die Rate (bps) seit dem letzten Stand"""
+        if not self.enabled:
+            return None
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._row(key, "bps")
+            previous, last_counter = self.last_time[row], self.last_counter[row]
+            self.last_counter[row] = counter
+            self.last_time[row] = now
+            # Erster Stand oder Zähler zurückgesetzt (Neustart, Überlauf): kein Messwert
+            if previous <= 0 or now <= previous or counter < last_counter:
+                return None
+            return self._update(row, (counter - last_counter) * 8 / (now - previous), now)
+
+    def _update(self, row: int, value: float, now: float) -> Optional[float]:
+        """EWMA-Update (nur unter self._lock aufrufen)"""
+        alpha = self.alpha
+        count = self.count[row]
+        seasonal = row * self.slots + self.slot(now)
+
+        if count == 0:
+            self.mean[row] = value
+            self.season_mean[seasonal] = value
+            self.season_count[seasonal] = 1
+            self.count[row] = 1
+            return None
+
+        # Erwartung: saisonales Fenster, sobald es genug Messwerte hat, sonst der EWMA-Mittelwert
+        season_count = self.season_count[seasonal]
+        expected = self.season_mean[seasonal] if season_count >= self.season_min else self.mean[row]
+        std = max(math.sqrt(self.var[row]), abs(expected) * self.min_std_ratio,
+                  self.min_std.get(self.kinds[row], 0.0))
+        residual = value - expected
+        score = residual / std if std > 0 else 0.0
+
+        # Ausreißer begrenzen: eine Spitze verschiebt die Baseline nicht sofort,
+        # ein anhaltend neues Niveau wird trotzdem nach und nach übernommen
+        limit = self.clip * std
+        clipped = max(-limit, min(limit, residual))
+        adjusted = expected + clipped
+        self.var[row] = (1 - alpha) * (self.var[row] + alpha * clipped * clipped)
+        self.mean[row] += alpha * (adjusted - self.mean[row])
+        if season_count < self.season_min:
+            # Neues Fenster: ungekappter laufender Mittelwert (die erste Freitagabend-Spitze ist das Profil)
+            self.season_mean[seasonal] += (value - self.season_mean[seasonal]) / (season_count + 1)
+        else:
+            # Danach gleitend über die Besuche, Ausreißer gekappt
+            step = max(1.0 / (season_count + 1), self.season_step)
+            self.season_mean[seasonal] += step * (adjusted - self.season_mean[seasonal])
+        self.season_count[seasonal] = season_count + 1
+        self.count[row] = count + 1
+
+        if count + 1 < self.warmup:
+            return None
+        self.score[row] = score
+        return score
+
+    def expected(self, key: str, now: Optional[float] = None) -> Optional[float]:
+        """Aktuell erwarteter Wert einer Serie (für Dashboards/Debugging)"""
+        row = self.index.get(key)
+        if row is None:
+            return None
+        now = time.time() if now is None else now
+        seasonal = row * self.slots + self.slot(now)
+        if self.season_count[seasonal] >= self.season_min:
+            return self.season_mean[seasonal]
+        return self.mean[row]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "series": len(self.keys),
+            "bytes": sum(column.itemsize * len(column) for column in (
+                self.mean, self.var, self.count, self.score, self.last_counter,
+                self.last_time, self.season_mean, self.season_count)),
+        }
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Payload Encoding Benchmark - Bytes auf der Leitung und CPU pro Upload.
+Vergleicht das bisherige requests.post(json=...) mit kompaktem JSON,
+gzip/deflate und den Binärformaten für eine große Host-Liste.
+
+    python benchmarks/payload_encoding_benchmark.py --hosts 5000 --rounds 20
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from payload_encoding import PayloadEncoder  # noqa: E402
+
+
+def build_hosts_payload(count: int) -> dict:
+    """Host-Liste im Format von build_hosts_data"""
+    now = datetime.now().isoformat()
+    hosts = []
+    for i in range(count):
+        ip = f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}"
+        hosts.append({
+            "ip": ip,
+            "name": f"host-{i}.lan",
+            "type": "unknown",
+            "vendor": "Unknown",
+            "status": "online" if i % 7 else "warning",
+            "lastSeen": now,
+            "ping": round(1 + (i % 40) / 3, 1),
+            "interfaces": i % 4,
+            "cpu": i % 100,
+            "memory": (i * 37) % 16384,
+            "source": "ntopng+snmp" if i % 3 else "snmp",
+            "bytes_sent": i * 104729,
+            "bytes_rcvd": i * 130363,
+        })
+    return {"hosts": hosts, "total_hosts": count, "online_count": count, "offline_count": 0, "warning_count": 0}
+
+
+def legacy(payload: dict) -> bytes:
+    # Entspricht requests.post(json=...): Standard-Separatoren, ASCII-Escaping
+    return json.dumps(payload, allow_nan=False).encode("utf-8")
+
+
+def measure(name: str, func, payload: dict, rounds: int, baseline: int):
+    func(payload)
+    start = time.process_time()
+    for _ in range(rounds):
+        body = func(payload)
+    cpu_ms = (time.process_time() - start) / rounds * 1000
+    print(f"{name:18s} {len(body):10d} Bytes  {len(body) / baseline * 100:6.1f}%  {cpu_ms:8.2f} ms CPU")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload-Formate vergleichen")
+    parser.add_argument("--hosts", type=int, default=5000, help="Anzahl Hosts im Payload")
+    parser.add_argument("--rounds", type=int, default=20, help="Wiederholungen pro Format")
+    args = parser.parse_args()
+
+    payload = build_hosts_payload(args.hosts)
+    baseline = len(legacy(payload))
+    print(f"hosts-Payload mit {args.hosts} Hosts, {args.rounds} Runden")
+    measure("requests json=", legacy, payload, args.rounds, baseline)
+
+    variants = [("json", "none"), ("json", "deflate"), ("json", "gzip"),
+                ("msgpack", "none"), ("msgpack", "gzip"), ("cbor", "none"), ("cbor", "gzip")]
+    for fmt, compression in variants:
+        packer = None
+        try:
+            if fmt == "msgpack":
+                import msgpack
+                packer = msgpack.packb
+            elif fmt == "cbor":
+                import cbor2
+                packer = cbor2.dumps
+        except ImportError:
+            print(f"{fmt:18s} nicht installiert - übersprungen")
+            continue
+        encoder = PayloadEncoder({"upload_encoding": {"format": fmt, "compression": compression}}, packer)
+        measure(f"{fmt}+{compression}", lambda p: encoder.encode(p, "hosts").body, payload, args.rounds, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Replay Benchmark - CPU-Zeit pro Pipeline-Stufe mit einem aufgezeichneten Trace.
+Der Trace (network_scanner.py --record) wird ohne Netzwerk-I/O abgespielt; gemessen
+werden Geräte-Auswertung, Aggregation, Payload-Aufbau und Serialisierung.
+
+    python network_scanner.py --config config.json --record venue.jsonl.gz
+    python benchmarks/replay_benchmark.py venue.jsonl.gz --rounds 5
+    python benchmarks/replay_benchmark.py venue.jsonl.gz --profile 25
+"""
+
+import os
+import sys
+import time
+import pstats
+import logging
+import argparse
+import cProfile
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import network_scanner  # noqa: E402
+from collector_trace import TraceReplayer  # noqa: E402
+
+STAGES = [
+    "collect_device_data",
+    "aggregate_bandwidth_data",
+    "build_infrastructure_data",
+    "build_gaming_devices_data",
+    "build_alerts_data",
+    "build_hosts_data",
+    "send_to_api",
+]
+
+
+def timed(stage: str, func, totals: dict):
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            totals[stage] += time.perf_counter() - started
+    return wrapper
+
+
+def replay_round(path: str, totals: dict, limit: int = None) -> dict:
+    trace = TraceReplayer(path)
+    scanner = network_scanner.NetworkScanner(trace.replay_config())
+    trace.attach(scanner)
+    for stage in STAGES:
+        setattr(scanner, stage, timed(stage, getattr(scanner, stage), totals))
+    return trace.run(scanner, limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trace abspielen und Pipeline-Stufen messen")
+    parser.add_argument("trace", help="Trace-Datei von --record")
+    parser.add_argument("--rounds", type=int, default=5, help="Wiederholungen des ganzen Traces")
+    parser.add_argument("--cycles", type=int, help="Nur die ersten N Zyklen abspielen")
+    parser.add_argument("--profile", type=int, metavar="N", help="cProfile: die N teuersten Funktionen ausgeben")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    totals = defaultdict(float)
+    profiler = cProfile.Profile() if args.profile else None
+    cycles = 0
+    misses = 0
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        if profiler:
+            profiler.enable()
+        result = replay_round(args.trace, totals, args.cycles)
+        if profiler:
+            profiler.disable()
+        cycles += result["cycles"]
+        misses += result["misses"]
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.rounds} Runden, {cycles} Zyklen, {elapsed * 1000:.1f} ms gesamt "
+          f"({elapsed * 1000 / max(1, cycles):.2f} ms/Zyklus), {misses} Aufrufe nicht im Trace")
+    # collect_device_data läuft parallel im Thread-Pool: Summe über alle Threads
+    for stage in STAGES:
+        print(f"  {stage:28s} {totals[stage] * 1000 / max(1, cycles):8.2f} ms/Zyklus")
+
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(args.profile)
+
+
+if __name__ == "__main__":
+    main()
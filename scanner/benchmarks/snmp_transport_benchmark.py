@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+SNMP Transport Benchmark - Eingebauter Client vs. pysnmp hlapi.
+Startet einen lokalen Test-Agenten (eigener Prozess) und misst PDUs/s
+sowie CPU-Zeit pro PDU im Scanner-Prozess.
+
+    python benchmarks/snmp_transport_benchmark.py --gets 2000 --walks 200 --interfaces 48
+"""
+
+import os
+import sys
+import time
+import bisect
+import socket
+import argparse
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snmp_ber import (  # noqa: E402
+    PDU_GET, PDU_GETBULK, PDU_RESPONSE, TAG_OCTET_STRING, TAG_INTEGER, TAG_COUNTER32,
+    TAG_GAUGE32, TAG_NO_SUCH_OBJECT, TAG_END_OF_MIB_VIEW, decode_message, encode_message,
+)
+from snmp_client import SnmpClient  # noqa: E402
+
+SYS_DESCR = "1.3.6.1.2.1.1.1.0"
+IF_DESCR = "1.3.6.1.2.1.2.2.1.2"
+
+
+def build_mib(interfaces: int):
+    mib = {
+        SYS_DESCR: (TAG_OCTET_STRING, b"Benchmark Switch"),
+        "1.3.6.1.2.1.1.5.0": (TAG_OCTET_STRING, b"bench-sw"),
+    }
+    for idx in range(1, interfaces + 1):
+        mib[f"{IF_DESCR}.{idx}"] = (TAG_OCTET_STRING, f"port{idx}".encode())
+        mib[f"1.3.6.1.2.1.2.2.1.5.{idx}"] = (TAG_GAUGE32, 1_000_000_000)
+        mib[f"1.3.6.1.2.1.2.2.1.8.{idx}"] = (TAG_INTEGER, 1)
+        mib[f"1.3.6.1.2.1.2.2.1.10.{idx}"] = (TAG_COUNTER32, idx * 1000)
+    keys = sorted(mib, key=lambda oid: tuple(int(p) for p in oid.split(".")))
+    return mib, keys, [tuple(int(p) for p in k.split(".")) for k in keys]
+
+
+def agent(port_queue, pdu_counter, interfaces: int):
+    """Minimaler SNMP-Agent für GET/GETNEXT/GETBULK"""
+    mib, keys, sort_keys = build_mib(interfaces)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    sock.bind(("127.0.0.1", 0))
+    port_queue.put(sock.getsockname()[1])
+
+    def next_oid(oid: str):
+        pos = bisect.bisect_right(sort_keys, tuple(int(p) for p in oid.split(".")))
+        return keys[pos] if pos < len(keys) else None
+
+    while True:
+        data, address = sock.recvfrom(65535)
+        message = decode_message(data)
+        with pdu_counter.get_lock():
+            pdu_counter.value += 1
+        pdu_type = message["pdu_type"]
+        varbinds = []
+        for oid, _, _ in message["varbinds"]:
+            if pdu_type == PDU_GET:
+                tag, value = mib.get(oid, (TAG_NO_SUCH_OBJECT, None))
+                varbinds.append((oid, tag, value))
+                continue
+            repetitions = message["error_index"] if pdu_type == PDU_GETBULK else 1
+            current = oid
+            for _ in range(max(1, repetitions)):
+                current = next_oid(current)
+                if current is None:
+                    varbinds.append((oid, TAG_END_OF_MIB_VIEW, None))
+                    break
+                tag, value = mib[current]
+                varbinds.append((current, tag, value))
+        response = encode_message(message["version"], message["community"], PDU_RESPONSE,
+                                  message["request_id"], varbinds)
+        sock.sendto(response, address)
+
+
+def bench_builtin(port: int, gets: int, walks: int, max_repetitions: int):
+    client = SnmpClient(timeout=2, retries=1, max_repetitions=max_repetitions, port=port)
+    client.start()
+    futures = [client.get("127.0.0.1", [SYS_DESCR]) for _ in range(gets)]
+    futures += [client.walk("127.0.0.1", IF_DESCR) for _ in range(walks)]
+    for future in futures:
+        future.result()
+    client.close()
+    return client.timeouts
+
+
+def bench_pysnmp(port: int, gets: int, walks: int, workers: int = 10):
+    from pysnmp import hlapi
+
+    def get(_):
+        next(hlapi.getCmd(hlapi.SnmpEngine(), hlapi.CommunityData("public", mpModel=1),
+                          hlapi.UdpTransportTarget(("127.0.0.1", port), timeout=2, retries=1),
+                          hlapi.ContextData(), hlapi.ObjectType(hlapi.ObjectIdentity(SYS_DESCR))))
+
+    def walk(_):
+        for _ in hlapi.nextCmd(hlapi.SnmpEngine(), hlapi.CommunityData("public", mpModel=1),
+                               hlapi.UdpTransportTarget(("127.0.0.1", port), timeout=2, retries=1),
+                               hlapi.ContextData(), hlapi.ObjectType(hlapi.ObjectIdentity(IF_DESCR)),
+                               lexicographicMode=False):
+            pass
+
+    # MIB-Compiler einmal seriell initialisieren (pysmi ist beim ersten Laden nicht thread-safe)
+    get(None)
+
+    # Wie bisher in run_scan_cycle: ein Thread pro blockierender Anfrage
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(get, range(gets)))
+        list(executor.map(walk, range(walks)))
+    return 0
+
+
+def measure(name, func, pdu_counter, *args):
+    pdu_counter.value = 0
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    timeouts = func(*args)
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    pdus = pdu_counter.value
+    print(f"{name:10s} {pdus:8d} PDUs  {wall:7.2f} s  {pdus / wall:10.0f} PDUs/s  "
+          f"{cpu / max(pdus, 1) * 1e6:8.1f} µs CPU/PDU  Timeouts: {timeouts}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SNMP Transport Benchmark")
+    parser.add_argument("--gets", type=int, default=2000, help="Anzahl GET-Anfragen")
+    parser.add_argument("--walks", type=int, default=200, help="Anzahl ifDescr-Walks")
+    parser.add_argument("--interfaces", type=int, default=48, help="Interfaces des Test-Agenten")
+    parser.add_argument("--max-repetitions", type=int, default=25, help="GETBULK max-repetitions")
+    parser.add_argument("--skip-pysnmp", action="store_true", help="pysnmp nicht messen")
+    args = parser.parse_args()
+
+    port_queue = multiprocessing.Queue()
+    pdu_counter = multiprocessing.Value("L", 0)
+    process = multiprocessing.Process(target=agent, args=(port_queue, pdu_counter, args.interfaces), daemon=True)
+    process.start()
+    port = port_queue.get(timeout=10)
+
+    print(f"Agent auf 127.0.0.1:{port} - {args.gets} GETs, {args.walks} Walks über {args.interfaces} Interfaces")
+    measure("builtin", bench_builtin, pdu_counter, port, args.gets, args.walks, args.max_repetitions)
+
+    if not args.skip_pysnmp:
+        try:
+            measure("pysnmp", bench_pysnmp, pdu_counter, port, args.gets, args.walks)
+        except ImportError:
+            print("pysnmp nicht installiert - übersprungen")
+
+    process.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark - Zeit vom Prozessstart bis zum ersten Probe.
+Relevant für --once Läufe aus cron: hier dominiert der Startup die Laufzeit.
+
+    python benchmarks/startup_benchmark.py --runs 10
+    python benchmarks/startup_benchmark.py --config config.json --target-ms 200
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+SCANNER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Läuft im Kindprozess: ersetzt den ersten Probe durch einen Zeitstempel und beendet sich
+HARNESS = r"""
+import os, sys, json, time
+sys.path.insert(0, {scanner_dir!r})
+import network_scanner
+
+config = json.loads({config!r})
+scanner = network_scanner.NetworkScanner(config)
+
+def first_probe(*args, **kwargs):
+    loaded = sorted(network_scanner._loaded_backends)
+    heavy = [m for m in ("pysnmp", "requests") if m in sys.modules]
+    sys.stdout.write(json.dumps({{"t": time.time(), "backends": loaded, "modules": heavy}}) + "\n")
+    sys.stdout.flush()
+    os._exit(0)
+
+scanner.ping_rtt = first_probe
+scanner.run_scan_cycle({subnet!r})
+"""
+
+
+def run_once(config: dict, subnet: str) -> dict:
+    code = HARNESS.format(scanner_dir=SCANNER_DIR, config=json.dumps(config), subnet=subnet)
+    started = time.time()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60)
+    lines = [line for line in result.stdout.splitlines() if line.startswith("{")]
+    if not lines:
+        raise RuntimeError(f"Kein Probe erreicht:\n{result.stderr}")
+    sample = json.loads(lines[-1])
+    sample["ms"] = (sample["t"] - started) * 1000
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup-Zeit bis zum ersten Probe messen")
+    parser.add_argument("--runs", type=int, default=10, help="Anzahl Messungen")
+    parser.add_argument("--config", help="Pfad zur Konfigurationsdatei")
+    parser.add_argument("--subnet", default="192.0.2.0/30", help="Subnet für den Probe (TEST-NET)")
+    parser.add_argument("--target-ms", type=float, default=200.0, help="Zielwert für den Median")
+    args = parser.parse_args()
+
+    config = {"api_url": "http://127.0.0.1:9", "ntopng": {"enabled": False}}
+    if args.config:
+        with open(args.config) as f:
+            config.update(json.load(f))
+
+    samples = [run_once(config, args.subnet) for _ in range(args.runs)]
+    times = [s["ms"] for s in samples]
+    median = statistics.median(times)
+
+    print(f"Startup bis zum ersten Probe ({args.runs} Läufe)")
+    print(f"  Median: {median:7.1f} ms")
+    print(f"  Min:    {min(times):7.1f} ms")
+    print(f"  Max:    {max(times):7.1f} ms")
+    print(f"  Geladene Backends: {', '.join(samples[-1]['backends']) or '-'}")
+    print(f"  Schwere Module importiert: {', '.join(samples[-1]['modules']) or '-'}")
+    print(f"  Ziel: < {args.target_ms:.0f} ms -> {'OK' if median < args.target_ms else 'VERFEHLT'}")
+
+    sys.exit(0 if median < args.target_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Collector Trace - Aufzeichnen und Abspielen der Collector-Antworten.
+Im Aufnahmemodus landen SNMP-Varbinds, ntopng-JSON und Probe-Ergebnisse pro Zyklus
+in einer gzip-komprimierten JSON-Lines-Datei. Beim Abspielen bedient der Trace
+dieselben Methoden ohne Netzwerk-I/O, sodass Aggregation und Payload-Aufbau
+mit echten Venue-Daten in voller Geschwindigkeit profiliert werden können.
+"""
+
+import gzip
+import json
+import time
+import inspect
+import logging
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Any, Callable, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+TRACE_FORMAT = "scanner-trace"
+TRACE_VERSION = 1
+
+# Zugangsdaten werden nie in den Trace geschrieben
+SECRET_KEYS = {"api_key", "password", "username", "snmp_community", "community"}
+
+# Zeitstempel für Raten-Deltas (scanner.clock), in Aufrufreihenfolge
+CLOCK_KEY = "clock"
+
+# (Objekt, Methode, Ergebnis bei fehlendem Eintrag im Trace)
+TRACED_CALLS: List[Tuple[str, str, Callable[[Dict[str, Any]], Any]]] = [
+    ("scanner", "get_local_network", lambda args: "192.168.1.0/24"),
+    ("scanner", "ping_rtt", lambda args: None),
+    ("scanner", "measure_icmp_latency", lambda args: {"avg": 0, "min": 0, "max": 0, "loss": 100}),
+    ("scanner", "snmp_get_many", lambda args: {}),
+    ("scanner", "snmp_get_chunked", lambda args: None),
+    ("scanner", "snmp_walk", lambda args: {}),
+    ("scanner", "snmp_walk_many", lambda args: [{} for _ in args["oids"]]),
+    ("scanner", "read_neighbour_table", lambda args: {}),
+    ("ntopng", "_get", lambda args: None),
+    ("tcp_probe", "discover", lambda args: []),
+    ("tcp_probe", "measure_latency_many",
+     lambda args: [{"avg": 0, "min": 0, "max": 0, "loss": 100} for _ in args["targets"]]),
+    ("name_resolver", "lookup", lambda args: {}),
+]
+
+
+def sanitize_config(config: Any) -> Any:
+    """Config ohne Zugangsdaten (für den Trace-Header)"""
+    if isinstance(config, dict):
+        return {k: sanitize_config(v) for k, v in config.items() if k not in SECRET_KEYS}
+    if isinstance(config, list):
+        return [sanitize_config(v) for v in config]
+    return config
+
+
+def _traced_objects(scanner: Any) -> Dict[str, Any]:
+    return {"scanner": scanner, "ntopng": scanner.ntopng, "tcp_probe": scanner.tcp_prober,
+            "name_resolver": scanner.name_resolver}
+
+
+def _call_key(obj_name: str, method: str, arguments: Dict[str, Any]) -> str:
+    """Eindeutiger Schlüssel pro Aufruf (positionale und benannte Argumente gleich behandelt)"""
+    # Deadlines sind monotonic-Zeitpunkte und wären bei jedem Lauf andere Schlüssel
+    arguments = {k: v for k, v in arguments.items() if k != "deadline"}
+    if "instance" in arguments:
+        # ntopng-Instanz: nur der Name, keine Zugangsdaten
+        instance = arguments["instance"]
+        arguments = {**arguments, "instance": instance.get("name", instance.get("url"))}
+    return json.dumps([obj_name, method, arguments], separators=(",", ":"), sort_keys=True, default=str)
+
+
+def _encode_result(value: Any) -> Any:
+    """WalkResult (dict mit timed_out) bleibt beim Abspielen als solches erhalten"""
+    if isinstance(value, dict) and hasattr(value, "timed_out"):
+        return {"__walk__": dict(value), "timed_out": value.timed_out, "error": value.error}
+    if isinstance(value, list):
+        return [_encode_result(v) for v in value]
+    return value
+
+
+def _decode_result(value: Any) -> Any:
+    if isinstance(value, dict) and "__walk__" in value:
+        from snmp_client import WalkResult
+        result = WalkResult(value["__walk__"])
+        result.timed_out = value["timed_out"]
+        result.error = value.get("error")
+        return result
+    if isinstance(value, list):
+        return [_decode_result(v) for v in value]
+    return value
+
+
+def _bind(signature: inspect.Signature, args: tuple, kwargs: dict) -> Dict[str, Any]:
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return dict(bound.arguments)
+
+
+class TraceRecorder:
+    """Zeichnet die Collector-Antworten jedes Scan-Zyklus auf"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.cycles = 0
+        self._file = gzip.open(path, "wt", encoding="utf-8", compresslevel=6)
+        self._lock = threading.Lock()
+        self._calls: Optional[Dict[str, List[Any]]] = None
+
+    def attach(self, scanner: Any):
+        """Hängt sich an die Collector-Methoden und an run_scan_cycle des Scanners"""
+        self._write({
+            "format": TRACE_FORMAT,
+            "version": TRACE_VERSION,
+            "started": scanner.clock(),
+            "config": sanitize_config(scanner.config),
+            # Gelernte SNMP-Profile bestimmen, welche Anfragen der erste Zyklus stellt
+            "profiles": {ip: p.to_dict() for ip, p in scanner.snmp_profiles.profiles.items()},
+        })
+
+        objects = _traced_objects(scanner)
+        for obj_name, method, _ in TRACED_CALLS:
+            obj = objects[obj_name]
+            if obj is not None:
+                setattr(obj, method, self._wrap(obj_name, method, getattr(obj, method)))
+
+        clock = scanner.clock
+
+        def recorded_clock() -> float:
+            now = clock()
+            with self._lock:
+                if self._calls is not None:
+                    self._calls.setdefault(CLOCK_KEY, []).append(now)
+            return now
+
+        scanner.clock = recorded_clock
+        run_scan_cycle = scanner.run_scan_cycle
+
+        def traced_cycle(subnet: Optional[str] = None):
+            started = scanner.clock()
+            with self._lock:
+                self._calls = {}
+            try:
+                result = run_scan_cycle(subnet)
+            except BaseException:
+                # Abgebrochene Zyklen wären beim Abspielen unvollständig
+                with self._lock:
+                    self._calls = None
+                raise
+            with self._lock:
+                calls, self._calls = self._calls, None
+            self._write({"cycle": self.cycles, "time": started, "subnet": subnet, "calls": calls})
+            self.cycles += 1
+            return result
+
+        scanner.run_scan_cycle = traced_cycle
+        logger.info(f"Zeichne Collector-Antworten auf: {self.path}")
+
+    def _wrap(self, obj_name: str, method: str, original: Callable) -> Callable:
+        signature = inspect.signature(original)
+
+        def recorded(*args, **kwargs):
+            result = original(*args, **kwargs)
+            key = _call_key(obj_name, method, _bind(signature, args, kwargs))
+            encoded = _encode_result(result)
+            with self._lock:
+                if self._calls is not None:
+                    self._calls.setdefault(key, []).append(encoded)
+            return result
+        return recorded
+
+    def _write(self, record: Dict[str, Any]):
+        self._file.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+        # Sync-Flush: der Trace bleibt auch nach Strg+C bis zum letzten Zyklus lesbar
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+        logger.info(f"Trace geschlossen: {self.cycles} Zyklen in {self.path}")
+
+
+class TraceReplayer:
+    """Spielt einen Trace ohne Netzwerk-I/O durch einen NetworkScanner ab"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            self.header = json.loads(f.readline())
+        if self.header.get("format") != TRACE_FORMAT:
+            raise ValueError(f"{path} ist kein Scanner-Trace")
+        self.misses = 0
+        self.sent_bytes = 0
+        self._calls: Dict[str, deque] = {}
+        self._time = self.header.get("started", 0)
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        """Aufgezeichnete Config (ohne Zugangsdaten)"""
+        return self.header.get("config", {})
+
+    def replay_config(self, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Config für den Replay-Scanner: aufgezeichnete Config plus Overrides, ohne
+        Paketraten-Begrenzung, Profil-Cache-Datei und Shared Snapshot (keine Wartezeiten,
+        kein Überschreiben der Dateien des laufenden Scanners).
+        """
+        config = {**self.config, **(overrides or {})}
+        config["adaptive_concurrency"] = {**config.get("adaptive_concurrency", {}), "enabled": False}
+        config["snmp_profiles"] = {**config.get("snmp_profiles", {}), "cache_file": ""}
+        config["shared_snapshot"] = {**config.get("shared_snapshot", {}), "enabled": False}
+        return config
+
+    def cycles(self) -> Iterator[Dict[str, Any]]:
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            f.readline()
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def attach(self, scanner: Any):
+        """Ersetzt Collector-Methoden, Uhr und Upload durch den Trace"""
+        from snmp_profile import SnmpProfile
+
+        for ip, data in self.header.get("profiles", {}).items():
+            profile = SnmpProfile.from_dict(data)
+            # Relativ zur Aufnahme: beim Abspielen nicht sofort abgelaufen
+            profile.learned_at = time.time()
+            scanner.snmp_profiles.profiles[ip] = profile
+
+        objects = _traced_objects(scanner)
+        for obj_name, method, default in TRACED_CALLS:
+            obj = objects[obj_name]
+            if obj is not None:
+                setattr(obj, method, self._wrap(obj_name, method, getattr(obj, method), default))
+
+        def replayed_clock() -> float:
+            # Aufgezeichnete Zeitstempel: Raten wie bei der Aufnahme statt über die Replay-Dauer
+            queue = self._calls.get(CLOCK_KEY)
+            try:
+                return queue.popleft() if queue else self._time
+            except IndexError:
+                return self._time
+
+        scanner.clock = replayed_clock
+
+        def send_to_api(endpoint: str, data: Dict) -> bool:
+            # Serialisierung bleibt Teil der Messung, nur der POST entfällt
+            self.sent_bytes += len(scanner.payload_encoder.encode(data, endpoint).body)
+            return True
+
+        scanner.send_to_api = send_to_api
+
+    def _wrap(self, obj_name: str, method: str, original: Callable,
+              default: Callable[[Dict[str, Any]], Any]) -> Callable:
+        signature = inspect.signature(original)
+
+        def replayed(*args, **kwargs):
+            arguments = _bind(signature, args, kwargs)
+            queue = self._calls.get(_call_key(obj_name, method, arguments))
+            if queue:
+                try:
+                    return _decode_result(queue.popleft())
+                except IndexError:
+                    pass
+            self.misses += 1
+            logger.debug(f"Nicht im Trace: {obj_name}.{method}{tuple(arguments.values())}")
+            return default(arguments)
+        return replayed
+
+    def run(self, scanner: Any, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Spielt alle (bzw. limit) Zyklen ab und liefert Zeiten pro Zyklus"""
+        durations = []
+        for cycle in self.cycles():
+            if limit is not None and len(durations) >= limit:
+                break
+            self._calls = {key: deque(values) for key, values in cycle["calls"].items()}
+            self._time = cycle["time"]
+            started = time.perf_counter()
+            scanner.run_scan_cycle(cycle.get("subnet"))
+            durations.append(time.perf_counter() - started)
+
+        return {
+            "cycles": len(durations),
+            "total_ms": round(sum(durations) * 1000, 1),
+            "cycle_ms": [round(d * 1000, 2) for d in durations],
+            "misses": self.misses,
+            "sent_bytes": self.sent_bytes,
+        }
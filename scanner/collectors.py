@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Collectors - Einheitliche Schnittstelle für alle Datenquellen eines Zyklus.
+Ein Collector deklariert Ein- und Ausgaben, einen Kostenhinweis und seinen Takt.
+Der CollectorScheduler startet jeden Collector, sobald seine Eingaben vorliegen,
+und lässt unabhängige Collectors (ntopng, Discovery, Latenz, Plugins) gleichzeitig
+laufen. Ausgaben mehrerer Collectors werden zusammengeführt (Host-Listen ohne
+Duplikate), sodass nachfolgende Collectors jedes Ziel nur einmal bearbeiten.
+In den Scanner-Zustand gelangen Ausgaben erst über apply() im Zyklus-Thread, nie
+parallel zu den Payload-Buildern.
+
+Eigene Collectors kommen über den Entry-Point "gaming_scanner.collectors" oder
+über collectors.plugins ("modul:Klasse") in der Config.
+"""
+
+import time
+import logging
+import importlib
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Dict, List, Optional, Any, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "gaming_scanner.collectors"
+
+
+class Collector:
+    """
+    Basisklasse: collect() bekommt die deklarierten Eingaben (plus "subnet" und "deadline")
+    und liefert die eigenen Ausgaben, ohne den Scanner-Zustand zu verändern. apply() übernimmt
+    sie in den Scanner-Zustand (scanner.devices, ...), sobald der Lauf fertig ist.
+    """
+
+    # Eindeutiger Name (gleicher Name = derselbe Collector, Plugins ersetzen eingebaute)
+    name = ""
+    # Ausgaben anderer Collectors, die vor dem Start vorliegen müssen
+    inputs: Tuple[str, ...] = ()
+    # Schlüssel, die collect() liefert
+    outputs: Tuple[str, ...] = ()
+    # Relativer Aufwand pro Lauf: teure Collectors werden zuerst gestartet
+    cost = 1.0
+    # Mindestabstand zwischen zwei Läufen in Sekunden (0 = jeder Zyklus)
+    interval = 0.0
+
+    def __init__(self, scanner: Any, options: Dict[str, Any]):
+        self.scanner = scanner
+        self.options = options
+        self.cost = options.get("cost", self.cost)
+        self.interval = options.get("interval", self.interval)
+
+    def enabled(self) -> bool:
+        return True
+
+    def collect(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def apply(self, outputs: Dict[str, Any]):
+        """
+        Übernimmt die Ausgaben eines fertigen Laufs in den Scanner-Zustand. Läuft im Zyklus-Thread:
+        ein Lauf über die Deadline hinaus wird erst zu Beginn eines späteren Zyklus übernommen.
+        """
+
+
+# ============================================================================
+# Eingebaute Collectors (bisher fest verdrahtet in run_scan_cycle)
+# ============================================================================
+
+class NtopngCollector(Collector):
+    """Interface-Daten und Host-Snapshot von ntopng (Top-Talker-Raten), höchstens timeout Sekunden"""
+
+    name = "ntopng"
+    outputs = ("ntopng", "ntopng_interfaces", "ntopng_hosts")
+    cost = 1.0
+
+    def __init__(self, scanner: Any, options: Dict[str, Any]):
+        super().__init__(scanner, options)
+        self.timeout = options.get("timeout", 10.0)
+        # Zeitpunkt des Host-Snapshots (Raten beziehen sich auf den Abruf, nicht auf apply)
+        self._fetched_at = 0.0
+
+    def enabled(self) -> bool:
+        return self.scanner.ntopng.enabled
+
+    def collect(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        ntopng = self.scanner.ntopng
+        deadline = time.monotonic() + self.timeout
+        if data.get("deadline") is not None:
+            deadline = min(deadline, data["deadline"])
+
+        logger.info("Rufe ntopng-Daten ab...")
+        interfaces = ntopng.read_interface_data(deadline)
+        # Host-Snapshot einmal pro Zyklus: Raten für Top-Talker und Host-Liste
+        hosts = ntopng.read_hosts(deadline)
+        self._fetched_at = self.scanner.clock()
+        return {
+            "ntopng": ntopng.merge_interfaces(interfaces) if interfaces else ntopng.last_data,
+            "ntopng_interfaces": interfaces,
+            "ntopng_hosts": hosts,
+        }
+
+    def apply(self, outputs: Dict[str, Any]):
+        scanner = self.scanner
+        scanner.ntopng.store_interface_data(outputs["ntopng_interfaces"])
+        if scanner.ntopng.last_data:
+            host_stats = scanner.ntopng.get_host_stats()
+            logger.info(f"  → ntopng: {host_stats.get('num_hosts', 0)} Hosts, {host_stats.get('num_flows', 0)} Flows")
+        scanner.ntopng.last_hosts = outputs["ntopng_hosts"]
+        scanner.top_talkers.update(outputs["ntopng_hosts"] or [], self._fetched_at)
+
+
+class DiscoveryCollector(Collector):
+    """Aktive Hosts per ICMP, ARP-Harvest und TCP-Probe"""
+
+    name = "discovery"
+    outputs = ("hosts",)
+    cost = 5.0
+
+    def collect(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"hosts": self.scanner.scan_network(data.get("subnet"))}
+
+
+class SnmpCollector(Collector):
+    """SNMP-Daten aller gefundenen Hosts (bis zur SNMP-Deadline)"""
+
+    name = "snmp"
+    inputs = ("hosts",)
+    outputs = ("devices",)
+    cost = 10.0
+
+    def collect(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        scanner = self.scanner
+        # Unfertige Geräte behalten ihre letzten Daten, ihr Poll läuft weiter
+        results, pending = scanner.stage("snmp", scanner.snmp_workers).run(
+            data.get("hosts", []), scanner.collect_device_data, scanner.scheduler.deadline("snmp"))
+        if pending:
+            scanner._partial.add("snmp")
+        return {"devices": {ip: device for ip, device in results.items() if device}}
+
+    def apply(self, outputs: Dict[str, Any]):
+        for ip, device_data in outputs["devices"].items():
+            self.scanner.devices[ip] = device_data
+            logger.info(f"✓ {ip}: {device_data['name']} ({device_data['type']})")
+
+
+class LatencyCollector(Collector):
+    """Latenzen der im letzten Zyklus angefragten Ziele, parallel zu Discovery und SNMP"""
+
+    name = "latency"
+    outputs = ("latency",)
+    cost = 3.0
+
+    def collect(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"latency": self.scanner.prefetch_latency()}
+
+    def apply(self, outputs: Dict[str, Any]):
+        self.scanner.store_latency(outputs["latency"])
+
+
+class NameCollector(Collector):
+    """Hostnamen (PTR, Cache über Zyklen) für gefundene Hosts, parallel zu SNMP"""
+
+    name = "names"
+    inputs = ("hosts",)
+    outputs = ("names",)
+    cost = 2.0
+
+    def enabled(self) -> bool:
+        return self.scanner.name_resolver is not None
+
+    def collect(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        scanner = self.scanner
+        names = scanner.name_resolver.resolve(data.get("hosts", []), scanner.scheduler.deadline("snmp"))
+        return {"names": names}
+
+
+class VendorCollector(Collector):
+    """Hersteller und Geräteklasse aus der MAC (OUI-Index), ohne Anfrage an den Host"""
+
+    name = "vendors"
+    inputs = ("hosts",)
+    outputs = ("vendors",)
+    cost = 0.5
+
+    def enabled(self) -> bool:
+        return self.scanner.oui_index is not None
+
+    def collect(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {"vendors": self.scanner.classify_hosts(data.get("hosts", []))}
+
+
+BUILTIN_COLLECTORS: Dict[str, Type[Collector]] = {
+    cls.name: cls for cls in (NtopngCollector, DiscoveryCollector, SnmpCollector, LatencyCollector,
+                              NameCollector, VendorCollector)
+}
+
+
+def _entry_points() -> List[Any]:
+    from importlib import metadata
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return list(entry_points.select(group=ENTRY_POINT_GROUP))
+    return list(entry_points.get(ENTRY_POINT_GROUP, []))
+
+
+def discover_collectors(config: Dict[str, Any]) -> Dict[str, Type[Collector]]:
+    """Eingebaute Collectors, dann Entry-Points, dann collectors.plugins (spätere ersetzen frühere)"""
+    collector_config = config.get("collectors", {})
+    found = dict(BUILTIN_COLLECTORS)
+
+    candidates = []
+    if collector_config.get("entry_points", True):
+        try:
+            candidates.extend((ep.value, ep.load) for ep in _entry_points())
+        except Exception as e:
+            logger.warning(f"Collector-Entry-Points nicht lesbar: {e}")
+    for spec in collector_config.get("plugins", []):
+        module_name, _, attribute = spec.partition(":")
+        candidates.append((spec, lambda m=module_name, a=attribute: getattr(importlib.import_module(m), a)))
+
+    for spec, load in candidates:
+        try:
+            cls = load()
+        except Exception as e:
+            logger.error(f"Collector-Plugin {spec} nicht ladbar: {e}")
+            continue
+        if not (isinstance(cls, type) and issubclass(cls, Collector) and cls.name):
+            logger.error(f"Collector-Plugin {spec} ist keine Collector-Klasse mit Namen")
+            continue
+        if cls.name in found:
+            logger.info(f"Collector '{cls.name}' wird durch {spec} ersetzt")
+        found[cls.name] = cls
+
+    for name in collector_config.get("disabled", []):
+        found.pop(name, None)
+    return found
+
+
+def _merge(data: Dict[str, Any], outputs: Dict[str, Any]):
+    """Führt Ausgaben zusammen: Listen ohne Duplikate, Dicts per update, sonst ersetzen"""
+    for key, value in outputs.items():
+        current = data.get(key)
+        if isinstance(current, list) and isinstance(value, list):
+            data[key] = list(dict.fromkeys([*current, *value]))
+        elif isinstance(current, dict) and isinstance(value, dict):
+            data[key] = {**current, **value}
+        else:
+            data[key] = value
+
+
+class CollectorScheduler:
+    """Ein Scheduler für alle Collectors eines Scanners (collectors-Block der Config)"""
+
+    def __init__(self, scanner: Any, config: Dict[str, Any]):
+        self.scanner = scanner
+        self.config = config
+        self.collectors: Optional[List[Collector]] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Letzte Ausgaben pro Collector (für Takt > Zyklus, Fehler und überzogene Läufe)
+        self._outputs: Dict[str, Dict[str, Any]] = {}
+        self._last_run: Dict[str, float] = {}
+        self._in_flight: Dict[str, Future] = {}
+
+    def _load(self) -> List[Collector]:
+        """Erst beim ersten Zyklus: Entry-Points zu lesen kostet Startup-Zeit"""
+        options = self.config.get("collectors", {}).get("options", {})
+        collectors = []
+        for name, cls in discover_collectors(self.config).items():
+            try:
+                collector = cls(self.scanner, options.get(name, {}))
+            except Exception as e:
+                logger.error(f"Collector '{name}' nicht initialisierbar: {e}")
+                continue
+            if collector.enabled():
+                collectors.append(collector)
+
+        produced = {output for collector in collectors for output in collector.outputs}
+        for collector in collectors:
+            missing = [key for key in collector.inputs if key not in produced]
+            if missing:
+                logger.warning(f"Collector '{collector.name}': keine Quelle für {', '.join(missing)}")
+        logger.debug(f"Collectors: {', '.join(c.name for c in collectors)}")
+        if self.scanner.shared is not None:
+            # Multi-Site: gemeinsamer Collector-Pool, Worker per Round-Robin über die Sites
+            self._executor = self.scanner.shared.lane("collectors", self.scanner.site_name)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max(1, len(collectors)), thread_name_prefix="collector")
+        return collectors
+
+    def runs(self, name: str) -> bool:
+        """Ob ein Collector dieses Namens geladen ist (dann liefert er die Daten, kein eigener Abruf)"""
+        return any(collector.name == name for collector in self.collectors or [])
+
+    def run(self, subnet: Optional[Any] = None, deadline: Optional[float] = None) -> Tuple[Dict[str, Any], List[str]]:
+        """Ein Zyklus aller Collectors. (zusammengeführte Ausgaben, nicht fertige Collectors)"""
+        if self.collectors is None:
+            self.collectors = self._load()
+
+        data: Dict[str, Any] = {"subnet": subnet, "deadline": deadline}
+        now = time.monotonic()
+        waiting: Dict[str, Collector] = {}
+        finished: set = set()
+        pending: List[str] = []
+
+        for collector in self.collectors:
+            name = collector.name
+            running = self._in_flight.get(name)
+            if running is not None and running.done():
+                del self._in_flight[name]
+                if not self._finish(collector, running):
+                    pending.append(name)
+            if name in self._in_flight:
+                # Läuft noch aus dem letzten Zyklus: nicht doppelt starten, letzte Ausgaben verwenden
+                pending.append(name)
+            elif collector.interval and now - self._last_run.get(name, float("-inf")) < collector.interval:
+                pass
+            else:
+                waiting[name] = collector
+                continue
+            _merge(data, self._outputs.get(name, {}))
+            finished.add(name)
+
+        producers: Dict[str, set] = {}
+        for collector in self.collectors:
+            for output in collector.outputs:
+                producers.setdefault(output, set()).add(collector.name)
+
+        running: Dict[Future, Collector] = {}
+        while waiting or running:
+            ready = [
+                collector for collector in waiting.values()
+                if all(producers.get(key, set()) <= finished for key in collector.inputs)
+            ]
+            # Teure Collectors zuerst, damit sie nicht hinter billigen warten
+            for collector in sorted(ready, key=lambda c: -c.cost):
+                del waiting[collector.name]
+                self._last_run[collector.name] = time.monotonic()
+                inputs = {key: data[key] for key in ("subnet", "deadline", *collector.inputs) if key in data}
+                running[self._executor.submit(collector.collect, inputs)] = collector
+
+            if not running:
+                logger.error(f"Collectors warten zyklisch aufeinander: {', '.join(waiting)}")
+                pending.extend(waiting)
+                break
+
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # Deadline: laufende Collectors arbeiten weiter, ihre Ergebnisse zählen im nächsten Zyklus
+                for future, collector in running.items():
+                    self._in_flight[collector.name] = future
+                    _merge(data, self._outputs.get(collector.name, {}))
+                for name in waiting:
+                    _merge(data, self._outputs.get(name, {}))
+                pending.extend(c.name for c in running.values())
+                pending.extend(waiting)
+                logger.info(f"Collector-Deadline erreicht: {', '.join(c.name for c in running.values())} laufen weiter")
+                break
+
+            for future in done:
+                collector = running.pop(future)
+                if not self._finish(collector, future):
+                    pending.append(collector.name)
+                _merge(data, self._outputs.get(collector.name, {}))
+                finished.add(collector.name)
+
+        return data, pending
+
+    def _finish(self, collector: Collector, future: Future) -> bool:
+        try:
+            outputs = future.result() or {}
+        except Exception as e:
+            # Letzte erfolgreiche Ausgaben bleiben gültig, der Zyklus gilt als unvollständig
+            logger.error(f"Collector '{collector.name}' fehlgeschlagen: {e}")
+            return False
+        unknown = set(outputs) - set(collector.outputs)
+        if unknown:
+            logger.debug(f"Collector '{collector.name}': nicht deklarierte Ausgaben {', '.join(sorted(unknown))}")
+        try:
+            collector.apply(outputs)
+        except Exception as e:
+            logger.error(f"Collector '{collector.name}': Ausgaben nicht übernommen: {e}")
+            return False
+        self._outputs[collector.name] = outputs
+        return True
+
+    def shutdown(self):
+        # Der gemeinsame Multi-Site-Pool gehört SharedPools
+        if isinstance(self._executor, ThreadPoolExecutor):
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Adaptive Nebenläufigkeit - AIMD-Fenster und Paketraten-Begrenzung.
+Das Fenster (erlaubte gleichzeitige Anfragen) wächst, solange Antworten pünktlich
+kommen, und halbiert sich bei Timeouts oder steigender RTT. Token-Buckets
+begrenzen zusätzlich die Pakete pro Sekunde global und pro Ziel, damit kleine
+Consumer-Switches nicht unter Bursts zusammenbrechen.
+"""
+
+import math
+import time
+import threading
+from typing import Dict, Optional, Any
+
+# Standardwerte pro Einsatzzweck (überschreibbar im adaptive_concurrency-Block)
+DEFAULTS = {
+    "snmp": {
+        "initial": 32,
+        "min": 4,
+        "max": 1024,
+        "per_target_initial": 4,
+        "per_target_min": 1,
+        "per_target_max": 32,
+        "global_pps": 2000,
+        "per_target_pps": 200,
+        "timeout_rate": 0.05,
+        "rtt_inflation": 2.0,
+    },
+    "ping": {
+        "initial": 32,
+        "min": 8,
+        "max": 256,
+        # Ein Ping pro Ziel: kein per-Ziel-Fenster
+        "per_target_initial": 0,
+        "per_target_min": 0,
+        "per_target_max": 0,
+        "global_pps": 500,
+        "per_target_pps": 0,
+        "timeout_rate": 0.05,
+        "rtt_inflation": 3.0,
+    },
+}
+
+# Mindestanzahl Ergebnisse pro Runde, bevor das Fenster angepasst wird
+MIN_ROUND_SAMPLES = 8
+
+
+class AimdWindow:
+    """Fenster für gleichzeitige Anfragen: Slow Start, dann +1 pro Runde, bei Überlast halbieren"""
+
+    __slots__ = ("limit", "minimum", "maximum", "in_flight", "timeout_rate", "rtt_inflation",
+                 "slow_start", "min_rtt", "srtt", "_samples", "_timeouts", "_round_min_rtt")
+
+    def __init__(self, initial: float, minimum: float, maximum: float, timeout_rate: float, rtt_inflation: float):
+        self.limit = float(initial)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.in_flight = 0
+        self.timeout_rate = timeout_rate
+        self.rtt_inflation = rtt_inflation
+        self.slow_start = True
+        self.min_rtt: Optional[float] = None
+        self.srtt: Optional[float] = None
+        self._samples = 0
+        self._timeouts = 0
+        self._round_min_rtt = math.inf
+
+    def available(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def complete(self, rtt: Optional[float], timed_out: bool):
+        """Ergebnis einer Anfrage übernehmen (rtt None = keine verwertbare Messung)"""
+        self.in_flight = max(0, self.in_flight - 1)
+        self._samples += 1
+        if timed_out:
+            self._timeouts += 1
+        elif rtt is not None:
+            self.srtt = rtt if self.srtt is None else 0.8 * self.srtt + 0.2 * rtt
+            self._round_min_rtt = min(self._round_min_rtt, rtt)
+
+        if self._samples >= max(MIN_ROUND_SAMPLES, int(self.limit)):
+            self._end_round()
+
+    def _end_round(self):
+        if self._round_min_rtt < math.inf:
+            # Basis-RTT darf langsam steigen (Routen/Last ändern sich)
+            self.min_rtt = self._round_min_rtt if self.min_rtt is None else min(self.min_rtt * 1.05, self._round_min_rtt)
+
+        congested = self._timeouts / self._samples > self.timeout_rate
+        inflated = self.srtt is not None and self.min_rtt is not None and self.srtt > self.min_rtt * self.rtt_inflation
+        if congested or inflated:
+            self.limit = max(self.minimum, self.limit / 2)
+            self.slow_start = False
+        elif self.slow_start:
+            self.limit = min(self.maximum, self.limit * 2)
+        else:
+            self.limit = min(self.maximum, self.limit + 1)
+
+        self._samples = 0
+        self._timeouts = 0
+        self._round_min_rtt = math.inf
+
+
+class TokenBucket:
+    """Paketrate: rate Tokens pro Sekunde, Burst bis zu einer Sekunde"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float):
+        self.rate = float(rate)
+        self.capacity = max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        # Zeitstempel anderer Threads können älter sein als der letzte Refill
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Wartezeit bis ein Token frei ist (0 = sofort)"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        """Token verbrauchen (darf bei Retransmits ins Minus gehen)"""
+        self._refill(now)
+        self.tokens -= 1
+
+
+class ConcurrencyController:
+    """Globales und per-Ziel AIMD-Fenster plus globale/per-Ziel Paketraten"""
+
+    def __init__(self, config: Dict[str, Any], kind: str):
+        section = config.get("adaptive_concurrency", {})
+        settings = {**DEFAULTS[kind], **section.get(kind, {})}
+        self.settings = settings
+        self.window = AimdWindow(settings["initial"], settings["min"], settings["max"],
+                                 settings["timeout_rate"], settings["rtt_inflation"])
+        self.bucket = TokenBucket(settings["global_pps"]) if settings["global_pps"] else None
+        self.per_target = settings["per_target_max"] > 0
+        self.targets: Dict[str, AimdWindow] = {}
+        self.target_buckets: Dict[str, TokenBucket] = {}
+        self._cond = threading.Condition()
+
+    @property
+    def max_limit(self) -> int:
+        return int(self.settings["max"])
+
+    def _target_window(self, target: str) -> Optional[AimdWindow]:
+        if not self.per_target:
+            return None
+        window = self.targets.get(target)
+        if window is None:
+            s = self.settings
+            window = AimdWindow(s["per_target_initial"], s["per_target_min"], s["per_target_max"],
+                                s["timeout_rate"], s["rtt_inflation"])
+            self.targets[target] = window
+        return window
+
+    def _target_bucket(self, target: str) -> Optional[TokenBucket]:
+        if not self.settings["per_target_pps"]:
+            return None
+        bucket = self.target_buckets.get(target)
+        if bucket is None:
+            bucket = TokenBucket(self.settings["per_target_pps"])
+            self.target_buckets[target] = bucket
+        return bucket
+
+    def try_acquire(self, target: str, now: Optional[float] = None) -> float:
+        """
+        Versucht einen Slot zu belegen. 0 = belegt, sonst Wartezeit in Sekunden
+        (math.inf = Fenster voll, wartet auf eine abgeschlossene Anfrage).
+        """
+        now = time.monotonic() if now is None else now
+        with self._cond:
+            window = self._target_window(target)
+            if not self.window.available() or (window and not window.available()):
+                return math.inf
+            bucket = self._target_bucket(target)
+            wait = max(self.bucket.delay(now) if self.bucket else 0.0,
+                       bucket.delay(now) if bucket else 0.0)
+            if wait > 0:
+                return wait
+            self.window.in_flight += 1
+            if window:
+                window.in_flight += 1
+            if self.bucket:
+                self.bucket.take(now)
+            if bucket:
+                bucket.take(now)
+            return 0.0
+
+    def acquire(self, target: str):
+        """Blockierende Variante für Thread-basierte Probes"""
+        with self._cond:
+            while True:
+                wait = self.try_acquire(target)
+                if wait == 0:
+                    return
+                self._cond.wait(None if wait == math.inf else wait)
+
+    def retransmit(self, target: str):
+        """Retransmit: belegt keinen neuen Slot, zählt aber gegen die Paketrate"""
+        now = time.monotonic()
+        with self._cond:
+            if self.bucket:
+                self.bucket.take(now)
+            bucket = self._target_bucket(target)
+            if bucket:
+                bucket.take(now)
+
+    def release(self, target: str, rtt: Optional[float], timed_out: bool = False):
+        """Gibt den Slot frei und passt die Fenster an"""
+        with self._cond:
+            self.window.complete(rtt, timed_out)
+            window = self._target_window(target)
+            if window:
+                window.complete(rtt, timed_out)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": int(self.window.limit),
+                "in_flight": self.window.in_flight,
+                "srtt_ms": round(self.window.srtt * 1000, 1) if self.window.srtt else None,
+                "targets": len(self.targets),
+            }
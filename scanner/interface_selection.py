@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Interface-Auswahl - Welche Interfaces eines Geräts gepollt und summiert werden.
+Regeln nach ifType, ifDescr-Muster oder expliziter ifIndex-Liste, gestuft
+default -> vendor -> device. Aufgelöst wird einmal pro Gerät (Ergebnis im
+SNMP-Profil), danach werden nur noch die ausgewählten Zeilen per GET gelesen.
+"""
+
+import re
+import logging
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# Virtuelle/aggregierte Interfaces, die sonst doppelt in die Summe eingehen
+DEFAULT_EXCLUDE_TYPES = [
+    24,   # softwareLoopback
+    53,   # propVirtual
+    131,  # tunnel
+    135,  # l2vlan
+    136,  # l3ipvlan
+    161,  # ieee8023adLag (Port-Channel: Summe der Member-Ports)
+]
+
+DEFAULT_RULES = {
+    "include_types": [],
+    "exclude_types": DEFAULT_EXCLUDE_TYPES,
+    "include_descr": [],
+    "exclude_descr": [],
+    "include_index": [],
+    "exclude_index": [],
+}
+
+# Obergrenze Varbinds pro GET-PDU (Antwort bleibt sicher unter der UDP-MTU)
+MAX_OIDS_PER_PDU = 30
+
+
+class InterfaceRules:
+    """Aufgelöste Regeln für ein Gerät"""
+
+    def __init__(self, rules: Dict[str, Any]):
+        self.include_types = {str(t) for t in rules.get("include_types", [])}
+        self.exclude_types = {str(t) for t in rules.get("exclude_types", [])}
+        self.include_descr = [re.compile(p, re.IGNORECASE) for p in rules.get("include_descr", [])]
+        self.exclude_descr = [re.compile(p, re.IGNORECASE) for p in rules.get("exclude_descr", [])]
+        self.include_index = {str(i) for i in rules.get("include_index", [])}
+        self.exclude_index = {str(i) for i in rules.get("exclude_index", [])}
+
+    def matches(self, index: str, descr: str, if_type: Optional[str]) -> bool:
+        # Eine explizite Index-Liste hat Vorrang vor allen anderen Regeln
+        if self.include_index:
+            return index in self.include_index
+        if index in self.exclude_index:
+            return False
+        if if_type is not None:
+            if self.include_types and if_type not in self.include_types:
+                return False
+            if if_type in self.exclude_types:
+                return False
+        if self.include_descr and not any(p.search(descr) for p in self.include_descr):
+            return False
+        return not any(p.search(descr) for p in self.exclude_descr)
+
+
+class InterfaceSelector:
+    """Liest den interface_selection-Block der Config und wählt Interfaces aus"""
+
+    def __init__(self, config: Dict[str, Any]):
+        selection_config = config.get("interface_selection", {})
+        self.enabled = selection_config.get("enabled", False)
+        self.max_oids_per_pdu = selection_config.get("max_oids_per_pdu", MAX_OIDS_PER_PDU)
+        self.default = {**DEFAULT_RULES, **selection_config.get("default", {})}
+        self.vendors: Dict[str, Dict] = selection_config.get("vendors", {})
+        self.devices: Dict[str, Dict] = selection_config.get("devices", {})
+        self._rules: Dict[str, InterfaceRules] = {}
+
+    def rules_for(self, ip: str, vendor: str) -> InterfaceRules:
+        """Regeln für ein Gerät: default, überschrieben von vendor, überschrieben von device"""
+        key = f"{ip}|{vendor}"
+        rules = self._rules.get(key)
+        if rules is None:
+            rules = InterfaceRules({**self.default, **self.vendors.get(vendor, {}), **self.devices.get(ip, {})})
+            self._rules[key] = rules
+        return rules
+
+    def select(self, ip: str, vendor: str, if_descrs: Dict[str, str], if_types: Dict[str, str]) -> Dict[str, str]:
+        """Ausgewählte Interfaces {ifIndex: ifDescr}"""
+        rules = self.rules_for(ip, vendor)
+        selected = {
+            idx: descr for idx, descr in if_descrs.items()
+            if rules.matches(idx, descr or "", if_types.get(idx))
+        }
+        logger.debug(f"{ip}: {len(selected)} von {len(if_descrs)} Interfaces ausgewählt")
+        return selected
+
+
+def chunk_oids(oids: List[str], size: int) -> List[List[str]]:
+    """Teilt OIDs auf mehrere GET-PDUs auf"""
+    size = max(1, size)
+    return [oids[i:i + size] for i in range(0, len(oids), size)]
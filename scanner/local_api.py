@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Lokale Read-API - Liefert die letzten Scanner-Snapshots direkt im LAN aus.
+Gleiche Ressourcen und Filter wie die Edge Functions, aber ohne Cloud-Roundtrip.
+Antworten werden einmal pro Zyklus serialisiert und mit ETag/gzip ausgeliefert.
+"""
+
+import gzip
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from urllib.parse import urlsplit, parse_qsl
+
+logger = logging.getLogger(__name__)
+
+CORS_HEADERS = {
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type, if-none-match",
+    "Access-Control-Expose-Headers": "etag",
+}
+
+# Gleiche Limits wie die Edge Functions
+MAX_BANDWIDTH_RECORDS = 100
+MAX_ALERTS = 50
+
+# Gefilterte Antworten pro Snapshot-Version
+MAX_CACHED_VIEWS = 64
+
+
+class _Response:
+    """Vorserialisierte Antwort mit ETag und optionalem gzip-Body"""
+
+    __slots__ = ("status", "body", "gzip_body", "etag")
+
+    def __init__(self, payload: Dict, status: int = 200, gzip_min_bytes: int = 1024):
+        self.status = status
+        self.body = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+        self.etag = '"' + hashlib.blake2b(self.body, digest_size=12).hexdigest() + '"'
+        self.gzip_body: Optional[bytes] = None
+        if len(self.body) >= gzip_min_bytes:
+            self.gzip_body = gzip.compress(self.body, compresslevel=6, mtime=0)
+
+
+# ============================================================================
+# Ressourcen-Views (Antwortformat der Edge Functions)
+# ============================================================================
+def _bandwidth_view(state: Dict, params: Dict[str, str]) -> Tuple[int, Dict]:
+    try:
+        limit = int(params.get("limit", "20"))
+    except ValueError:
+        limit = 20
+    records = list(state["records"])
+    data = records[-limit:] if limit > 0 else []
+    latest_with_ntopng = next((d for d in data if d.get("ntopng")), None)
+    return 200, {
+        "success": True,
+        "data": data,
+        "count": len(data),
+        "lastUpdate": data[-1]["timestamp"] if data else None,
+        "source": data[-1].get("source", "unknown") if data else "unknown",
+        "ntopng": latest_with_ntopng.get("ntopng") if latest_with_ntopng else None,
+    }
+
+
+def _infrastructure_view(state: Dict, params: Dict[str, str]) -> Tuple[int, Dict]:
+    data = state["data"]
+    device_id = params.get("device_id")
+    if device_id and data:
+        device = next((d for d in data.get("devices", []) if d.get("id") == device_id), None)
+        if not device:
+            return 404, {"error": "Device not found"}
+        return 200, {"success": True, "data": device}
+
+    return 200, {
+        "success": True,
+        "data": data or {"devices": [], "total_devices": 0},
+        "lastUpdate": data.get("timestamp") if data else None,
+    }
+
+
+def _gaming_view(state: Dict, params: Dict[str, str]) -> Tuple[int, Dict]:
+    data = state["data"] or {"devices": [], "total_gaming_devices": 0}
+    devices = data.get("devices", [])
+    nintendo = [d for d in devices if "Nintendo" in d.get("name", "") or "Switch" in d.get("name", "")]
+    playstation = [d for d in devices if "PlayStation" in d.get("name", "") or "PS5" in d.get("name", "")]
+    return 200, {
+        "success": True,
+        "data": data,
+        "summary": {
+            "total": data.get("total_gaming_devices", 0),
+            "nintendo": len(nintendo),
+            "playstation": len(playstation),
+            "optimalCount": len([d for d in devices if d.get("status") == "optimal"]),
+        },
+        "lastUpdate": state["data"].get("timestamp") if state["data"] else None,
+    }
+
+
+def _alerts_view(state: Dict, params: Dict[str, str]) -> Tuple[int, Dict]:
+    try:
+        hours_back = float(params.get("hours", "1"))
+    except ValueError:
+        hours_back = 1.0
+    now = datetime.now().timestamp()
+    cutoff = now - hours_back * 3600
+    # Offene Alerts unabhängig vom Alter, aufgehobene nur innerhalb des hours-Fensters
+    recent = [a for a, ts in state["alerts"] if _alert_active(a) or ts > cutoff]
+    pending = [a for a in recent if a.get("state") != "cleared"]
+    return 200, {
+        "success": True,
+        # Offene Alerts zuletzt, damit das 20er-Limit sie nicht abschneidet
+        "data": ([a for a in recent if not _alert_active(a)] + [a for a in recent if _alert_active(a)])[-20:],
+        "count": len(recent),
+        "critical": len([a for a in pending if a.get("level") == "critical"]),
+        "warning": len([a for a in pending if a.get("level") == "warning"]),
+    }
+
+
+def _alert_active(alert: Dict) -> bool:
+    """Von der Alert-Engine gemeldet und noch nicht aufgehoben"""
+    return alert.get("state") in ("raised", "ongoing")
+
+
+def _hosts_view(state: Dict, params: Dict[str, str]) -> Tuple[int, Dict]:
+    data = state["data"] or {}
+    hosts = data.get("hosts", [])
+
+    status_filter = params.get("status")
+    type_filter = params.get("type")
+    source_filter = params.get("source")
+    search = (params.get("search") or "").lower()
+
+    if status_filter:
+        hosts = [h for h in hosts if h.get("status") == status_filter]
+    if type_filter:
+        hosts = [h for h in hosts if h.get("type") == type_filter]
+    if source_filter:
+        hosts = [h for h in hosts if source_filter in (h.get("source") or "")]
+    if search:
+        hosts = [
+            h for h in hosts
+            if search in h.get("ip", "")
+            or search in str(h.get("name", "")).lower()
+            or search in str(h.get("vendor", "")).lower()
+        ]
+
+    return 200, {
+        "success": True,
+        "data": {
+            "hosts": hosts,
+            "total_hosts": data.get("total_hosts", 0),
+            "online_count": data.get("online_count", 0),
+            "offline_count": data.get("offline_count", 0),
+            "warning_count": data.get("warning_count", 0),
+            "ntopng_stats": data.get("ntopng_stats"),
+            "partial": data.get("partial", []),
+        },
+        "lastUpdate": data.get("timestamp"),
+    }
+
+
+RESOURCE_VIEWS: Dict[str, Callable[[Dict, Dict[str, str]], Tuple[int, Dict]]] = {
+    "bandwidth": _bandwidth_view,
+    "network-infrastructure": _infrastructure_view,
+    "gaming-devices": _gaming_view,
+    "alerts": _alerts_view,
+    "hosts": _hosts_view,
+}
+
+
+# ============================================================================
+# Snapshot Store
+# ============================================================================
+class SnapshotStore:
+    """Hält die letzten Snapshots und deren vorserialisierte Antworten"""
+
+    def __init__(self, gzip_min_bytes: int = 1024):
+        self.gzip_min_bytes = gzip_min_bytes
+        self._lock = threading.Lock()
+        self._states: Dict[str, Dict] = {
+            "bandwidth": {"records": deque(maxlen=MAX_BANDWIDTH_RECORDS)},
+            "network-infrastructure": {"data": None},
+            "gaming-devices": {"data": None},
+            "alerts": {"alerts": deque()},
+            "hosts": {"data": None},
+        }
+        # Pro Ressource: Default-Antwort + LRU der gefilterten Varianten
+        self._default: Dict[str, _Response] = {}
+        self._views: Dict[str, "OrderedDict[Tuple, _Response]"] = {name: OrderedDict() for name in RESOURCE_VIEWS}
+        for name in RESOURCE_VIEWS:
+            self._rebuild(name)
+
+    def _rebuild(self, resource: str):
+        status, payload = RESOURCE_VIEWS[resource](self._states[resource], {})
+        self._default[resource] = _Response(payload, status, self.gzip_min_bytes)
+        self._views[resource].clear()
+
+    def publish(self, resource: str, data: Any):
+        """Übernimmt den Payload eines Zyklus und serialisiert die Default-Antwort"""
+        if resource not in RESOURCE_VIEWS:
+            raise ValueError(f"Unbekannte Ressource: {resource}")
+
+        now = datetime.now()
+        with self._lock:
+            state = self._states[resource]
+            if resource == "bandwidth":
+                record = dict(data)
+                record.setdefault("timestamp", now.isoformat())
+                state["records"].append(record)
+            elif resource == "alerts":
+                alerts = data.get("alerts", []) if isinstance(data, dict) else data
+                for alert in alerts:
+                    # Zustandswechsel (ongoing/cleared) ersetzen den bestehenden Alert mit gleicher ID
+                    if alert.get("id"):
+                        existing = [entry for entry in state["alerts"] if entry[0].get("id") == alert["id"]]
+                        for entry in existing:
+                            state["alerts"].remove(entry)
+                    state["alerts"].append((dict(alert, timestamp=now.isoformat()), now.timestamp()))
+                # Bei Überlauf zuerst aufgehobene Alerts verwerfen, offene bleiben sichtbar
+                while len(state["alerts"]) > MAX_ALERTS:
+                    oldest = next((entry for entry in state["alerts"] if not _alert_active(entry[0])),
+                                  state["alerts"][0])
+                    state["alerts"].remove(oldest)
+            else:
+                record = dict(data)
+                record.setdefault("timestamp", now.isoformat())
+                state["data"] = record
+            self._rebuild(resource)
+
+    def get(self, resource: str, params: Dict[str, str]) -> Optional[_Response]:
+        """Liefert die (gecachte) Antwort für Ressource und Query-Parameter"""
+        if resource not in RESOURCE_VIEWS:
+            return None
+
+        # Auch Alerts: das hours-Fenster wird beim publish() des Zyklus ausgewertet, nicht pro Anfrage
+        if not params:
+            return self._default[resource]
+
+        key = tuple(sorted(params.items()))
+        with self._lock:
+            views = self._views[resource]
+            cached = views.get(key)
+            if cached is not None:
+                views.move_to_end(key)
+                return cached
+
+            status, payload = RESOURCE_VIEWS[resource](self._states[resource], params)
+            response = _Response(payload, status, self.gzip_min_bytes)
+            views[key] = response
+            if len(views) > MAX_CACHED_VIEWS:
+                views.popitem(last=False)
+            return response
+
+
+# ============================================================================
+# HTTP Server
+# ============================================================================
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "GamingScannerLocalAPI/1.0"
+    store: SnapshotStore
+
+    def log_message(self, format: str, *args):
+        logger.debug("Lokale API: " + format % args)
+
+    def _send(self, status: int, body: bytes, extra_headers: Dict[str, str]):
+        self.send_response(status)
+        for key, value in CORS_HEADERS.items():
+            self.send_header(key, value)
+        for key, value in extra_headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD" and body:
+            self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self._send(204, b"", {})
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        # Akzeptiert /hosts und /functions/v1/hosts
+        resource = parts.path.rstrip("/").rsplit("/", 1)[-1]
+        params = dict(parse_qsl(parts.query))
+
+        response = self.store.get(resource, params)
+        if response is None:
+            body = json.dumps({"error": "Not found"}).encode("utf-8")
+            self._send(404, body, {"Content-Type": "application/json"})
+            return
+
+        headers = {
+            "Content-Type": "application/json",
+            "ETag": response.etag,
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = self.headers.get("If-None-Match", "")
+        if response.etag in [tag.strip() for tag in if_none_match.split(",")]:
+            self._send(304, b"", headers)
+            return
+
+        body = response.body
+        accept_encoding = self.headers.get("Accept-Encoding", "")
+        if response.gzip_body is not None and "gzip" in accept_encoding:
+            body = response.gzip_body
+            headers["Content-Encoding"] = "gzip"
+
+        self._send(response.status, body, headers)
+
+    do_HEAD = do_GET
+
+
+class LocalApiServer:
+    """Optionaler HTTP-Server im Scanner-Prozess für Dashboards im LAN"""
+
+    def __init__(self, config: Dict[str, Any]):
+        api_config = config.get("local_api", {})
+        self.enabled = api_config.get("enabled", False)
+        self.host = api_config.get("host", "0.0.0.0")
+        self.port = api_config.get("port", 8787)
+        self.store = SnapshotStore(api_config.get("gzip_min_bytes", 1024))
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> bool:
+        """Startet den Server in einem Daemon-Thread"""
+        if not self.enabled or self._server:
+            return False
+
+        handler = type("LocalApiHandler", (_RequestHandler,), {"store": self.store})
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        except OSError as e:
+            logger.error(f"Lokale API konnte nicht starten ({self.host}:{self.port}): {e}")
+            return False
+
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="local-api", daemon=True)
+        self._thread.start()
+        logger.info(f"Lokale API läuft auf http://{self.host}:{self.port}")
+        return True
+
+    def stop(self):
+        """Stoppt den Server"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def publish(self, resource: str, data: Any):
+        """Übernimmt einen Payload (gleiches Format wie send_to_api)"""
+        self.store.publish(resource, data)
+
+    def publish_cycle(self, payloads: List[Tuple[str, Any]]):
+        """Übernimmt alle Payloads eines Scan-Zyklus"""
+        for resource, data in payloads:
+            try:
+                self.publish(resource, data)
+            except Exception as e:
+                logger.error(f"Lokale API: Fehler beim Übernehmen von {resource}: {e}")
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Multi-Site - Ein Prozess für viele Hallen/VLAN-Gruppen.
+Jede Site hat ihren eigenen NetworkScanner-Zustand (Geräte, Profile, Alerts, API-Ziel),
+aber alle teilen sich Probe-, SNMP-, Latenz-, Publish- und Collector-Pools, einen SNMP-Socket,
+die AIMD-Fenster und die HTTP-Session. Die Pools verteilen Worker per Round-Robin
+über die Sites; solange andere Sites warten, belegt eine Site höchstens ihren Anteil.
+"""
+
+import os
+import math
+import time
+import heapq
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Callable, Hashable, Tuple
+
+from concurrency import ConcurrencyController
+
+logger = logging.getLogger(__name__)
+
+# Worker pro gemeinsamem Pool (überschreibbar in multi_site.workers)
+DEFAULT_WORKERS = {
+    "discovery": 256,
+    "snmp": 64,
+    "latency": 32,
+    "publish": 8,
+    "collectors": 32,
+}
+
+# Prozessweite Blöcke, die nicht pro Site gelten
+SITE_EXCLUDED_KEYS = {"sites", "multi_site", "local_api", "snmp_traps"}
+
+
+class FairExecutor:
+    """
+    Thread-Pool mit einer Warteschlange pro Lane (Site), Round-Robin zwischen den Lanes.
+    Eine Lane belegt höchstens lane_limit Worker, solange andere Lanes Arbeit haben.
+    Threads entstehen erst bei Bedarf.
+    """
+
+    def __init__(self, name: str, max_workers: int, lane_share: float = 0.5):
+        self.name = name
+        self.max_workers = max_workers
+        self.lane_limit = max(1, math.ceil(max_workers * lane_share))
+        self._lanes: Dict[Hashable, deque] = {}
+        self._order: deque = deque()
+        self._queued: set = set()
+        self._running: Dict[Hashable, int] = {}
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._idle = 0
+
+    def lane(self, key: Hashable) -> "Lane":
+        return Lane(self, key)
+
+    def submit(self, key: Hashable, fn: Callable, *args, **kwargs) -> Future:
+        future: Future = Future()
+        with self._cond:
+            self._lanes.setdefault(key, deque()).append((future, fn, args, kwargs))
+            if key not in self._queued:
+                self._queued.add(key)
+                self._order.append(key)
+            if self._idle == 0 and len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._worker, name=f"{self.name}-{len(self._threads)}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+        return future
+
+    def _next(self) -> Optional[Tuple[Hashable, tuple]]:
+        """Nächste Aufgabe per Round-Robin (nur unter self._cond aufrufen)"""
+        # Erster Durchlauf mit Lane-Limit, zweiter ohne: freie Worker bleiben nie ungenutzt
+        for limited in (True, False):
+            for _ in range(len(self._order)):
+                key = self._order.popleft()
+                if limited and self._running.get(key, 0) >= self.lane_limit:
+                    self._order.append(key)
+                    continue
+                queue = self._lanes[key]
+                task = queue.popleft()
+                if queue:
+                    self._order.append(key)
+                else:
+                    self._queued.discard(key)
+                self._running[key] = self._running.get(key, 0) + 1
+                return key, task
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                self._idle += 1
+                task = self._next()
+                while task is None:
+                    self._cond.wait()
+                    task = self._next()
+                self._idle -= 1
+
+            key, (future, fn, args, kwargs) = task
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+
+            with self._cond:
+                self._running[key] -= 1
+                # Freies Lane-Limit: wartende Worker prüfen erneut
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "threads": len(self._threads),
+                "queued": sum(len(q) for q in self._lanes.values()),
+                "running": sum(self._running.values()),
+            }
+
+
+class Lane:
+    """Executor-Sicht einer Site auf einen gemeinsamen Pool (submit wie ThreadPoolExecutor)"""
+
+    __slots__ = ("pool", "key")
+
+    def __init__(self, pool: FairExecutor, key: Hashable):
+        self.pool = pool
+        self.key = key
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        return self.pool.submit(self.key, fn, *args, **kwargs)
+
+
+class SharedPools:
+    """Gemeinsame Ressourcen aller Sites (multi_site-Block der Config)"""
+
+    def __init__(self, config: Dict[str, Any]):
+        multi_config = config.get("multi_site", {})
+        workers = {**DEFAULT_WORKERS, **multi_config.get("workers", {})}
+        site_share = multi_config.get("site_share", 0.5)
+        self.pools = {name: FairExecutor(name, count, site_share) for name, count in workers.items()}
+
+        self.snmp_concurrency = None
+        self.ping_concurrency = None
+        if config.get("adaptive_concurrency", {}).get("enabled", True):
+            self.snmp_concurrency = ConcurrencyController(config, "snmp")
+            self.ping_concurrency = ConcurrencyController(config, "ping")
+
+        self._lock = threading.Lock()
+        self._snmp_client = None
+        self._api_session = None
+
+    def lane(self, pool: str, site: str) -> Lane:
+        return self.pools[pool].lane(site)
+
+    def snmp_client(self, factory: Callable[[], Any]) -> Any:
+        """Ein SNMP-Client (ein Socket, ein I/O-Thread) für alle Sites; Community pro Anfrage"""
+        with self._lock:
+            if self._snmp_client is None:
+                self._snmp_client = factory()
+                self._snmp_client.start()
+            return self._snmp_client
+
+    def api_session(self, factory: Callable[[], Any]) -> Any:
+        """Eine HTTP-Session (Keep-Alive) für alle Sites; API-Key kommt pro Request"""
+        with self._lock:
+            if self._api_session is None:
+                self._api_session = factory()
+            return self._api_session
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+
+def site_configs(config: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """(Name, Config) pro Site: prozessweite Config plus Site-Block (Site gewinnt)"""
+    base = {key: value for key, value in config.items() if key not in SITE_EXCLUDED_KEYS}
+    sites = []
+    for number, site in enumerate(config.get("sites", []), 1):
+        name = site.get("name", f"site-{number}")
+        site_config = {**base, **site, "name": name}
+
+        # Gemeinsame Profil-Cache-Datei würde von allen Sites überschrieben
+        cache_file = site_config.get("snmp_profiles", {}).get("cache_file")
+        if cache_file and "snmp_profiles" not in site:
+            root, ext = os.path.splitext(cache_file)
+            site_config["snmp_profiles"] = {**site_config["snmp_profiles"], "cache_file": f"{root}-{name}{ext}"}
+
+        # Ebenso der Shared Snapshot (ohne Pfad hängt der Writer den Site-Namen selbst an)
+        snapshot_path = site_config.get("shared_snapshot", {}).get("path")
+        if snapshot_path and "shared_snapshot" not in site:
+            root, ext = os.path.splitext(snapshot_path)
+            site_config["shared_snapshot"] = {**site_config["shared_snapshot"], "path": f"{root}-{name}{ext}"}
+
+        sites.append((name, site_config))
+    return sites
+
+
+class MultiSiteRunner:
+    """Ein Scheduler für alle Sites: Zyklen auf dem Raster jeder Site, Fehler bleiben pro Site"""
+
+    def __init__(self, config: Dict[str, Any], scanner_class: Callable[..., Any]):
+        self.shared = SharedPools(config)
+        self.sites: Dict[str, Any] = {}
+        self.subnets: Dict[str, Any] = {}
+        self.errors: Dict[str, int] = {}
+        for name, site_config in site_configs(config):
+            self.sites[name] = scanner_class(site_config, shared=self.shared)
+            self.subnets[name] = site_config.get("subnets") or site_config.get("subnet")
+            self.errors[name] = 0
+
+        multi_config = config.get("multi_site", {})
+        # Site-Zyklen warten fast nur auf die gemeinsamen Pools: wenige Threads genügen
+        max_sites = multi_config.get("max_concurrent_sites", 8)
+        self.stagger = multi_config.get("stagger", True)
+        self._cycles = ThreadPoolExecutor(max_workers=max(1, min(len(self.sites), max_sites)),
+                                          thread_name_prefix="site")
+        self._running: Dict[str, Future] = {}
+
+        # Ein Trap-Listener für alle Sites (Port 162 lässt sich nur einmal binden)
+        self.trap_receiver = None
+        if config.get("snmp_traps", {}).get("enabled", False):
+            from snmp_traps import TrapReceiver
+            self.trap_receiver = TrapReceiver(config, self.handle_trap_events)
+
+    def handle_trap_events(self, events: List[Any]):
+        """Verteilt Trap-Ereignisse an die Site, die das Gerät kennt"""
+        for name, scanner in self.sites.items():
+            own = [event for event in events if event.ip in scanner.devices]
+            if own:
+                try:
+                    scanner.handle_trap_events(own)
+                except Exception as e:
+                    logger.error(f"[{name}] Fehler bei Trap-Verarbeitung: {e}")
+
+    def run_site(self, name: str, start: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Ein Zyklus einer Site (Deadlines ab start, ohne start ab jetzt); Fehler beenden nur diesen Zyklus"""
+        scanner = self.sites[name]
+        try:
+            return scanner.run_scheduled_cycle(self.subnets[name], start)
+        except Exception as e:
+            self.errors[name] += 1
+            logger.error(f"[{name}] Scan-Zyklus fehlgeschlagen: {e}")
+            return None
+
+    def run_once(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Alle Sites einmal, gleichzeitig über die gemeinsamen Pools (Deadlines ab Aufruf)"""
+        futures = {name: self._cycles.submit(self.run_site, name) for name in self.sites}
+        return {name: future.result() for name, future in futures.items()}
+
+    def run_continuous(self):
+        logger.info(f"Multi-Site Monitoring: {len(self.sites)} Sites ({', '.join(self.sites)})")
+        if self.trap_receiver:
+            self.trap_receiver.start()
+        for scanner in self.sites.values():
+            if scanner.local_api:
+                scanner.local_api.start()
+            if scanner.name_resolver:
+                scanner.name_resolver.start()
+
+        now = time.monotonic()
+        shortest = min(scanner.scan_interval for scanner in self.sites.values())
+        schedule = []
+        for number, (name, scanner) in enumerate(self.sites.items()):
+            # Versetzte Startzeiten: nicht alle Sites scannen im selben Moment
+            offset = shortest * number / len(self.sites) if self.stagger else 0.0
+            schedule.append((scanner.scheduler.next_start(now + offset), name))
+        heapq.heapify(schedule)
+
+        while True:
+            try:
+                start, name = heapq.heappop(schedule)
+                time.sleep(max(0.0, start - time.monotonic()))
+                running = self._running.get(name)
+                if running and not running.done():
+                    logger.warning(f"[{name}] Vorheriger Zyklus läuft noch, Rasterpunkt übersprungen")
+                else:
+                    self._running[name] = self._cycles.submit(self.run_site, name, start)
+                heapq.heappush(schedule, (self.sites[name].scheduler.next_start(), name))
+                logger.debug(f"Pools: {self.shared.stats()}")
+            except KeyboardInterrupt:
+                logger.info("Monitoring gestoppt")
+                break
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Name Resolver - Hostnamen für Hosts ohne sysName (Konsolen, Clients, Geräte ohne SNMP).
+Reverse-DNS (PTR) für viele Adressen gleichzeitig über einen UDP-Socket, Ergebnisse
+mit TTL im Cache (auch negative), sodass jede Adresse nur einmal pro TTL abgefragt
+wird. Optional lauscht ein passiver Listener auf mDNS- und NetBIOS-Ankündigungen.
+"""
+
+import time
+import random
+import select
+import socket
+import struct
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+DNS_PORT = 53
+MDNS_GROUP = "224.0.0.251"
+MDNS_PORT = 5353
+NETBIOS_PORT = 137
+
+TYPE_A = 1
+TYPE_PTR = 12
+TYPE_NB = 32
+RCODE_NXDOMAIN = 3
+
+# Quellen in absteigender Priorität: ein PTR-Name wird nicht von einer Ankündigung überschrieben
+SOURCE_PRIORITY = {"dns": 3, "mdns": 2, "netbios": 1}
+
+HEADER = struct.Struct("!HHHHHH")
+RR = struct.Struct("!HHIH")
+
+
+# ============================================================================
+# DNS-Wire-Format (RFC 1035; mDNS und NetBIOS-NS verwenden dasselbe Format)
+# ============================================================================
+
+def ptr_name(ip: str) -> str:
+    return ".".join(reversed(ip.split("."))) + ".in-addr.arpa"
+
+
+def encode_name(name: str) -> bytes:
+    return b"".join(bytes([len(label)]) + label for label in (p.encode("ascii") for p in name.split(".") if p)) + b"\x00"
+
+
+def build_ptr_query(query_id: int, ip: str) -> bytes:
+    return HEADER.pack(query_id, 0x0100, 1, 0, 0, 0) + encode_name(ptr_name(ip)) + struct.pack("!HH", TYPE_PTR, 1)
+
+
+def read_name(packet: bytes, offset: int) -> Tuple[str, int]:
+    """Liest einen (ggf. komprimierten) Namen; liefert (Name, Offset danach)"""
+    labels = []
+    end = None
+    for _ in range(128):
+        length = packet[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | packet[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(packet[offset:offset + length].decode("utf-8", "replace"))
+        offset += length
+    return ".".join(labels), end if end is not None else offset
+
+
+def parse_message(packet: bytes) -> Tuple[int, int, List[Tuple[str, int, int, int, bytes, int]]]:
+    """(ID, Flags, Records) mit Records = (Name, Typ, TTL, Klasse, RDATA, RDATA-Offset) aus allen Sektionen"""
+    query_id, flags, qdcount, ancount, nscount, arcount = HEADER.unpack_from(packet, 0)
+    offset = HEADER.size
+    for _ in range(qdcount):
+        _, offset = read_name(packet, offset)
+        offset += 4
+    records = []
+    for _ in range(ancount + nscount + arcount):
+        name, offset = read_name(packet, offset)
+        rtype, rclass, ttl, length = RR.unpack_from(packet, offset)
+        offset += RR.size
+        records.append((name, rtype, ttl, rclass, packet[offset:offset + length], offset))
+        offset += length
+    return query_id, flags, records
+
+
+def decode_netbios_name(encoded: str) -> Tuple[str, int]:
+    """First-Level-Encoding (32 Zeichen A-P) -> (Name, Suffix-Byte)"""
+    raw = bytes(((ord(encoded[i]) - 65) << 4) | (ord(encoded[i + 1]) - 65) for i in range(0, 32, 2))
+    return raw[:15].decode("ascii", "replace").strip(), raw[15]
+
+
+def system_nameservers() -> List[str]:
+    """IPv4-Nameserver aus /etc/resolv.conf (leer auf Systemen ohne resolv.conf)"""
+    servers = []
+    try:
+        with open("/etc/resolv.conf") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    try:
+                        socket.inet_aton(parts[1])
+                        servers.append(parts[1])
+                    except OSError:
+                        continue
+    except OSError:
+        pass
+    return servers
+
+
+class NameResolver:
+    """PTR-Lookups mit TTL-Cache plus optionaler passiver mDNS/NetBIOS-Listener (name_resolution-Block)"""
+
+    def __init__(self, config: Dict[str, Any]):
+        resolver_config = config.get("name_resolution", {})
+        self.servers: List[str] = resolver_config.get("servers") or system_nameservers()
+        self.timeout = resolver_config.get("timeout", 1.0)
+        self.retries = resolver_config.get("retries", 1)
+        self.max_outstanding = resolver_config.get("max_outstanding", 256)
+        # TTLs werden begrenzt: kurze TTLs würden jede Adresse in jedem Zyklus neu abfragen
+        self.min_ttl = resolver_config.get("min_ttl", 300)
+        self.max_ttl = resolver_config.get("max_ttl", 86400)
+        self.negative_ttl = resolver_config.get("negative_ttl", 900)
+        self.strip_domain = resolver_config.get("strip_domain", True)
+        self.passive = resolver_config.get("passive", {"mdns": True, "netbios": False})
+
+        # ip -> (Name oder None, Quelle, gültig bis)
+        self.cache: Dict[str, Tuple[Optional[str], str, float]] = {}
+        self._lock = threading.Lock()
+        self._query_id = random.randrange(0x10000)
+        self._listener: Optional[threading.Thread] = None
+        self._deadline: Optional[float] = None
+        self.lookups = 0
+
+    def _clean(self, name: str) -> str:
+        name = name.rstrip(".")
+        if name.lower().endswith(".local"):
+            name = name[:-6]
+        if self.strip_domain and "." in name:
+            name = name.split(".", 1)[0]
+        return name
+
+    def _store(self, ip: str, name: Optional[str], source: str, ttl: float):
+        now = time.time()
+        ttl = self.negative_ttl if name is None else min(self.max_ttl, max(self.min_ttl, ttl))
+        with self._lock:
+            current = self.cache.get(ip)
+            if current and current[0] and current[2] > now and name is not None and \
+                    SOURCE_PRIORITY[current[1]] > SOURCE_PRIORITY[source]:
+                return
+            if current and current[0] and current[2] > now and name is None:
+                # Kein PTR-Eintrag: ein angekündigter Name bleibt gültig
+                return
+            self.cache[ip] = (self._clean(name) if name else None, source, now + ttl)
+
+    def name(self, ip: str) -> Optional[str]:
+        """Bekannter Name aus dem Cache (blockiert nie; abgelaufene Namen gelten bis zur Erneuerung)"""
+        entry = self.cache.get(ip)
+        return entry[0] if entry else None
+
+    def source(self, ip: str) -> Optional[str]:
+        entry = self.cache.get(ip)
+        return entry[1] if entry and entry[0] else None
+
+    def resolve(self, ips: List[str], deadline: Optional[float] = None) -> Dict[str, str]:
+        """Fragt alle Adressen ohne gültigen Cache-Eintrag ab (bis zur Deadline, monotonic); liefert bekannte Namen"""
+        now = time.time()
+        missing = [ip for ip in ips if ip not in self.cache or self.cache[ip][2] <= now]
+        if missing:
+            self.lookups += len(missing)
+            self._deadline = deadline
+            for ip, (name, ttl) in self.lookup(missing).items():
+                self._store(ip, name, "dns", ttl)
+        return {ip: self.cache[ip][0] for ip in ips if ip in self.cache and self.cache[ip][0]}
+
+    def lookup(self, ips: List[str]) -> Dict[str, Tuple[Optional[str], float]]:
+        """PTR-Abfrage ohne Cache: ip -> (Name oder None, TTL); unbeantwortete Adressen fehlen"""
+        if self.servers:
+            return self._lookup_ptr(ips, self._deadline)
+        return self._lookup_blocking(ips, self._deadline)
+
+    def _next_id(self) -> int:
+        self._query_id = (self._query_id + 1) & 0xFFFF
+        return self._query_id
+
+    def _lookup_ptr(self, ips: List[str], deadline: Optional[float]) -> Dict[str, Tuple[Optional[str], float]]:
+        """Alle PTR-Anfragen über einen nicht-blockierenden Socket, höchstens max_outstanding gleichzeitig"""
+        results: Dict[str, Tuple[Optional[str], float]] = {}
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        queue = deque((ip, 0) for ip in ips)
+        # Query-ID -> (ip, gesendet, Versuch)
+        outstanding: Dict[int, Tuple[str, float, int]] = {}
+        try:
+            while queue or outstanding:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    logger.debug(f"Namensauflösung: Deadline erreicht, {len(queue) + len(outstanding)} offen")
+                    break
+
+                while queue and len(outstanding) < self.max_outstanding:
+                    ip, attempt = queue.popleft()
+                    query_id = self._next_id()
+                    server = self.servers[attempt % len(self.servers)]
+                    try:
+                        sock.sendto(build_ptr_query(query_id, ip), (server, DNS_PORT))
+                    except OSError as e:
+                        logger.debug(f"PTR-Anfrage für {ip} an {server} fehlgeschlagen: {e}")
+                        continue
+                    outstanding[query_id] = (ip, now, attempt)
+
+                wait_time = 0.05 if deadline is None else max(0.0, min(0.05, deadline - now))
+                readable, _, _ = select.select([sock], [], [], wait_time)
+                while readable:
+                    try:
+                        packet, _ = sock.recvfrom(4096)
+                    except BlockingIOError:
+                        break
+                    self._handle_ptr_response(packet, outstanding, results)
+
+                now = time.monotonic()
+                for query_id, (ip, sent, attempt) in list(outstanding.items()):
+                    if now - sent >= self.timeout:
+                        del outstanding[query_id]
+                        if attempt < self.retries:
+                            queue.append((ip, attempt + 1))
+                        else:
+                            results[ip] = (None, 0)
+        finally:
+            sock.close()
+        return results
+
+    def _handle_ptr_response(self, packet: bytes, outstanding: Dict[int, Tuple[str, float, int]],
+                             results: Dict[str, Tuple[Optional[str], float]]):
+        try:
+            query_id, _, records = parse_message(packet)
+        except (IndexError, struct.error):
+            return
+        pending = outstanding.pop(query_id, None)
+        if pending is None:
+            return
+        ip = pending[0]
+        expected = ptr_name(ip).lower()
+        for name, rtype, ttl, _, _, rdata_offset in records:
+            if rtype == TYPE_PTR and name.lower() == expected:
+                # RDATA-Namen können auf das ganze Paket zeigen (Kompression)
+                results[ip] = (read_name(packet, rdata_offset)[0], ttl)
+                return
+        # NXDOMAIN oder keine Antwort: negativ cachen
+        results[ip] = (None, 0)
+
+    def _lookup_blocking(self, ips: List[str], deadline: Optional[float]) -> Dict[str, Tuple[Optional[str], float]]:
+        """Ohne bekannten Nameserver: gethostbyaddr parallel im Thread-Pool (TTL unbekannt, max_ttl)"""
+        results: Dict[str, Tuple[Optional[str], float]] = {}
+
+        def lookup(ip: str):
+            try:
+                results[ip] = (socket.gethostbyaddr(ip)[0], self.max_ttl)
+            except (socket.herror, socket.gaierror, OSError):
+                results[ip] = (None, 0)
+
+        executor = ThreadPoolExecutor(max_workers=min(32, len(ips)), thread_name_prefix="resolve")
+        futures = [executor.submit(lookup, ip) for ip in ips]
+        wait(futures, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+        executor.shutdown(wait=False, cancel_futures=True)
+        return dict(results)
+
+    # ========================================================================
+    # Passiver Listener: mDNS-Antworten und NetBIOS-Registrierungen
+    # ========================================================================
+
+    def start(self):
+        """Startet den passiven Listener (Daemon-Thread), falls konfiguriert"""
+        sockets = []
+        if self.passive.get("mdns", False):
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                if hasattr(socket, "SO_REUSEPORT"):
+                    # Neben avahi/mDNSResponder auf demselben Port
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+                sock.bind(("", MDNS_PORT))
+                membership = socket.inet_aton(MDNS_GROUP) + socket.inet_aton("0.0.0.0")
+                sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+                sockets.append((sock, "mdns"))
+            except OSError as e:
+                logger.warning(f"mDNS-Listener nicht verfügbar: {e}")
+        if self.passive.get("netbios", False):
+            try:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind(("", NETBIOS_PORT))
+                sockets.append((sock, "netbios"))
+            except OSError as e:
+                logger.warning(f"NetBIOS-Listener nicht verfügbar (Port {NETBIOS_PORT} benötigt root): {e}")
+        if not sockets:
+            return
+
+        self._listener = threading.Thread(target=self._listen, args=(sockets,), name="name-listener", daemon=True)
+        self._listener.start()
+        logger.info(f"Passive Namensauflösung: {', '.join(source for _, source in sockets)}")
+
+    def _listen(self, sockets: List[Tuple[socket.socket, str]]):
+        sources = {sock: source for sock, source in sockets}
+        while True:
+            readable, _, _ = select.select(list(sources), [], [])
+            for sock in readable:
+                try:
+                    packet, (sender, _) = sock.recvfrom(9000)
+                    if sources[sock] == "mdns":
+                        self._handle_mdns(packet)
+                    else:
+                        self._handle_netbios(packet, sender)
+                except (OSError, IndexError, ValueError, struct.error):
+                    continue
+
+    def _handle_mdns(self, packet: bytes):
+        _, flags, records = parse_message(packet)
+        if not flags & 0x8000:
+            return
+        for name, rtype, ttl, _, rdata, _ in records:
+            if rtype == TYPE_A and len(rdata) == 4 and ttl > 0:
+                self._store(socket.inet_ntoa(rdata), name, "mdns", ttl)
+
+    def _handle_netbios(self, packet: bytes, sender: str):
+        _, flags, _, _, _, arcount = HEADER.unpack_from(packet, 0)
+        # Registrierung (Opcode 5) bzw. Refresh (8/9) mit der eigenen Adresse im Additional-Record
+        if (flags >> 11) & 0x0F not in (5, 8, 9) or not arcount:
+            return
+        _, _, records = parse_message(packet)
+        for encoded, rtype, ttl, _, rdata, _ in records:
+            if rtype != TYPE_NB or len(rdata) < 6 or len(encoded) != 32:
+                continue
+            name, suffix = decode_netbios_name(encoded)
+            group = rdata[0] & 0x80
+            # Nur Rechnernamen (Workstation/Server), keine Gruppen/Domänen
+            if suffix in (0x00, 0x20) and not group and name:
+                self._store(socket.inet_ntoa(rdata[2:6]), name, "netbios", ttl or self.min_ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        named = sum(1 for entry in self.cache.values() if entry[0])
+        return {"cached": len(self.cache), "named": named, "lookups": self.lookups}
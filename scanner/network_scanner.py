@@ -5,32 +5,35 @@ Scannt das lokale Netzwerk via SNMP und ntopng, sendet Daten an die Edge Functio
 """
 
 import os
+import re
 import sys
+import math
 import json
 import time
 import socket
 import struct
 import logging
 import argparse
+import importlib
+import ipaddress
 import threading
 import subprocess
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-try:
-    import requests
-except ImportError:
-    print("Installing requests...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "requests"])
-    import requests
-
-try:
-    from pysnmp.hlapi import *
-except ImportError:
-    print("Installing pysnmp...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "pysnmp"])
-    from pysnmp.hlapi import *
+from typing import Dict, List, Optional, Any, Tuple, Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from alert_engine import AlertEngine, DEFAULT_THRESHOLDS as ALERT_DEFAULT_THRESHOLDS
+from baselines import BaselineTracker
+from collectors import CollectorScheduler
+from concurrency import ConcurrencyController
+from interface_selection import InterfaceSelector, chunk_oids
+from payload_encoding import PayloadEncoder
+from scheduler import CycleScheduler, DeadlineStage
+from top_talkers import HostRateTracker, host_bytes
+from snmp_profile import (
+    SnmpProfile, SnmpProfileStore, COUNTERS_HC, COUNTERS_32BIT, COUNTERS_BOTH, parse_uptime,
+)
 
 # Logging Setup
 logging.basicConfig(
@@ -39,6 +42,57 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# ============================================================================
+# Backend Registry - Collector-Module werden erst bei Bedarf importiert
+# ============================================================================
+# name -> (Modul, Attribut). Attribut None = ganzes Modul.
+BACKENDS = {
+    "snmp": ("pysnmp.hlapi", None),
+    "snmp_client": ("snmp_client", "SnmpClient"),
+    "http": ("requests", None),
+    "tcp_probe": ("tcp_probe", "TcpProber"),
+    "snmp_traps": ("snmp_traps", "TrapReceiver"),
+    "local_api": ("local_api", "LocalApiServer"),
+    "shared_snapshot": ("shared_snapshot", "SnapshotWriter"),
+    "name_resolver": ("name_resolver", "NameResolver"),
+    "oui_index": ("oui_index", "OuiIndex"),
+    "msgpack": ("msgpack", "packb"),
+    "cbor": ("cbor2", "dumps"),
+    "trace": ("collector_trace", None),
+    "multi_site": ("multi_site", None),
+}
+
+# Pip-Paket für fehlende Drittanbieter-Backends
+BACKEND_PACKAGES = {
+    "snmp": "pysnmp",
+    "http": "requests",
+    "msgpack": "msgpack",
+    "cbor": "cbor2",
+}
+
+_loaded_backends: Dict[str, Any] = {}
+_backend_lock = threading.Lock()
+
+
+def load_backend(name: str) -> Any:
+    """Importiert ein Backend beim ersten Zugriff (pysnmp lädt z.B. seine MIB-Maschinerie)"""
+    backend = _loaded_backends.get(name)
+    if backend is not None:
+        return backend
+
+    with _backend_lock:
+        if name not in _loaded_backends:
+            module_name, attribute = BACKENDS[name]
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                package = BACKEND_PACKAGES.get(name, module_name)
+                logger.error(f"Backend '{name}' nicht verfügbar - bitte installieren: pip install {package}")
+                raise
+            _loaded_backends[name] = getattr(module, attribute) if attribute else module
+            logger.debug(f"Backend geladen: {name} ({module_name})")
+    return _loaded_backends[name]
+
 # ============================================================================
 # SNMP OID Database - Automatisch für verschiedene Gerätetypen
 # ============================================================================
@@ -81,8 +135,62 @@ SNMP_OIDS = {
         "udpInDatagrams": "1.3.6.1.2.1.7.1.0",
         "udpOutDatagrams": "1.3.6.1.2.1.7.4.0",
     },
+    # ARP/Neighbour-Tabellen (IP-MIB)
+    "arp": {
+        "ipNetToMediaPhysAddress": "1.3.6.1.2.1.4.22.1.2",
+        "ipNetToMediaType": "1.3.6.1.2.1.4.22.1.4",
+        "ipNetToPhysicalPhysAddress": "1.3.6.1.2.1.4.35.1.4",
+        "ipNetToPhysicalType": "1.3.6.1.2.1.4.35.1.6",
+    },
+    # WLAN-Stationen der Ubiquiti-APs (UBNT-MIB ubntStaTable, Index = ifIndex.MAC)
+    "wifi_stations": {
+        "staName": "1.3.6.1.4.1.41112.1.4.7.1.2",
+        "staSignal": "1.3.6.1.4.1.41112.1.4.7.1.3",
+        "staLastIp": "1.3.6.1.4.1.41112.1.4.7.1.10",
+        "staTxRate": "1.3.6.1.4.1.41112.1.4.7.1.11",
+        "staRxRate": "1.3.6.1.4.1.41112.1.4.7.1.12",
+        "staTxBytes": "1.3.6.1.4.1.41112.1.4.7.1.13",
+        "staRxBytes": "1.3.6.1.4.1.41112.1.4.7.1.14",
+    },
 }
 
+# Einheit der Stationsraten -> Teiler auf Mbps
+RATE_UNITS = {"bps": 1_000_000, "kbps": 1000, "mbps": 1}
+
+# RTT einer ping-Antwort: time=0.45 ms (Linux/Mac), time=1ms / time<1ms (Windows)
+PING_RTT = re.compile(r"time[=<]([\d.]+) ?ms")
+
+# ipNetToMediaType / ipNetToPhysicalType: 2 = invalid
+ARP_TYPE_INVALID = "2"
+
+# Kernel-Nachbartabelle (IPv4): IP, HW type, Flags, MAC, Mask, Device; Flag 0x2 = vollständig
+NEIGHBOUR_TABLE = "/proc/net/arp"
+
+# Latenz eines neuen Ziels, dessen Messung die Latenz-Deadline verpasst hat (kein Messwert)
+LATENCY_NOT_MEASURED = {"avg": None, "min": None, "max": None, "loss": None}
+
+# Geräteklassen aus dem OUI-Index, die als Konsole gemessen werden
+CONSOLE_LABELS = {
+    "nintendo": "Nintendo",
+    "playstation": "PlayStation",
+    "xbox": "Xbox",
+}
+
+
+def format_mac(value: Optional[str]) -> Optional[str]:
+    """Normalisiert eine SNMP-PhysAddress (0x-Hex oder Rohbytes) zu aa:bb:cc:dd:ee:ff"""
+    if not value:
+        return None
+    if value.startswith("0x"):
+        raw = bytes.fromhex(value[2:])
+    elif len(value) == 17 and value.count(":") == 5:
+        return value.lower()
+    else:
+        raw = value.encode("latin-1", errors="ignore")
+    if len(raw) != 6 or raw == b"\0" * 6:
+        return None
+    return ":".join(f"{b:02x}" for b in raw)
+
 # Vendor-spezifische OIDs
 VENDOR_OIDS = {
     "cisco": {
@@ -111,7 +219,15 @@ VENDOR_OIDS = {
 # ntopng API Client
 # ============================================================================
 class NtopngClient:
-    """Client für ntopng REST API Integration"""
+    """Client für ntopng REST API Integration (mehrere Instanzen und Interfaces)"""
+
+    # Zähler, die über alle Interfaces summiert werden
+    SUMMED_FIELDS = (
+        "bytes", "bytes_download", "bytes_upload", "packets", "packets_download", "packets_upload",
+        "local2remote", "remote2local", "num_hosts", "num_local_hosts", "num_devices", "num_flows",
+        "engaged_alerts", "engaged_alerts_error", "engaged_alerts_warning", "engaged_alerts_notice",
+        "alerted_flows", "alerted_flows_error", "alerted_flows_warning", "dropped_alerts",
+    )
 
     def __init__(self, config: Dict[str, Any]):
         ntop_config = config.get("ntopng", {})
@@ -120,68 +236,225 @@ class NtopngClient:
         self.interface_id = ntop_config.get("interface_id", 1)
         self.username = ntop_config.get("username", "")
         self.password = ntop_config.get("password", "")
-        self.session = requests.Session()
+        # Uplink-Kapazität, falls ntopng keine Interface-Geschwindigkeit liefert
+        self.wan_capacity_gbps = ntop_config.get("wan_capacity_gbps", 10.0)
+        # host/active.lua ist paginiert (Standard: 10 Zeilen): Zeilen pro Seite und Obergrenze pro Interface
+        self.hosts_per_page = ntop_config.get("hosts_per_page", 1000)
+        self.max_hosts = ntop_config.get("max_hosts", 10000)
+
+        # Ohne "instances" gilt die bisherige Einzel-Konfiguration (ein WAN-Interface)
+        self.instances: List[Dict[str, Any]] = ntop_config.get("instances") or [{
+            "name": "ntopng",
+            "url": self.base_url,
+            "username": self.username,
+            "password": self.password,
+            "interfaces": [{"id": self.interface_id, "role": "wan"}],
+        }]
+        # (Instanz, ifid, Rolle) für jeden Abruf
+        self.targets: List[Tuple[Dict[str, Any], Any, str]] = [
+            (instance, interface["id"], interface.get("role", "lan"))
+            for instance in self.instances
+            for interface in instance.get("interfaces", [{"id": 1, "role": "wan"}])
+        ]
+        self._sessions: Dict[str, Any] = {}
+        self._sessions_lock = threading.Lock()
+        # Ein Pool für alle Abrufe (Threads entstehen erst beim ersten Abruf), nur bei mehreren Interfaces
+        self._executor = (ThreadPoolExecutor(max_workers=len(self.targets), thread_name_prefix="ntopng")
+                          if len(self.targets) > 1 else None)
+        self.interface_data: Dict[str, Dict[str, Any]] = {}
+        self.last_hosts: Optional[List[Dict]] = None
         self.last_data: Optional[Dict] = None
         self.last_fetch_time: float = 0
 
-    def fetch_interface_data(self) -> Optional[Dict]:
-        """Holt Interface-Daten von ntopng REST API"""
-        if not self.enabled:
-            return None
-
+    def session(self, instance: Dict[str, Any]):
+        """HTTP-Session pro Instanz (Verbindungspool für alle ihre Interfaces), erst bei Bedarf erzeugt"""
+        name = instance.get("name", instance["url"])
+        with self._sessions_lock:
+            session = self._sessions.get(name)
+            if session is None:
+                requests = load_backend("http")
+                session = requests.Session()
+                pool_size = max(1, len(instance.get("interfaces", [])))
+                session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=pool_size))
+                session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=pool_size))
+                if instance.get("username") and instance.get("password"):
+                    session.auth = (instance["username"], instance["password"])
+                self._sessions[name] = session
+            return session
+
+    def _get(self, instance: Dict[str, Any], path: str, ifid: Any,
+             params: Optional[Dict[str, Any]] = None, deadline: Optional[float] = None) -> Optional[Any]:
+        """GET auf die ntopng REST API einer Instanz; rsp oder None (auch nach der deadline)"""
+        requests = load_backend("http")
+        name = instance.get("name", instance["url"])
+        timeout = 5.0
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                logger.debug(f"ntopng-Abruf übersprungen ({name}, ifid={ifid}): Deadline erreicht")
+                return None
         try:
-            url = f"{self.base_url}/lua/rest/v2/get/interface/data.lua"
-            params = {"ifid": self.interface_id}
-
-            auth = None
-            if self.username and self.password:
-                auth = (self.username, self.password)
-
-            response = self.session.get(url, params=params, auth=auth, timeout=5)
-
+            response = self.session(instance).get(f"{instance['url']}{path}", params={"ifid": ifid, **(params or {})},
+                                                  timeout=timeout)
             if response.status_code == 200:
                 data = response.json()
                 if data.get("rc") == 0:
-                    self.last_data = data.get("rsp", {})
-                    self.last_fetch_time = time.time()
-                    logger.debug(f"ntopng Daten abgerufen: {len(self.last_data)} Felder")
-                    return self.last_data
-                else:
-                    logger.warning(f"ntopng API Fehler: {data.get('rc_str', 'Unknown')}")
+                    return data.get("rsp")
+                logger.warning(f"ntopng API Fehler ({name}, ifid={ifid}): {data.get('rc_str', 'Unknown')}")
             else:
-                logger.warning(f"ntopng HTTP Fehler: {response.status_code}")
-
+                logger.warning(f"ntopng HTTP Fehler ({name}, ifid={ifid}): {response.status_code}")
         except requests.exceptions.ConnectionError:
-            logger.debug("ntopng nicht erreichbar")
+            logger.debug(f"ntopng nicht erreichbar: {name}")
         except Exception as e:
-            logger.error(f"ntopng Fehler: {e}")
+            logger.error(f"ntopng Fehler ({name}): {e}")
+        return None
 
-        return self.last_data
+    def _fetch_all(self, path: str, fetch: Optional[Callable[..., Any]] = None,
+                   deadline: Optional[float] = None) -> List[Tuple[Dict[str, Any], Any, str, Any]]:
+        """Fragt alle Instanzen/Interfaces parallel ab (eine Runde statt N serieller Abrufe)"""
+        fetch = fetch or self._get
+        if self._executor is None:
+            return [(instance, ifid, role, fetch(instance, path, ifid, deadline=deadline))
+                    for instance, ifid, role in self.targets]
+        futures = [(t, self._executor.submit(fetch, t[0], path, t[1], deadline=deadline)) for t in self.targets]
+        return [(instance, ifid, role, future.result()) for (instance, ifid, role), future in futures]
+
+    def _get_pages(self, instance: Dict[str, Any], path: str, ifid: Any,
+                   deadline: Optional[float] = None) -> Optional[List[Dict]]:
+        """Alle Seiten einer paginierten Liste (größter Durchsatz zuerst, bis max_hosts); None ohne Antwort"""
+        rows: List[Dict] = []
+        page = 1
+        while len(rows) < self.max_hosts:
+            rsp = self._get(instance, path, ifid, {
+                "currentPage": page, "perPage": self.hosts_per_page, "sortColumn": "thpt", "sortOrder": "desc",
+            }, deadline=deadline)
+            if rsp is None:
+                # Abbruch mitten in der Liste: die bisherigen Seiten gelten
+                return rows if page > 1 else None
+            if not isinstance(rsp, dict):
+                # Ältere Versionen liefern die Liste ungeteilt
+                return rsp
+            entries = rsp.get("data", [])
+            rows.extend(entries)
+            if not entries or len(rows) >= int(rsp.get("totalRows", 0) or 0):
+                break
+            page += 1
+        return rows[:self.max_hosts]
 
-    def fetch_hosts(self) -> Optional[List[Dict]]:
-        """Holt Host-Liste von ntopng"""
+    def fetch_interface_data(self, deadline: Optional[float] = None) -> Optional[Dict]:
+        """Holt Interface-Daten aller konfigurierten ntopng-Interfaces und führt sie zusammen"""
         if not self.enabled:
             return None
+        self.store_interface_data(self.read_interface_data(deadline))
+        return self.last_data
 
-        try:
-            url = f"{self.base_url}/lua/rest/v2/get/host/active.lua"
-            params = {"ifid": self.interface_id}
-
-            auth = None
-            if self.username and self.password:
-                auth = (self.username, self.password)
+    def read_interface_data(self, deadline: Optional[float] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Interface-Daten pro "Instanz:ifid" ohne den Client-Zustand zu ändern; None ohne Antwort"""
+        fresh = {}
+        for instance, ifid, role, rsp in self._fetch_all("/lua/rest/v2/get/interface/data.lua", deadline=deadline):
+            if isinstance(rsp, dict):
+                fresh[f"{instance.get('name', instance['url'])}:{ifid}"] = {**rsp, "_role": role}
+        return fresh or None
+
+    def store_interface_data(self, fresh: Optional[Dict[str, Dict[str, Any]]]):
+        """Übernimmt read_interface_data (ohne Antwort bleiben die letzten Daten gültig)"""
+        if fresh:
+            self.interface_data = fresh
+            self.last_data = self.merge_interfaces(fresh)
+            self.last_fetch_time = time.time()
+            logger.debug(f"ntopng Daten abgerufen: {len(fresh)}/{len(self.targets)} Interfaces")
+
+    def merge_interfaces(self, interfaces: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Führt Interface-Daten zusammen: Zähler summiert, Throughput nur über WAN-Interfaces
+        (sonst zählt derselbe Verkehr auf WAN und VLAN doppelt).
+        """
+        datas = list(interfaces.values())
+        wan = [d for d in datas if d["_role"] == "wan"] or datas
+        merged: Dict[str, Any] = dict(datas[0])
+        for field in self.SUMMED_FIELDS:
+            merged[field] = sum(d.get(field, 0) or 0 for d in datas)
+
+        throughput = {"download": {"bps": 0, "pps": 0}, "upload": {"bps": 0, "pps": 0}}
+        for d in wan:
+            for direction in ("download", "upload"):
+                for unit in ("bps", "pps"):
+                    throughput[direction][unit] += d.get("throughput", {}).get(direction, {}).get(unit, 0) or 0
+        merged["throughput"] = throughput
+        merged["throughput_bps"] = sum(d.get("throughput_bps", 0) or 0 for d in wan)
+        merged["throughput_pps"] = sum(d.get("throughput_pps", 0) or 0 for d in wan)
+        merged["speed"] = sum(d.get("speed", 0) or 0 for d in wan)
+
+        tcp = {}
+        for d in datas:
+            for key, value in d.get("tcpPacketStats", {}).items():
+                tcp[key] = tcp.get(key, 0) + (value or 0)
+        merged["tcpPacketStats"] = tcp
+        return merged
+
+    def get_role_throughput(self, role: str) -> Optional[Dict[str, float]]:
+        """Summierter Throughput (bps) aller Interfaces einer Rolle; None wenn keines konfiguriert"""
+        datas = [d for d in self.interface_data.values() if d["_role"] == role]
+        if not datas:
+            return None
+        return {
+            "download_bps": sum(d.get("throughput", {}).get("download", {}).get("bps", 0) or 0 for d in datas),
+            "upload_bps": sum(d.get("throughput", {}).get("upload", {}).get("bps", 0) or 0 for d in datas),
+        }
 
-            response = self.session.get(url, params=params, auth=auth, timeout=5)
+    def get_wan_capacity_gbps(self) -> float:
+        """Uplink-Kapazität aus den WAN-Interface-Geschwindigkeiten (ntopng: Mbps), sonst Config"""
+        speed_mbps = (self.last_data or {}).get("speed", 0) or 0
+        return speed_mbps / 1000 if speed_mbps > 0 else self.wan_capacity_gbps
 
-            if response.status_code == 200:
-                data = response.json()
-                if data.get("rc") == 0:
-                    return data.get("rsp", [])
+    def get_interface_breakdown(self) -> Dict[str, Dict[str, Any]]:
+        """Throughput pro ntopng-Interface (für das Dashboard)"""
+        return {
+            key: {
+                "name": d.get("ifname", ""),
+                "role": d["_role"],
+                "download_bps": d.get("throughput", {}).get("download", {}).get("bps", 0),
+                "upload_bps": d.get("throughput", {}).get("upload", {}).get("bps", 0),
+                "speed_mbps": d.get("speed", 0),
+            }
+            for key, d in self.interface_data.items()
+        }
 
-        except Exception as e:
-            logger.debug(f"ntopng Hosts Fehler: {e}")
+    def describe(self) -> str:
+        """Konfigurierte Instanzen/Interfaces für Log-Ausgaben"""
+        return ", ".join(f"{instance['url']} (ifid={ifid}, {role})" for instance, ifid, role in self.targets)
 
-        return None
+    def fetch_hosts(self) -> Optional[List[Dict]]:
+        """Holt Host-Liste von allen ntopng-Interfaces (ein Eintrag pro IP)"""
+        if not self.enabled:
+            return None
+        self.last_hosts = self.read_hosts()
+        return self.last_hosts
+
+    def read_hosts(self, deadline: Optional[float] = None) -> Optional[List[Dict]]:
+        """
+        Host-Liste aller Interfaces ohne den Client-Zustand zu ändern; None ohne Antwort.
+        Sieht mehr als ein Interface denselben Host, gilt pro Richtung der größte Byte-Zähler:
+        derselbe Verkehr auf WAN und VLAN zählt nicht doppelt, und das Maximum bleibt monoton.
+        """
+        hosts: Dict[str, Dict] = {}
+        answered = False
+        for _, _, _, entries in self._fetch_all("/lua/rest/v2/get/host/active.lua", self._get_pages, deadline):
+            if entries is None:
+                continue
+            answered = True
+            for h in entries:
+                if not isinstance(h, dict):
+                    continue
+                ip = h.get("ip", h.get("host", ""))
+                known = hosts.get(ip)
+                if known is None:
+                    hosts[ip] = h
+                    continue
+                sent, rcvd = host_bytes(h)
+                known_sent, known_rcvd = host_bytes(known)
+                hosts[ip] = {**known, "bytes_sent": max(sent, known_sent), "bytes_rcvd": max(rcvd, known_rcvd)}
+        return list(hosts.values()) if answered else None
 
     def get_throughput(self) -> Dict[str, float]:
         """Extrahiert Throughput-Daten aus ntopng"""
@@ -302,23 +575,130 @@ class NtopngClient:
 class NetworkScanner:
     """Scannt das Netzwerk und sammelt SNMP-Daten"""
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], shared: Optional[Any] = None):
         self.config = config
+        # Multi-Site: gemeinsame Pools, SNMP-Client und Session (multi_site.SharedPools)
+        self.shared = shared
+        self.site_name = config.get("name", "default")
         self.api_url = config.get("api_url", "https://oeckplemwzzzjikvwxkb.supabase.co/functions/v1")
         self.api_key = config.get("api_key", "")
         self.snmp_community = config.get("snmp_community", "public")
         self.snmp_version = config.get("snmp_version", 2)
         self.scan_interval = config.get("scan_interval", 30)
         self.timeout = config.get("timeout", 2)
+        # "builtin" = eigener multiplexter Client, "pysnmp" = hlapi-Fallback
+        self.snmp_transport = config.get("snmp_transport", "builtin")
+        self.snmp_workers = config.get("snmp_workers", 64 if self.snmp_transport == "builtin" else 10)
+        self.snmp_max_repetitions = config.get("snmp_max_repetitions", 25)
+        # AIMD-Fenster und Paketraten statt fester Worker-Zahlen
+        self.snmp_concurrency = None
+        self.ping_concurrency = None
+        if shared is not None:
+            self.snmp_concurrency = shared.snmp_concurrency
+            self.ping_concurrency = shared.ping_concurrency
+        elif config.get("adaptive_concurrency", {}).get("enabled", True):
+            self.snmp_concurrency = ConcurrencyController(config, "snmp")
+            self.ping_concurrency = ConcurrencyController(config, "ping")
+        self._snmp_client = None
+        self._snmp_client_lock = threading.Lock()
+        # Gelernte Fähigkeiten pro Gerät (Version, HC-Counter, Vendor-OIDs, GETBULK-Größe)
+        self.snmp_profiles = SnmpProfileStore(config)
+        # Auswahl der gepollten Interfaces (ifType/ifDescr/ifIndex-Regeln)
+        self.interface_selector = InterfaceSelector(config)
+        # Fester Takt und Deadlines pro Stufe; unfertige Arbeit wandert in den nächsten Zyklus
+        self.scheduler = CycleScheduler(config, self.scan_interval)
+        self.latency_workers = config.get("scheduler", {}).get("latency_workers", 16)
+        self._stages: Dict[str, DeadlineStage] = {}
+        self._partial: set = set()
+        self._last_active: set = set()
+        # Latenz pro (ip, count, device_class): letzter Messwert, in diesem Zyklus gemessen, angefragt
+        self._latency_cache: Dict[Tuple, Dict[str, float]] = {}
+        self._latency_fresh: set = set()
+        self._latency_wanted: set = set()
+        # Alle Datenquellen (SNMP, ICMP, ntopng, Plugins) laufen über einen Scheduler
+        self.collectors = CollectorScheduler(self, config)
+        self.collected: Dict[str, Any] = {}
         self.devices: Dict[str, Dict] = {}
         self.last_octets: Dict[str, Dict] = {}
         self.last_scan_time: float = 0
+        # Zeitquelle für Raten-Deltas (beim Abspielen eines Traces die aufgezeichnete Zykluszeit)
+        self.clock = time.time
+        self._local_network: Optional[str] = None
+
+        # ARP-Harvest von Routern/L3-Switches als Discovery-Quelle
+        arp_config = config.get("arp_discovery", {})
+        self.arp_discovery = arp_config.get("enabled", False)
+        self.arp_routers: List[str] = arp_config.get("routers", [])
+        self.arp_verify = arp_config.get("verify", False)
+        self.arp_table: Dict[str, str] = {}
+
+        # Stationstabellen der Ubiquiti-APs (RSSI und Raten pro WLAN-Client)
+        station_config = config.get("wifi_stations", {})
+        self.station_harvest = station_config.get("enabled", False)
+        self.station_oids = {**SNMP_OIDS["wifi_stations"], **station_config.get("oids", {})}
+        self.station_rate_divisor = RATE_UNITS[station_config.get("rate_unit", "kbps").lower()]
+        self.weak_rssi = station_config.get("weak_rssi_dbm", -70)
+        self.min_station_rate = station_config.get("min_rate_mbps", 24)
+
+        # Optionaler OUI-Index: Hersteller und Geräteklasse aus der MAC (Hosts ohne SNMP)
+        self.oui_index = None
+        self.host_vendors: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        if config.get("oui", {}).get("enabled", False):
+            try:
+                self.oui_index = load_backend("oui_index")(config)
+                logger.info(f"OUI-Index: {len(self.oui_index)} Präfixe ({self.oui_index.path})")
+            except (OSError, ValueError) as e:
+                logger.warning(f"OUI-Index nicht verfügbar: {e}")
+
+        # Upload-Format für die Edge Functions (kompaktes JSON/MessagePack/CBOR, gzip/deflate)
+        self.payload_encoder = PayloadEncoder(config)
+        self._api_session = None
 
         # ntopng Client initialisieren
         self.ntopng = NtopngClient(config)
+        # Aktuelle Raten pro Host aus den ntopng-Snapshots (Top-K im Bandwidth-Payload)
+        self.top_talkers = HostRateTracker(config)
+        # Normalverlauf pro Interface-Rate und Gaming-Latenz (Anomalie-Scores)
+        self.baselines = BaselineTracker(config)
+
+        # Schwellwert-basierte Alert-Auswertung (alert_thresholds aus der Config)
+        self.alert_engine = AlertEngine(config)
+
+        # Optionale lokale Read-API
+        self.local_api = None
+        if config.get("local_api", {}).get("enabled", False):
+            self.local_api = load_backend("local_api")(config)
+
+        # Optionaler Shared-Memory-Snapshot für lokale Tools (snapshot_reader.py)
+        self.shared_snapshot = None
+        if config.get("shared_snapshot", {}).get("enabled", False):
+            self.shared_snapshot = load_backend("shared_snapshot")(config)
+
+        # Optionale Namensauflösung (PTR, mDNS, NetBIOS) für Hosts ohne sysName
+        self.name_resolver = None
+        if config.get("name_resolution", {}).get("enabled", False):
+            self.name_resolver = load_backend("name_resolver")(config)
+
+        # Optionaler TCP-Connect-Fallback für Hosts ohne ICMP
+        self.tcp_prober = None
+        if config.get("tcp_probe", {}).get("enabled", False):
+            self.tcp_prober = load_backend("tcp_probe")(config)
+
+        # Optionaler SNMP Trap-Receiver (linkDown/linkUp/coldStart/warmStart)
+        self.trap_receiver = None
+        if config.get("snmp_traps", {}).get("enabled", False):
+            self.trap_receiver = load_backend("snmp_traps")(config, self.handle_trap_events)
+        # Per Trap gemeldete Neustarts seit der letzten Zyklus-Auswertung (restart-Alert)
+        self.trap_restarts: set = set()
+        # Trap-Ereignisse warten, bis kein Zyklus läuft (Geräte-Register gehört dem Zyklus)
+        self.trap_events: deque = deque()
+        self._cycle_lock = threading.Lock()
 
     def get_local_network(self) -> str:
-        """Ermittelt das lokale Netzwerk automatisch"""
+        """Ermittelt das lokale Netzwerk automatisch (einmal pro Prozess)"""
+        if self._local_network:
+            return self._local_network
+
         try:
             # Verbindung zu externem Host um lokale IP zu ermitteln
             s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -330,6 +710,7 @@ class NetworkScanner:
             parts = local_ip.split(".")
             subnet = f"{parts[0]}.{parts[1]}.{parts[2]}.0/24"
             logger.info(f"Lokales Netzwerk erkannt: {subnet} (Gateway: {parts[0]}.{parts[1]}.{parts[2]}.1)")
+            self._local_network = subnet
             return subnet
         except Exception as e:
             logger.error(f"Fehler beim Ermitteln des Netzwerks: {e}")
@@ -360,21 +741,56 @@ class NetworkScanner:
 
     def ping_host(self, ip: str) -> bool:
         """Prüft ob ein Host erreichbar ist"""
+        return self.ping_rtt(ip) is not None
+
+    def ping_rtt(self, ip: str) -> Optional[float]:
+        """
+        Ein Ping: ICMP-RTT in ms aus der ping-Ausgabe, None ohne Antwort.
+        NaN = Antwort, aber keine RTT in der Ausgabe (unbekanntes Format)
+        """
         try:
             param = "-n" if sys.platform == "win32" else "-c"
             timeout_param = "-w" if sys.platform == "win32" else "-W"
+            # Windows erwartet den Timeout in Millisekunden
+            timeout_value = "1000" if sys.platform == "win32" else "1"
 
             result = subprocess.run(
-                ["ping", param, "1", timeout_param, "1", ip],
+                ["ping", param, "1", timeout_param, timeout_value, ip],
                 capture_output=True,
+                text=True,
                 timeout=2
             )
-            return result.returncode == 0
+            if result.returncode != 0:
+                return None
+            # Linux/Mac: time=0.45 ms, Windows: time=1ms / time<1ms
+            match = PING_RTT.search(result.stdout)
+            return float(match.group(1)) if match else math.nan
         except:
-            return False
+            return None
 
-    def scan_network(self, subnet: Optional[str] = None) -> List[str]:
-        """Scannt das Netzwerk nach aktiven Hosts"""
+    def ping_host_paced(self, ip: str) -> bool:
+        """ping_rtt innerhalb des adaptiven Fensters und der Paketrate"""
+        controller = self.ping_concurrency
+        if controller is None:
+            return self.ping_host(ip)
+
+        controller.acquire(ip)
+        rtt = None
+        try:
+            rtt = self.ping_rtt(ip)
+        finally:
+            # Gemessen wird die ICMP-RTT, nicht die Laufzeit des ping-Prozesses
+            controller.release(ip, rtt / 1000 if rtt is not None and not math.isnan(rtt) else None,
+                               timed_out=rtt is None)
+        return rtt is not None
+
+    def scan_network(self, subnet: Optional[Any] = None) -> List[str]:
+        """Scannt das Netzwerk nach aktiven Hosts (subnet: CIDR oder Liste von CIDRs)"""
+        if isinstance(subnet, list):
+            hosts = set()
+            for cidr in subnet:
+                hosts.update(self.scan_network(cidr))
+            return sorted(hosts, key=lambda x: [int(p) for p in x.split(".")])
         if not subnet:
             subnet = self.get_local_network()
 
@@ -382,74 +798,352 @@ class NetworkScanner:
         ips = self.ip_range_from_cidr(subnet)
         active_hosts = []
 
-        with ThreadPoolExecutor(max_workers=50) as executor:
-            future_to_ip = {executor.submit(self.ping_host, ip): ip for ip in ips}
-
-            for future in as_completed(future_to_ip):
-                ip = future_to_ip[future]
-                try:
-                    if future.result():
-                        active_hosts.append(ip)
-                        logger.debug(f"Host gefunden: {ip}")
-                except Exception:
-                    pass
+        # ARP-Tabellen der Router kennen bereits jeden lebenden Host
+        if self.arp_discovery:
+            arp_hosts = self.harvest_arp_tables(subnet)
+            if arp_hosts and not self.arp_verify:
+                # Auch Hosts, die ICMP ignorieren - ganz ohne Einzel-Probes
+                logger.info(f"Gefundene Hosts (ARP): {len(arp_hosts)}")
+                return arp_hosts
+            if arp_hosts:
+                # Liveness-Check nur für die ARP-Kandidaten statt des ganzen Bereichs
+                ips = arp_hosts
+
+        workers = self.ping_concurrency.max_limit if self.ping_concurrency else 50
+        results, pending = self.stage("discovery", workers).run(
+            ips, self.ping_host_paced, self.scheduler.deadline("discovery"))
+        for ip in ips:
+            if results.get(ip):
+                active_hosts.append(ip)
+                logger.debug(f"Host gefunden: {ip}")
+
+        previous = self._last_active
+        if pending:
+            # Nicht rechtzeitig geprüfte Hosts behalten ihren Status aus dem letzten Zyklus
+            self._partial.add("discovery")
+            active_hosts.extend(ip for ip in pending if ip in previous and ip not in results)
+
+        # TCP-Fallback: Hosts, die ICMP ignorieren (Konsolen, gehärtete Hosts)
+        found = set(active_hosts)
+        silent = [ip for ip in ips if ip not in found]
+        if self.tcp_prober and self.scheduler.expired("discovery"):
+            logger.info("TCP-Probe übersprungen: Discovery-Deadline erreicht")
+            self._partial.add("discovery")
+            active_hosts.extend(ip for ip in silent if ip in previous)
+        elif self.tcp_prober:
+            tcp_hosts = self.tcp_prober.discover(silent, deadline=self.scheduler.deadline("discovery"))
+            if tcp_hosts:
+                logger.info(f"TCP-Probe: {len(tcp_hosts)} Hosts ohne ICMP-Antwort gefunden")
+            active_hosts.extend(tcp_hosts)
+            if self.scheduler.expired("discovery"):
+                # Sweep abgebrochen: nicht geprüfte Hosts behalten ihren Status
+                self._partial.add("discovery")
+                found.update(tcp_hosts)
+                active_hosts.extend(ip for ip in silent if ip in previous and ip not in found)
 
         logger.info(f"Gefundene Hosts: {len(active_hosts)}")
+        self._last_active = (previous - set(ips)) | set(active_hosts)
         return sorted(active_hosts, key=lambda x: [int(p) for p in x.split(".")])
 
+    def harvest_arp_tables(self, subnet: str) -> List[str]:
+        """Liest ipNetToMediaTable/ipNetToPhysicalTable der Router per GETBULK (IP -> MAC)"""
+        try:
+            network = ipaddress.ip_network(subnet, strict=False)
+        except ValueError:
+            return []
+
+        # Ohne Konfiguration: Gateway (.1) wie in build_infrastructure_data
+        routers = self.arp_routers or [str(network.network_address + 1)]
+        arp_oids = SNMP_OIDS["arp"]
+        hosts = set()
+
+        for router in routers:
+            media_macs, media_types, phys_macs, phys_types = self.snmp_walk_many(router, [
+                arp_oids["ipNetToMediaPhysAddress"],
+                arp_oids["ipNetToMediaType"],
+                arp_oids["ipNetToPhysicalPhysAddress"],
+                arp_oids["ipNetToPhysicalType"],
+            ], hex_strings=True)
+
+            entries = {}
+            # ipNetToMediaTable: Index = ifIndex.a.b.c.d
+            for index, value in media_macs.items():
+                if media_types.get(index) == ARP_TYPE_INVALID:
+                    continue
+                entries[".".join(index.split(".")[-4:])] = value
+            # ipNetToPhysicalTable: Index = ifIndex.addrType.len.a.b.c.d (nur IPv4)
+            for index, value in phys_macs.items():
+                parts = index.split(".")
+                if len(parts) != 7 or parts[1] != "1" or phys_types.get(index) == ARP_TYPE_INVALID:
+                    continue
+                entries[".".join(parts[-4:])] = value
+
+            if entries:
+                hosts.add(router)
+            for ip, value in entries.items():
+                mac = format_mac(value)
+                if mac:
+                    self.arp_table[ip] = mac
+                    hosts.add(ip)
+
+            logger.debug(f"ARP-Tabelle von {router}: {len(entries)} Einträge")
+
+        in_subnet = []
+        for ip in hosts:
+            try:
+                address = ipaddress.ip_address(ip)
+            except ValueError:
+                continue
+            if address in network and address not in (network.network_address, network.broadcast_address):
+                in_subnet.append(ip)
+
+        return sorted(in_subnet, key=lambda x: [int(p) for p in x.split(".")])
+
+    def harvest_stations(self, ip: str, max_repetitions: int, version: int) -> List[Dict[str, Any]]:
+        """Liest die Stationstabelle eines APs (MAC, RSSI, Raten, Bytes); die MAC steckt im Index"""
+        columns = self.station_oids
+        tables = dict(zip(columns, self.snmp_walk_many(ip, list(columns.values()), max_repetitions, version)))
+
+        def number(column: str, index: str) -> Optional[int]:
+            try:
+                return int(tables[column][index])
+            except (KeyError, TypeError, ValueError):
+                return None
+
+        stations = []
+        for index in tables["staSignal"]:
+            parts = index.split(".")
+            if len(parts) != 7:
+                continue
+            try:
+                mac = ":".join(f"{int(part):02x}" for part in parts[1:])
+            except ValueError:
+                continue
+            rssi = number("staSignal", index)
+            tx_rate = number("staTxRate", index)
+            rx_rate = number("staRxRate", index)
+            last_ip = tables["staLastIp"].get(index)
+            station = {
+                "mac": mac,
+                "ip": last_ip if last_ip and last_ip != "0.0.0.0" else None,
+                "name": tables["staName"].get(index) or None,
+                "if_index": parts[0],
+                "rssi": rssi,
+                "tx_rate_mbps": None if tx_rate is None else round(tx_rate / self.station_rate_divisor, 1),
+                "rx_rate_mbps": None if rx_rate is None else round(rx_rate / self.station_rate_divisor, 1),
+                "tx_bytes": number("staTxBytes", index),
+                "rx_bytes": number("staRxBytes", index),
+            }
+            station["weak"] = (rssi is not None and rssi < self.weak_rssi) or \
+                (station["tx_rate_mbps"] is not None and station["tx_rate_mbps"] < self.min_station_rate)
+            stations.append(station)
+
+        logger.debug(f"Stationstabelle von {ip}: {len(stations)} Clients")
+        return stations
+
+    def wifi_stations(self) -> Dict[str, Dict[str, Any]]:
+        """WLAN-Stationen aller APs nach IP (IP aus der Stationstabelle, sonst über die ARP-Daten)"""
+        if not self.station_harvest:
+            return {}
+        ip_by_mac = {mac: ip for ip, mac in self.arp_table.items()}
+        stations = {}
+        for ap_ip, device in self.devices.items():
+            for station in device.get("stations", []):
+                ip = station["ip"] or ip_by_mac.get(station["mac"])
+                if ip:
+                    stations[ip] = {**station, "ap": device.get("name", ap_ip)}
+        return stations
+
+    def read_neighbour_table(self) -> Dict[str, str]:
+        """Vollständige Einträge der Kernel-Nachbartabelle (IP -> MAC, nur Linux; füllt sich durch die Pings)"""
+        neighbours = {}
+        try:
+            with open(NEIGHBOUR_TABLE) as f:
+                next(f, None)
+                for line in f:
+                    fields = line.split()
+                    if len(fields) >= 4 and int(fields[2], 16) & 0x2:
+                        mac = format_mac(fields[3])
+                        if mac:
+                            neighbours[fields[0]] = mac
+        except (OSError, ValueError):
+            pass
+        return neighbours
+
+    def classify_hosts(self, hosts: List[str]) -> Dict[str, str]:
+        """Hersteller und Geräteklasse per OUI für Hosts mit bekannter MAC; liefert ip -> Hersteller"""
+        if self.oui_index.neighbours:
+            self.arp_table.update(self.read_neighbour_table())
+        vendors = {}
+        for ip in hosts:
+            mac = self.arp_table.get(ip)
+            if not mac:
+                continue
+            vendor, device_class = self.oui_index.classify(mac)
+            if vendor:
+                self.host_vendors[ip] = (vendor, device_class)
+                vendors[ip] = vendor
+        return vendors
+
+    def stage(self, name: str, max_workers: int) -> DeadlineStage:
+        """Dauerhafter Pool einer Zyklus-Stufe (laufende Aufgaben überleben die Deadline)"""
+        stage = self._stages.get(name)
+        if stage is None:
+            executor = self.shared.lane(name, self.site_name) if self.shared else None
+            stage = DeadlineStage(name, max_workers, executor)
+            self._stages[name] = stage
+        return stage
+
+    @property
+    def snmp_client(self):
+        """Eingebauter SNMP-Client (ein UDP-Socket für alle Ziele), erst bei Bedarf gestartet"""
+        client = self._snmp_client
+        if client is not None:
+            return client
+        # Erster Zyklus: alle SNMP-Worker fragen gleichzeitig, nur einer erzeugt den Client
+        with self._snmp_client_lock:
+            if self._snmp_client is None:
+                if self.shared is not None:
+                    self._snmp_client = self.shared.snmp_client(self._new_snmp_client)
+                else:
+                    client = self._new_snmp_client()
+                    client.start()
+                    self._snmp_client = client
+            return self._snmp_client
+
+    def _new_snmp_client(self):
+        return load_backend("snmp_client")(
+            community=self.snmp_community,
+            version=self.snmp_version,
+            timeout=self.timeout,
+            retries=1,
+            max_repetitions=self.snmp_max_repetitions,
+            controller=self.snmp_concurrency,
+        )
+
     def snmp_get(self, ip: str, oid: str) -> Optional[Any]:
         """Führt SNMP GET aus"""
+        return self.snmp_get_many(ip, [oid]).get(oid)
+
+    def snmp_version_for(self, ip: str) -> int:
+        """SNMP-Version für ip: gelernt aus dem Profil, sonst snmp_version"""
+        return self.snmp_profiles.version(ip, self.snmp_version)
+
+    def _snmp_get_pdus(self, ip: str, pdus: List[List[str]], version: int) -> List[Optional[Dict[str, Any]]]:
+        """
+        Ein GET pro OID-Liste (eingebauter Client: parallel). Pro PDU {oid: wert},
+        {} bei Fehlerstatus, None ohne Antwort. Version, Community und Timeout gelten pro
+        Anfrage, auch wenn sich mehrere Sites einen Client teilen.
+        """
+        if self.snmp_transport == "builtin":
+            client = self.snmp_client
+            futures = [client.get(ip, oids, version, self.snmp_community, self.timeout) for oids in pdus]
+            return [future.result() for future in futures]
+        return [self._pysnmp_get(ip, oids, version) for oids in pdus]
+
+    def _snmp_get_each(self, ip: str, oids: List[str], version: int) -> Optional[Dict[str, Any]]:
+        """
+        v1: eine unbekannte OID lässt die ganze PDU scheitern (noSuchName) -> jede OID einzeln
+        nachfragen. None sobald eine Anfrage unbeantwortet bleibt (Timeout gilt für das ganze Gerät).
+        """
+        values: Dict[str, Any] = {}
+        for oid in oids:
+            single = self.snmp_get_chunked(ip, [oid], version)
+            if single is None:
+                return None
+            values.update(single)
+        return values
+
+    def snmp_get_many(self, ip: str, oids: List[str], version: Optional[int] = None) -> Dict[str, Any]:
+        """Führt SNMP GET für mehrere OIDs in einer PDU aus. Fehlende OIDs fehlen im Ergebnis."""
+        version = version or self.snmp_version_for(ip)
+        result = self._snmp_get_pdus(ip, [oids], version)[0]
+        if result == {} and len(oids) > 1 and version != 2:
+            result = self._snmp_get_each(ip, oids, version)
+        if result is None:
+            return {}
+        return {oid: value for oid, value in result.items() if value is not None}
+
+    def _pysnmp_get(self, ip: str, oids: List[str], version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """GET über pysnmp (optionaler Fallback). None ohne Antwort, {} bei Fehlerstatus."""
+        version = version or self.snmp_version
         try:
-            if self.snmp_version == 2:
-                iterator = getCmd(
-                    SnmpEngine(),
-                    CommunityData(self.snmp_community, mpModel=1),
-                    UdpTransportTarget((ip, 161), timeout=self.timeout, retries=1),
-                    ContextData(),
-                    ObjectType(ObjectIdentity(oid))
-                )
-            else:
-                iterator = getCmd(
-                    SnmpEngine(),
-                    CommunityData(self.snmp_community, mpModel=0),
-                    UdpTransportTarget((ip, 161), timeout=self.timeout, retries=1),
-                    ContextData(),
-                    ObjectType(ObjectIdentity(oid))
-                )
+            hlapi = load_backend("snmp")
+            iterator = hlapi.getCmd(
+                hlapi.SnmpEngine(),
+                hlapi.CommunityData(self.snmp_community, mpModel=1 if version == 2 else 0),
+                hlapi.UdpTransportTarget((ip, 161), timeout=self.timeout, retries=1),
+                hlapi.ContextData(),
+                *[hlapi.ObjectType(hlapi.ObjectIdentity(oid)) for oid in oids]
+            )
 
             errorIndication, errorStatus, errorIndex, varBinds = next(iterator)
 
-            if errorIndication or errorStatus:
+            if errorIndication:
                 return None
+            if errorStatus:
+                return {}
 
-            for varBind in varBinds:
-                return varBind[1].prettyPrint()
+            results = {}
+            for oid, varBind in zip(oids, varBinds):
+                # noSuchObject/noSuchInstance sind keine Werte
+                if varBind[1].tagSet in (hlapi.NoSuchObject.tagSet, hlapi.NoSuchInstance.tagSet):
+                    continue
+                results[oid] = varBind[1].prettyPrint()
+            return results
 
         except Exception:
             return None
 
+    def snmp_get_chunked(self, ip: str, oids: List[str], version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        GET für viele OIDs, aufgeteilt auf mehrere PDUs (eingebauter Client: parallel).
+        None wenn eine PDU unbeantwortet blieb.
+        """
+        chunks = chunk_oids(oids, self.interface_selector.max_oids_per_pdu)
+        version = version or self.snmp_version_for(ip)
+        results: Dict[str, Any] = {}
+        for result in self._snmp_get_pdus(ip, chunks, version):
+            if result is None:
+                return None
+            results.update(result)
+        return {oid: value for oid, value in results.items() if value is not None}
+
     def snmp_walk(self, ip: str, oid: str) -> Dict[str, Any]:
-        """Führt SNMP WALK aus"""
+        """Führt SNMP WALK aus. Index = OID-Suffix unterhalb von oid."""
+        return self.snmp_walk_many(ip, [oid])[0]
+
+    def snmp_walk_many(self, ip: str, oids: List[str], max_repetitions: Optional[int] = None,
+                       version: Optional[int] = None, hex_strings: bool = False) -> List[Dict[str, Any]]:
+        """
+        Führt mehrere WALKs aus - mit dem eingebauten Client parallel über denselben Socket.
+        Ergebnisse des eingebauten Clients tragen timed_out (Walk durch Timeout abgebrochen).
+        hex_strings: Octet-Strings als 0x-Hex statt Text (PhysAddress-Spalten).
+        """
+        version = version or self.snmp_version_for(ip)
+        if self.snmp_transport == "builtin":
+            client = self.snmp_client
+            futures = [client.walk(ip, oid, max_repetitions, version, self.snmp_community, hex_strings, self.timeout)
+                       for oid in oids]
+            return [future.result() for future in futures]
+        return [self._pysnmp_walk(ip, oid, version, hex_strings) for oid in oids]
+
+    def _pysnmp_walk(self, ip: str, oid: str, version: Optional[int] = None,
+                     hex_strings: bool = False) -> Dict[str, Any]:
+        """WALK über pysnmp (optionaler Fallback)"""
         results = {}
+        prefix = oid.rstrip(".") + "."
+        version = version or self.snmp_version
         try:
-            if self.snmp_version == 2:
-                iterator = nextCmd(
-                    SnmpEngine(),
-                    CommunityData(self.snmp_community, mpModel=1),
-                    UdpTransportTarget((ip, 161), timeout=self.timeout, retries=1),
-                    ContextData(),
-                    ObjectType(ObjectIdentity(oid)),
-                    lexicographicMode=False
-                )
-            else:
-                iterator = nextCmd(
-                    SnmpEngine(),
-                    CommunityData(self.snmp_community, mpModel=0),
-                    UdpTransportTarget((ip, 161), timeout=self.timeout, retries=1),
-                    ContextData(),
-                    ObjectType(ObjectIdentity(oid)),
-                    lexicographicMode=False
-                )
+            hlapi = load_backend("snmp")
+            iterator = hlapi.nextCmd(
+                hlapi.SnmpEngine(),
+                hlapi.CommunityData(self.snmp_community, mpModel=1 if version == 2 else 0),
+                hlapi.UdpTransportTarget((ip, 161), timeout=self.timeout, retries=1),
+                hlapi.ContextData(),
+                hlapi.ObjectType(hlapi.ObjectIdentity(oid)),
+                lexicographicMode=False
+            )
 
             for errorIndication, errorStatus, errorIndex, varBinds in iterator:
                 if errorIndication or errorStatus:
@@ -458,8 +1152,10 @@ class NetworkScanner:
                 for varBind in varBinds:
                     oid_str = varBind[0].prettyPrint()
                     value = varBind[1].prettyPrint()
+                    if hex_strings and hasattr(varBind[1], "asOctets"):
+                        value = "0x" + varBind[1].asOctets().hex()
                     # Extrahiere Index aus OID
-                    index = oid_str.split(".")[-1]
+                    index = oid_str[len(prefix):] if oid_str.startswith(prefix) else oid_str.split(".")[-1]
                     results[index] = value
 
         except Exception:
@@ -522,17 +1218,42 @@ class NetworkScanner:
         return device_info
 
     def collect_device_data(self, ip: str) -> Optional[Dict]:
-        """Sammelt alle SNMP-Daten eines Geräts"""
+        """Sammelt alle SNMP-Daten eines Geräts (gesteuert über das gelernte SNMP-Profil)"""
         logger.debug(f"Sammle Daten von {ip}")
 
-        # Basis-Informationen
-        sys_descr = self.snmp_get(ip, SNMP_OIDS["system"]["sysDescr"])
+        profile = self.snmp_profiles.get(ip)
+        version = profile.version if profile else self.snmp_version
+
+        # Basis-Informationen (eine PDU)
+        system_oids = SNMP_OIDS["system"]
+        system_request = [
+            system_oids["sysDescr"], system_oids["sysObjectID"], system_oids["sysName"], system_oids["sysUpTime"]
+        ]
+        system = self.snmp_get_many(ip, system_request, version)
+        if not system.get(system_oids["sysDescr"]) and profile is None and version == 2 \
+                and self.snmp_profiles.v1_due(ip):
+            # Manche Agenten sprechen nur v1 - Hosts ohne SNMP nicht in jedem Zyklus erneut fragen
+            system = self.snmp_get_many(ip, system_request, 1)
+            if system.get(system_oids["sysDescr"]):
+                version = 1
+            else:
+                self.snmp_profiles.v1_failed(ip)
+        sys_descr = system.get(system_oids["sysDescr"])
         if not sys_descr:
             return None
 
-        sys_oid = self.snmp_get(ip, SNMP_OIDS["system"]["sysObjectID"])
-        sys_name = self.snmp_get(ip, SNMP_OIDS["system"]["sysName"]) or ip
-        sys_uptime = self.snmp_get(ip, SNMP_OIDS["system"]["sysUpTime"])
+        sys_oid = system.get(system_oids["sysObjectID"])
+        sys_name = system.get(system_oids["sysName"]) or self.host_name(ip)
+        sys_uptime = system.get(system_oids["sysUpTime"])
+
+        if profile and self.snmp_profiles.rebooted(ip, sys_uptime):
+            # Neustart: Counter zurückgesetzt, Firmware evtl. geändert -> neu lernen
+            logger.info(f"{ip}: Neustart erkannt (sysUpTime), SNMP-Profil wird neu gelernt")
+            self.last_octets.pop(ip, None)
+            profile = None
+        if profile is None:
+            profile = SnmpProfile(version, self.snmp_max_repetitions)
+            profile.uptime = parse_uptime(sys_uptime)
 
         device_info = self.detect_device_type(sys_descr, sys_oid)
 
@@ -551,20 +1272,75 @@ class NetworkScanner:
             "metrics": {}
         }
 
-        # Interface-Daten sammeln
-        if_descrs = self.snmp_walk(ip, SNMP_OIDS["interfaces"]["ifDescr"])
-        if_speeds = self.snmp_walk(ip, SNMP_OIDS["interfaces"]["ifSpeed"])
-        if_status = self.snmp_walk(ip, SNMP_OIDS["interfaces"]["ifOperStatus"])
-        if_in_octets = self.snmp_walk(ip, SNMP_OIDS["interfaces"]["ifInOctets"])
-        if_out_octets = self.snmp_walk(ip, SNMP_OIDS["interfaces"]["ifOutOctets"])
+        # Interface-Daten sammeln (inkl. High-Speed Counter für 10G+ Interfaces).
+        # Tabellen, die das Gerät laut Profil nicht (vollständig) braucht, werden übersprungen.
+        columns = {
+            "ifSpeed": SNMP_OIDS["interfaces"]["ifSpeed"],
+            "ifOperStatus": SNMP_OIDS["interfaces"]["ifOperStatus"],
+        }
+        if profile.counters != COUNTERS_HC:
+            columns["ifInOctets"] = SNMP_OIDS["interfaces"]["ifInOctets"]
+            columns["ifOutOctets"] = SNMP_OIDS["interfaces"]["ifOutOctets"]
+        if profile.counters != COUNTERS_32BIT:
+            columns["ifHCInOctets"] = SNMP_OIDS["high_speed_interfaces"]["ifHCInOctets"]
+            columns["ifHCOutOctets"] = SNMP_OIDS["high_speed_interfaces"]["ifHCOutOctets"]
+            columns["ifHighSpeed"] = SNMP_OIDS["high_speed_interfaces"]["ifHighSpeed"]
+
+        selector = self.interface_selector
+        tables = None
+        if selector.enabled and profile.counters and profile.interfaces is not None:
+            # Steady State: nur die ausgewählten Zeilen per GET statt ganzer Tabellen
+            tables = self._get_interface_rows(ip, profile.interfaces, columns, version)
+            if tables is None:
+                # Zeile verschwunden (ifIndex neu vergeben) oder Timeout -> neu auflösen
+                profile.interfaces = None
+            else:
+                tables["ifDescr"] = dict(profile.interfaces)
+
+        if tables is None:
+            columns["ifDescr"] = SNMP_OIDS["interfaces"]["ifDescr"]
+            if selector.enabled:
+                columns["ifType"] = SNMP_OIDS["interfaces"]["ifType"]
+            walks = self.snmp_walk_many(ip, list(columns.values()), profile.max_repetitions, version)
+            tables = dict(zip(columns, walks))
+
+            if any(getattr(walk, "timed_out", False) for walk in walks):
+                # Gerät antwortet, aber große GETBULK-Antworten gehen verloren -> kleinere Blöcke
+                if profile.walk_timed_out():
+                    logger.info(f"{ip}: GETBULK-Timeout, max-repetitions auf {profile.max_repetitions} reduziert")
+            else:
+                # Verluste waren evtl. nur vorübergehend (Last, WLAN) -> Blöcke wieder vergrößern
+                if profile.walk_succeeded(self.snmp_max_repetitions):
+                    logger.debug(f"{ip}: max-repetitions auf {profile.max_repetitions} angehoben")
+                if profile.counters is None:
+                    if_hc_in = tables.get("ifHCInOctets", {})
+                    if if_hc_in and all(idx in if_hc_in for idx in tables["ifDescr"]):
+                        profile.counters = COUNTERS_HC
+                    else:
+                        profile.counters = COUNTERS_BOTH if if_hc_in else COUNTERS_32BIT
+                if selector.enabled:
+                    profile.interfaces = selector.select(
+                        ip, device_info["vendor"], tables["ifDescr"], tables.get("ifType", {})
+                    )
+
+            if selector.enabled and profile.interfaces is not None:
+                tables["ifDescr"] = {
+                    idx: descr for idx, descr in tables["ifDescr"].items() if idx in profile.interfaces
+                }
 
-        # High-Speed Counter für 10G+ Interfaces
-        if_hc_in = self.snmp_walk(ip, SNMP_OIDS["high_speed_interfaces"]["ifHCInOctets"])
-        if_hc_out = self.snmp_walk(ip, SNMP_OIDS["high_speed_interfaces"]["ifHCOutOctets"])
-        if_high_speed = self.snmp_walk(ip, SNMP_OIDS["high_speed_interfaces"]["ifHighSpeed"])
+        if_descrs = tables["ifDescr"]
+        if_speeds = tables["ifSpeed"]
+        if_status = tables["ifOperStatus"]
+        if_in_octets = tables.get("ifInOctets", {})
+        if_out_octets = tables.get("ifOutOctets", {})
+        if_hc_in = tables.get("ifHCInOctets", {})
+        if_hc_out = tables.get("ifHCOutOctets", {})
+        if_high_speed = tables.get("ifHighSpeed", {})
 
         total_in_bytes = 0
         total_out_bytes = 0
+        # Ein Zeitstempel für Baselines und Bandwidth-Delta
+        current_time = self.clock()
 
         for idx in if_descrs:
             # Bevorzuge HC-Counter wenn verfügbar
@@ -591,11 +1367,19 @@ class NetworkScanner:
             if status == "up":
                 total_in_bytes += in_octets
                 total_out_bytes += out_octets
+                if self.baselines.enabled:
+                    scores = [score for score in (
+                        self.baselines.observe_counter(f"{ip}:{idx}:in", in_octets, current_time),
+                        self.baselines.observe_counter(f"{ip}:{idx}:out", out_octets, current_time),
+                    ) if score is not None]
+                    if scores:
+                        # Stärkste Abweichung (Richtung bleibt im Vorzeichen)
+                        interface["anomaly"] = round(max(scores, key=abs), 2)
 
         # Bandwidth-Berechnung (Delta seit letztem Scan)
-        current_time = time.time()
         if ip in self.last_octets and self.last_scan_time > 0:
-            time_delta = current_time - self.last_scan_time
+            # Pro Gerät: über die Deadline hinaus gelaufene Polls landen erst im nächsten Zyklus
+            time_delta = current_time - self.last_octets[ip].get("time", self.last_scan_time)
             if time_delta > 0:
                 last_in = self.last_octets[ip].get("in", 0)
                 last_out = self.last_octets[ip].get("out", 0)
@@ -611,20 +1395,108 @@ class NetworkScanner:
                     "out_mbps": max(0, out_bps / 1_000_000)
                 }
 
-        self.last_octets[ip] = {"in": total_in_bytes, "out": total_out_bytes}
+        self.last_octets[ip] = {"in": total_in_bytes, "out": total_out_bytes, "time": current_time}
 
-        # Vendor-spezifische Metriken
+        # Vendor-spezifische Metriken - nach dem Lernen nur noch die OIDs, die geantwortet haben
         if device_info["vendor"] in VENDOR_OIDS:
             vendor_oids = VENDOR_OIDS[device_info["vendor"]]
-            for metric_name, oid in vendor_oids.items():
-                value = self.snmp_get(ip, oid)
-                if value:
-                    device_data["metrics"][metric_name] = value
-
+            if profile.vendor_metrics is not None:
+                vendor_oids = {m: oid for m, oid in vendor_oids.items() if m in profile.vendor_metrics}
+            oids = list(vendor_oids.values())
+            values = self.snmp_get_chunked(ip, oids, version) if oids else {}
+            if values == {} and len(oids) > 1 and version != 2:
+                values = self._snmp_get_each(ip, oids, version)
+            # Ohne Antwort (Timeout) nichts lernen, sonst wären die Metriken für immer abgeschaltet
+            if values is not None:
+                for metric_name, oid in vendor_oids.items():
+                    value = values.get(oid)
+                    if value:
+                        device_data["metrics"][metric_name] = value
+                if profile.vendor_metrics is None:
+                    profile.vendor_metrics = sorted(m for m, oid in vendor_oids.items() if values.get(oid))
+
+        # WLAN-Stationen: eine Tabelle pro AP, alle Spalten parallel per GETBULK
+        if self.station_harvest and device_info["vendor"] == "ubiquiti" and \
+                device_info["type"] not in ("switch", "router", "firewall"):
+            device_data["stations"] = self.harvest_stations(ip, profile.max_repetitions, version)
+
+        self.snmp_profiles.put(ip, profile)
         return device_data
 
-    def measure_latency(self, ip: str, count: int = 5) -> Dict[str, float]:
-        """Misst Latenz zu einem Host"""
+    def _get_interface_rows(self, ip: str, interfaces: Dict[str, str], columns: Dict[str, str],
+                            version: int) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Liest die Spalten der ausgewählten Interfaces per GET. None wenn eine Zeile fehlt."""
+        oids = [f"{oid}.{idx}" for oid in columns.values() for idx in interfaces]
+        values = self.snmp_get_chunked(ip, oids, version)
+        if values is None:
+            return None
+
+        tables: Dict[str, Dict[str, Any]] = {}
+        for name, oid in columns.items():
+            tables[name] = {idx: values[f"{oid}.{idx}"] for idx in interfaces if f"{oid}.{idx}" in values}
+        if len(tables["ifOperStatus"]) < len(interfaces):
+            return None
+        return tables
+
+    def measure_latency(self, ip: str, count: int = 5, device_class: Optional[str] = None) -> Dict[str, float]:
+        """
+        Latenz zu einem Host. Im Zyklus bereits (parallel) gemessene Werte kommen aus dem Cache;
+        ist die Latenz-Deadline erreicht, gilt der letzte Messwert und die Messung läuft weiter.
+        Ohne bisherigen Messwert: LATENCY_NOT_MEASURED (loss None), nicht 0 ms / 0% Verlust.
+        """
+        key = (ip, count, device_class)
+        self._latency_wanted.add(key)
+        if key in self._latency_fresh:
+            return self._latency_cache[key]
+
+        # Neues Ziel: über den Latenz-Pool, damit auch der erste Zyklus die Deadline einhält
+        deadline = self.scheduler.deadline("latency")
+        results, pending = self.stage("latency", self.latency_workers).run([key], self._probe_latency, deadline)
+        self._tcp_latency_fallback(results, deadline)
+        self._latency_cache.update(results)
+        self._latency_fresh.update(results)
+        if key in results:
+            return results[key]
+        self._partial.add("latency")
+        return self._latency_cache.get(key, dict(LATENCY_NOT_MEASURED))
+
+    def _probe_latency(self, key: Tuple[str, int, Optional[str]]) -> Dict[str, float]:
+        """Misst Latenz zu einem Host per ICMP (TCP-Fallback gesammelt in _tcp_latency_fallback)"""
+        ip, count, _ = key
+        return self.measure_icmp_latency(ip, count)
+
+    def _tcp_latency_fallback(self, results: Dict[Tuple, Dict[str, float]], deadline: Optional[float]):
+        """Ziele mit 100% ICMP-Verlust gemeinsam per TCP-Handshake-RTT messen (eine Selector-Schleife)"""
+        if not self.tcp_prober:
+            return
+        silent = [key for key, latency in results.items() if (latency["loss"] or 0) >= 100]
+        if not silent or (deadline is not None and time.monotonic() >= deadline):
+            return
+        for key, latency in zip(silent, self.tcp_prober.measure_latency_many(silent, deadline)):
+            if latency["loss"] < 100:
+                logger.debug(f"Latenz für {key[0]} über TCP gemessen: {latency['avg']:.1f} ms")
+                results[key] = latency
+
+    def prefetch_latency(self) -> Dict[Tuple, Dict[str, float]]:
+        """Misst die im letzten Zyklus angefragten Latenzen parallel bis zur Latenz-Deadline (Cache: store_latency)"""
+        wanted, self._latency_wanted = self._latency_wanted, set()
+        self._latency_fresh = set()
+        if not wanted:
+            return {}
+        deadline = self.scheduler.deadline("latency")
+        results, pending = self.stage("latency", self.latency_workers).run(wanted, self._probe_latency, deadline)
+        self._tcp_latency_fallback(results, deadline)
+        # Nicht fertige Messungen bleiben angefragt, auch wenn kein Builder sie mehr abruft
+        self._latency_wanted.update(pending)
+        return results
+
+    def store_latency(self, results: Dict[Tuple, Dict[str, float]]):
+        """Übernimmt prefetch_latency-Ergebnisse in den Cache (Zyklus-Thread, vor den Buildern)"""
+        self._latency_cache.update(results)
+        self._latency_fresh.update(results)
+
+    def measure_icmp_latency(self, ip: str, count: int = 5) -> Dict[str, float]:
+        """Misst Latenz zu einem Host per ping"""
         try:
             param = "-n" if sys.platform == "win32" else "-c"
 
@@ -670,26 +1542,38 @@ class NetworkScanner:
     def aggregate_bandwidth_data(self) -> Dict:
         """Aggregiert Bandwidth-Daten für das Dashboard (API-kompatibles Format)"""
 
-        # Zuerst ntopng-Daten versuchen
+        # Zuerst ntopng-Daten versuchen (im Zyklus schon vom ntopng-Collector abgerufen)
         if self.ntopng.enabled:
-            ntopng_data = self.ntopng.fetch_interface_data()
+            if self.collectors.runs("ntopng"):
+                ntopng_data = self.ntopng.last_data
+            else:
+                ntopng_data = self.ntopng.fetch_interface_data()
             if ntopng_data:
                 throughput = self.ntopng.get_throughput()
                 traffic = self.ntopng.get_traffic_stats()
                 host_stats = self.ntopng.get_host_stats()
                 tcp_stats = self.ntopng.get_tcp_stats()
 
-                # Konvertiere bps zu Gbps
+                # Konvertiere bps zu Gbps (Throughput = Summe der WAN-Interfaces)
                 downstream_gbps = throughput.get("download_bps", 0) / 1_000_000_000
                 upstream_gbps = throughput.get("upload_bps", 0) / 1_000_000_000
 
+                # WiFi: gemessen an ntopng-WiFi-Interfaces, sonst SNMP der Access Points
+                wifi = self.ntopng.get_role_throughput("wifi")
+                if wifi is not None:
+                    wifi_gbps = (wifi["download_bps"] + wifi["upload_bps"]) / 1_000_000_000
+                else:
+                    wifi_gbps = self._access_point_gbps()
+
                 return {
                     "upstream_gbps": round(upstream_gbps, 4),
                     "downstream_gbps": round(downstream_gbps, 4),
-                    "wifi_gbps": round(downstream_gbps * 0.4, 4),  # Schätzung
-                    "upstream_percent": round((upstream_gbps / 10.0) * 100, 2),
+                    "wifi_gbps": round(wifi_gbps, 4) if wifi_gbps is not None else None,
+                    "upstream_percent": round((upstream_gbps / self.ntopng.get_wan_capacity_gbps()) * 100, 2),
                     "timestamp": datetime.now().isoformat(),
                     "source": "ntopng",
+                    "interfaces": self.ntopng.get_interface_breakdown(),
+                    "top_talkers": self.top_talkers.top(self.clock()) if self.top_talkers.enabled else None,
                     "ntopng": {
                         "throughput_bps": throughput.get("total_bps", 0),
                         "throughput_pps": throughput.get("total_pps", 0),
@@ -711,31 +1595,37 @@ class NetworkScanner:
         # Fallback: SNMP-basierte Aggregation
         total_downstream = 0
         total_upstream = 0
-        total_wifi = 0
 
         for ip, device in self.devices.items():
             if "bandwidth" in device.get("metrics", {}):
                 bw = device["metrics"]["bandwidth"]
                 total_downstream += bw.get("in_bps", 0)
                 total_upstream += bw.get("out_bps", 0)
-                # WiFi traffic from access points
-                if device.get("type") == "access_point":
-                    total_wifi += bw.get("in_bps", 0) + bw.get("out_bps", 0)
 
         # Format matching Edge Function expectations
         downstream_gbps = total_downstream / 1_000_000_000
         upstream_gbps = total_upstream / 1_000_000_000
-        wifi_gbps = total_wifi / 1_000_000_000 if total_wifi > 0 else downstream_gbps * 0.4
+        # Ohne Access-Point-Daten unbekannt (None) statt geschätzt
+        wifi_gbps = self._access_point_gbps()
 
         return {
             "upstream_gbps": round(upstream_gbps, 2),
             "downstream_gbps": round(downstream_gbps, 2),
-            "wifi_gbps": round(wifi_gbps, 2),
-            "upstream_percent": round((upstream_gbps / 10.0) * 100, 1),
+            "wifi_gbps": round(wifi_gbps, 2) if wifi_gbps is not None else None,
+            "upstream_percent": round((upstream_gbps / self.ntopng.wan_capacity_gbps) * 100, 1),
             "timestamp": datetime.now().isoformat(),
             "source": "snmp"
         }
 
+    def _access_point_gbps(self) -> Optional[float]:
+        """WiFi-Traffic (in + out) aller per SNMP erfassten Access Points; None ohne Bandbreite eines APs"""
+        total = None
+        for device in self.devices.values():
+            bw = device.get("metrics", {}).get("bandwidth") if device.get("type") == "access_point" else None
+            if bw is not None:
+                total = (total or 0.0) + bw.get("in_bps", 0) + bw.get("out_bps", 0)
+        return None if total is None else total / 1_000_000_000
+
     def build_infrastructure_data(self) -> Dict:
         """Baut Infrastruktur-Daten für das Dashboard (API-kompatibles Format)"""
         devices = []
@@ -760,7 +1650,8 @@ class NetworkScanner:
                 "ports": len([i for i in device.get("interfaces", []) if i.get("status") == "up"]),
                 "vendor": device.get("vendor", "Unknown"),
                 "uptime": device.get("uptime", ""),
-                "ping": self.measure_latency(ip, 1).get("avg", 0)
+                # Numerisch wie bisher: noch nie gemessen = 0, sonst der letzte Messwert
+                "ping": self.measure_latency(ip, 1)["avg"] or 0
             }
             devices.append(device_summary)
 
@@ -772,12 +1663,12 @@ class NetworkScanner:
                 "id": "Gateway",
                 "ip": gateway_ip,
                 "type": "Gateway",
-                "status": "active" if latency["loss"] < 100 else "inactive",
+                "status": "inactive" if latency["loss"] is not None and latency["loss"] >= 100 else "active",
                 "cpu": 0,
                 "memory": 0,
                 "ports": 1,
                 "vendor": "Unknown",
-                "ping": latency.get("avg", 0)
+                "ping": latency["avg"] or 0
             })
 
         return {
@@ -785,6 +1676,51 @@ class NetworkScanner:
             "total_devices": len(devices)
         }
 
+    def host_name(self, ip: str) -> str:
+        """Name eines Hosts aus der Namensauflösung (Cache, blockiert nie), sonst die IP"""
+        if self.name_resolver:
+            return self.name_resolver.name(ip) or ip
+        return ip
+
+    def unmanaged_hosts(self, stations: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """Hosts ohne SNMP (gefunden oder WLAN-Station), für die Namensauflösung, OUI-Index oder AP etwas wissen"""
+        stations = self.wifi_stations() if stations is None else stations
+        if not self.name_resolver and not self.oui_index and not stations:
+            return {}
+        hosts = {}
+        for ip in self._last_active | stations.keys():
+            if ip in self.devices:
+                continue
+            station = stations.get(ip)
+            resolved = self.name_resolver.name(ip) if self.name_resolver else None
+            name = resolved or (station["name"] if station else None)
+            vendor, device_class = self.host_vendors.get(ip, (None, None))
+            if vendor is None and station and self.oui_index:
+                vendor, device_class = self.oui_index.classify(station["mac"])
+            if name or vendor or station:
+                hosts[ip] = {
+                    "name": name or ip,
+                    "vendor": vendor,
+                    "class": device_class,
+                    "source": (self.name_resolver.source(ip) if resolved else None) or
+                              ("wifi" if station else "oui"),
+                }
+        return hosts
+
+    @staticmethod
+    def station_payload(station: Dict[str, Any]) -> Dict[str, Any]:
+        """WLAN-Daten eines Hosts für die Payloads"""
+        return {
+            "ap": station["ap"],
+            "mac": station["mac"],
+            "rssi": station["rssi"],
+            "tx_rate_mbps": station["tx_rate_mbps"],
+            "rx_rate_mbps": station["rx_rate_mbps"],
+            "tx_bytes": station["tx_bytes"],
+            "rx_bytes": station["rx_bytes"],
+            "weak": station["weak"],
+        }
+
     def build_gaming_devices_data(self) -> Dict:
         """Baut Gaming-Device-Daten (Latenz-Messungen) - API-kompatibles Format"""
         devices = []
@@ -792,12 +1728,21 @@ class NetworkScanner:
         # Identifiziere Gaming-Devices aus Config
         gaming_ips = self.config.get("gaming_devices", {})
 
+        # Status-Grenzen aus alert_thresholds
+        thresholds = {**ALERT_DEFAULT_THRESHOLDS, **self.config.get("alert_thresholds", {})}
+        latency_warning = thresholds["latency_warning_ms"]
+        latency_critical = thresholds["latency_critical_ms"]
+        loss_warning = thresholds["packet_loss_warning_percent"]
+
         # Nintendo Switch Cluster
         switch_ips = gaming_ips.get("switch_cluster", [])
         for ip in switch_ips:
-            latency = self.measure_latency(ip)
-            status = "optimal" if latency["avg"] < 20 and latency["loss"] < 1 else \
-                     "warning" if latency["avg"] < 50 else "critical"
+            latency = self.measure_latency(ip, device_class="nintendo")
+            if latency["loss"] is None:
+                # Noch kein Messwert (Deadline): nicht als 0 ms melden, Stufe steht in partial
+                continue
+            status = "optimal" if latency["avg"] < latency_warning and latency["loss"] < loss_warning else \
+                     "warning" if latency["avg"] < latency_critical else "critical"
             devices.append({
                 "name": f"Nintendo Switch ({ip})",
                 "ip": ip,
@@ -811,9 +1756,11 @@ class NetworkScanner:
         # PlayStation 5 Cluster
         ps5_ips = gaming_ips.get("ps5_cluster", [])
         for ip in ps5_ips:
-            latency = self.measure_latency(ip)
-            status = "optimal" if latency["avg"] < 20 and latency["loss"] < 1 else \
-                     "warning" if latency["avg"] < 50 else "critical"
+            latency = self.measure_latency(ip, device_class="playstation")
+            if latency["loss"] is None:
+                continue
+            status = "optimal" if latency["avg"] < latency_warning and latency["loss"] < loss_warning else \
+                     "warning" if latency["avg"] < latency_critical else "critical"
             devices.append({
                 "name": f"PlayStation 5 ({ip})",
                 "ip": ip,
@@ -824,18 +1771,32 @@ class NetworkScanner:
                 "type": "playstation"
             })
 
-        # Also scan for devices in self.devices that might be gaming devices
-        for ip, device in self.devices.items():
-            name_lower = device.get("name", "").lower()
-            if any(kw in name_lower for kw in ["nintendo", "switch", "playstation", "ps5", "xbox"]):
+        # Also scan for devices in self.devices that might be gaming devices,
+        # plus hosts without SNMP that have a resolved name or a console vendor (OUI)
+        candidates = [(ip, device.get("name", ip), None) for ip, device in self.devices.items()]
+        stations = self.wifi_stations()
+        candidates.extend((ip, host["name"], host["class"])
+                          for ip, host in sorted(self.unmanaged_hosts(stations).items()))
+        for ip, name, device_class in candidates:
+            name_lower = name.lower()
+            if device_class in CONSOLE_LABELS or any(kw in name_lower for kw in ["nintendo", "switch", "playstation", "ps5", "xbox"]):
                 if not any(d["ip"] == ip for d in devices):
-                    latency = self.measure_latency(ip, 1)
-                    status = "optimal" if latency["avg"] < 20 else \
-                             "warning" if latency["avg"] < 50 else "critical"
-                    device_type = "nintendo" if "nintendo" in name_lower or "switch" in name_lower else \
-                                  "playstation" if "playstation" in name_lower or "ps5" in name_lower else "other"
+                    if device_class in CONSOLE_LABELS:
+                        device_type = "other" if device_class == "xbox" else device_class
+                        probe_class = device_class
+                        if name == ip:
+                            name = f"{CONSOLE_LABELS[device_class]} ({ip})"
+                    else:
+                        device_type = "nintendo" if "nintendo" in name_lower or "switch" in name_lower else \
+                                      "playstation" if "playstation" in name_lower or "ps5" in name_lower else "other"
+                        probe_class = "xbox" if "xbox" in name_lower else device_type
+                    latency = self.measure_latency(ip, 1, device_class=probe_class)
+                    if latency["loss"] is None:
+                        continue
+                    status = "optimal" if latency["avg"] < latency_warning else \
+                             "warning" if latency["avg"] < latency_critical else "critical"
                     devices.append({
-                        "name": device.get("name", ip),
+                        "name": name,
                         "ip": ip,
                         "count": 1,
                         "ping": round(latency["avg"], 1),
@@ -844,75 +1805,83 @@ class NetworkScanner:
                         "type": device_type
                     })
 
+        now = self.clock() if self.baselines.enabled else 0
+        for device in devices:
+            # WLAN-Konsolen: Signal und Rate am AP (schlechte Latenz wegen schwachem Funk erkennbar)
+            if device["ip"] in stations:
+                device["wifi"] = self.station_payload(stations[device["ip"]])
+            self.alert_engine.update(device["ip"], device["name"], {
+                "latency_ms": device["ping"],
+                "packet_loss": device["packetLoss"],
+            })
+            if self.baselines.enabled:
+                # Ohne Antwort (100% Verlust) ist ping kein Messwert für die Baseline
+                score = None
+                if device["packetLoss"] < 100:
+                    score = self.baselines.observe(f"{device['ip']}:latency", device["ping"], now)
+                if score is not None:
+                    device["anomaly"] = round(score, 2)
+                # Nur höhere Latenz als üblich ist ein Problem; ohne Score 0, damit der Alert aufgehoben wird
+                self.alert_engine.update(f"{device['ip']}:latency", f"{device['name']} Latenz", {
+                    "anomaly_score": max(0.0, score) if score is not None else 0.0,
+                })
+
         return {
             "devices": devices,
             "total_gaming_devices": len(devices)
         }
 
     def build_alerts_data(self) -> List[Dict]:
-        """Generiert Alerts basierend auf Gerätestatus (API-kompatibles Format)"""
-        alerts = []
-
-        # ntopng Alerts einbeziehen
+        """Liefert Alert-Zustandswechsel (raised/ongoing/cleared) - API-kompatibles Format"""
+        # ntopng Alerts und TCP-Probleme
         if self.ntopng.enabled and self.ntopng.last_data:
             alert_stats = self.ntopng.get_alert_stats()
-            if alert_stats.get("engaged_alerts_error", 0) > 0:
-                alerts.append({
-                    "device": "ntopng",
-                    "level": "critical",
-                    "msg": f"{alert_stats['engaged_alerts_error']} kritische Alerts aktiv",
-                    "time": "Jetzt"
-                })
-            if alert_stats.get("engaged_alerts_warning", 0) > 0:
-                alerts.append({
-                    "device": "ntopng",
-                    "level": "warning",
-                    "msg": f"{alert_stats['engaged_alerts_warning']} Warnungen aktiv",
-                    "time": "Jetzt"
-                })
-
-            # TCP-Probleme
+            self.alert_engine.update("ntopng", "ntopng", {
+                "engaged_alerts_error": alert_stats.get("engaged_alerts_error", 0),
+                "engaged_alerts_warning": alert_stats.get("engaged_alerts_warning", 0),
+            })
             tcp_stats = self.ntopng.get_tcp_stats()
-            if tcp_stats.get("retransmissions", 0) > 1000:
-                alerts.append({
-                    "device": "Netzwerk",
-                    "level": "warning",
-                    "msg": f"Hohe TCP Retransmissions: {tcp_stats['retransmissions']}",
-                    "time": "Jetzt"
-                })
+            self.alert_engine.update("network", "Netzwerk", {
+                "tcp_retransmissions": tcp_stats.get("retransmissions", 0),
+            })
 
-        for ip, device in self.devices.items():
-            # High Bandwidth Alert
-            bw = device.get("metrics", {}).get("bandwidth", {})
-            if bw.get("in_mbps", 0) > 8000:  # > 8 Gbps
-                alerts.append({
-                    "device": device.get("name", ip),
-                    "level": "warning",
-                    "msg": f"Hohe Bandbreite: {bw['in_mbps']:.1f} Mbps",
-                    "time": "Jetzt"
-                })
+        # Während des Zyklus eingetroffene Traps fließen in diese Auswertung ein
+        self.apply_trap_events()
 
-            # Interface Down Alert
-            down_interfaces = [i for i in device.get("interfaces", []) if i.get("status") == "down"]
-            if down_interfaces and device.get("type") in ["switch", "router"]:
-                alerts.append({
-                    "device": device.get("name", ip),
-                    "level": "info",
-                    "msg": f"{len(down_interfaces)} Interface(s) down",
-                    "time": "Jetzt"
-                })
+        for ip, device in self.devices.items():
+            self.alert_engine.update(ip, device.get("name", ip), self.device_alert_metrics(ip, device))
+
+            # Abweichung vom Normalverlauf pro Interface (in beide Richtungen). Ohne Score
+            # (Interface down, Counter-Reset, Warmup) 0, damit ein offener Alert aufgehoben wird
+            if self.baselines.enabled:
+                for interface in device.get("interfaces", []):
+                    self.alert_engine.update(
+                        f"{ip}:{interface['index']}", f"{device.get('name', ip)} {interface['name']}",
+                        {"anomaly_score": abs(interface.get("anomaly", 0.0))})
+
+        # Nur Geräte mit geänderten Metriken werden ausgewertet
+        alerts = self.alert_engine.evaluate()
+        # Restart-Alerts aus Traps werden im nächsten Zyklus aufgehoben
+        self.trap_restarts.clear()
+        return alerts
 
-            # High CPU Alert
-            cpu = device.get("metrics", {}).get("cpuUsage", 0)
-            if cpu and int(cpu) > 80:
-                alerts.append({
-                    "device": device.get("name", ip),
-                    "level": "warning",
-                    "msg": f"Hohe CPU-Auslastung: {cpu}%",
-                    "time": "Jetzt"
-                })
+    def device_alert_metrics(self, ip: str, device: Dict) -> Dict[str, Optional[float]]:
+        """Alert-Metriken eines Geräts (Zyklus und Traps nutzen dieselben Werte)"""
+        metrics = device.get("metrics", {})
+        bw = metrics.get("bandwidth", {})
+        cpu = metrics.get("cpuUsage")
 
-        return alerts
+        device_metrics = {
+            "in_mbps": bw.get("in_mbps"),
+            "cpu": int(cpu) if cpu else None,
+            "restarted": 1 if ip in self.trap_restarts else 0,
+        }
+        # Interface-Down nur für Switches und Router relevant
+        if device.get("type") in ["switch", "router"]:
+            device_metrics["interfaces_down"] = len(
+                [i for i in device.get("interfaces", []) if i.get("status") == "down"]
+            )
+        return device_metrics
 
     def build_hosts_data(self) -> Dict:
         """Baut Host-Daten für das Scanner Management"""
@@ -920,15 +1889,19 @@ class NetworkScanner:
 
         # ntopng Hosts einbeziehen wenn verfügbar
         if self.ntopng.enabled:
-            ntopng_hosts = self.ntopng.fetch_hosts()
+            # Snapshot aus Schritt 0 des Zyklus wiederverwenden
+            ntopng_hosts = self.ntopng.last_hosts
+            if ntopng_hosts is None:
+                ntopng_hosts = self.ntopng.fetch_hosts()
             if ntopng_hosts:
                 for h in ntopng_hosts:
                     if isinstance(h, dict):
                         ip = h.get("ip", h.get("host", ""))
                         if ip and ip not in [d.get("ip") for d in hosts]:
+                            name = h.get("name", h.get("symbolic_name", ip))
                             hosts.append({
                                 "ip": ip,
-                                "name": h.get("name", h.get("symbolic_name", ip)),
+                                "name": self.host_name(ip) if name == ip else name,
                                 "type": "unknown",
                                 "vendor": h.get("os", "Unknown"),
                                 "status": "online",
@@ -973,11 +1946,13 @@ class NetworkScanner:
             else:
                 host_type = "unknown"
 
+            # Ohne Messwert (Deadline) bleibt das per SNMP erreichbare Gerät online, ohne Ping
             status = "online"
-            if latency["loss"] >= 100:
-                status = "offline"
-            elif latency["avg"] > 50 or latency["loss"] > 1:
-                status = "warning"
+            if latency["loss"] is not None:
+                if latency["loss"] >= 100:
+                    status = "offline"
+                elif latency["avg"] > 50 or latency["loss"] > 1:
+                    status = "warning"
 
             host = {
                 "ip": ip,
@@ -986,7 +1961,7 @@ class NetworkScanner:
                 "vendor": device.get("vendor", "Unknown"),
                 "status": status,
                 "lastSeen": device.get("last_seen", datetime.now().isoformat()),
-                "ping": round(latency["avg"], 1) if latency["avg"] > 0 else None,
+                "ping": round(latency["avg"], 1) if latency["avg"] else None,
                 "interfaces": len(device.get("interfaces", [])),
                 "cpu": int(device.get("metrics", {}).get("cpuUsage", 0) or 0),
                 "memory": int(device.get("metrics", {}).get("memoryUsed", 0) or 0),
@@ -994,6 +1969,35 @@ class NetworkScanner:
             }
             hosts.append(host)
 
+        # Gefundene Hosts ohne SNMP mit aufgelöstem Namen (PTR, mDNS, NetBIOS) oder Hersteller (OUI)
+        known = {h.get("ip"): h for h in hosts}
+        stations = self.wifi_stations()
+        for ip, unmanaged in self.unmanaged_hosts(stations).items():
+            if ip in known:
+                # ntopng-Host ohne Betriebssystem-Angabe: Hersteller aus der MAC
+                if unmanaged["vendor"] and known[ip].get("vendor", "Unknown") == "Unknown":
+                    known[ip]["vendor"] = unmanaged["vendor"]
+                continue
+            hosts.append({
+                "ip": ip,
+                "name": unmanaged["name"],
+                "type": "console" if unmanaged["class"] in CONSOLE_LABELS else "unknown",
+                "vendor": unmanaged["vendor"] or "Unknown",
+                "status": "online",
+                "lastSeen": datetime.now().isoformat(),
+                "ping": None,
+                "interfaces": 0,
+                "cpu": 0,
+                "memory": 0,
+                "source": unmanaged["source"],
+            })
+
+        # WLAN-Clients: Signal und Raten vom AP
+        for host in hosts:
+            station = stations.get(host["ip"])
+            if station:
+                host["wifi"] = self.station_payload(station)
+
         # Sort by IP
         hosts.sort(key=lambda x: [int(p) for p in x.get("ip", "0.0.0.0").split(".") if p.isdigit()] or [0, 0, 0, 0])
 
@@ -1012,20 +2016,97 @@ class NetworkScanner:
             "ntopng_stats": ntopng_stats if ntopng_stats else None
         }
 
+    def handle_trap_events(self, events: List[Any]):
+        """
+        Nimmt Trap-Ereignisse an (Trap-Thread). Läuft gerade kein Zyklus, werden sie sofort
+        angewendet und die Zustandswechsel gepusht, sonst übernimmt sie der laufende Zyklus.
+        """
+        self.trap_events.extend(events)
+        if not self._cycle_lock.acquire(blocking=False):
+            return
+        try:
+            if not self.apply_trap_events():
+                return
+            alerts = self.alert_engine.evaluate(cycle=False)
+        finally:
+            self._cycle_lock.release()
+
+        if alerts:
+            logger.info(f"Trap: {len(alerts)} Statusänderung(en), sende Alerts")
+            self.send_to_api("alerts", {"alerts": alerts})
+            if self.local_api:
+                self.local_api.publish("alerts", {"alerts": alerts})
+
+    def apply_trap_events(self) -> bool:
+        """
+        Wendet wartende Trap-Ereignisse auf Geräte-Register und Alert-Engine an
+        (nur unter _cycle_lock). Neu gestartete Geräte fragt der nächste Zyklus neu ab.
+        """
+        changed = set()
+        while self.trap_events:
+            event = self.trap_events.popleft()
+            device = self.devices.get(event.ip)
+            if not device:
+                # Unbekanntes Gerät - wird beim nächsten Zyklus erfasst
+                logger.debug(f"Trap von unbekanntem Gerät {event.ip}: {event.event}")
+                continue
+
+            if event.event in ("linkDown", "linkUp"):
+                new_status = "down" if event.event == "linkDown" else "up"
+                interface = next((i for i in device.get("interfaces", []) if i.get("index") == event.if_index), None)
+                if not interface or interface.get("status") == new_status:
+                    continue
+                interface["status"] = new_status
+                logger.info(f"Trap: {device.get('name', event.ip)} Interface "
+                            f"{interface.get('name', event.if_index)} {new_status}")
+            elif event.ip not in self.trap_restarts:
+                # Neustart: Counter sind zurückgesetzt, Profil neu lernen
+                logger.info(f"Trap: {device.get('name', event.ip)} neu gestartet ({event.event})")
+                self.last_octets.pop(event.ip, None)
+                self.snmp_profiles.invalidate(event.ip)
+                self.trap_restarts.add(event.ip)
+            changed.add(event.ip)
+
+        # Gleiche Regeln und gleicher Lebenszyklus (raised/ongoing/cleared) wie im Zyklus
+        for ip in changed:
+            device = self.devices[ip]
+            self.alert_engine.update(ip, device.get("name", ip), self.device_alert_metrics(ip, device))
+        return bool(changed)
+
+    @property
+    def api_session(self):
+        """HTTP-Session für die Edge Functions (Keep-Alive über alle Endpoints)"""
+        if self._api_session is None and self.shared is not None:
+            self._api_session = self.shared.api_session(load_backend("http").Session)
+        if self._api_session is None:
+            self._api_session = load_backend("http").Session()
+        return self._api_session
+
     def send_to_api(self, endpoint: str, data: Dict) -> bool:
-        """Sendet Daten an die Edge Function"""
+        """Sendet Daten an die Edge Function (einmal serialisiert im konfigurierten Upload-Format)"""
+        encoder = self.payload_encoder
+        if encoder.format != "json" and encoder.packer is None:
+            try:
+                encoder.packer = load_backend(encoder.format)
+            except ImportError:
+                encoder.format = "json"
+
         try:
             url = f"{self.api_url}/{endpoint}"
+            payload = encoder.encode(data, endpoint)
             headers = {
-                "Content-Type": "application/json",
+                **payload.headers,
                 "Authorization": f"Bearer {self.api_key}" if self.api_key else "",
                 "apikey": self.api_key if self.api_key else ""
             }
 
-            response = requests.post(url, json=data, headers=headers, timeout=10)
+            response = self.api_session.post(url, data=payload.body, headers=headers, timeout=10)
+            if response.status_code == 415 and encoder.refused(endpoint):
+                # Ältere Edge Function ohne Format-Unterstützung
+                return self.send_to_api(endpoint, data)
 
             if response.status_code in [200, 201]:
-                logger.debug(f"Daten erfolgreich an {endpoint} gesendet")
+                logger.debug(f"{endpoint}: {len(payload.body)} Bytes gesendet ({payload.raw_size} unkomprimiert)")
                 return True
             else:
                 logger.warning(f"API-Fehler {endpoint}: {response.status_code} - {response.text}")
@@ -1035,51 +2116,67 @@ class NetworkScanner:
             logger.error(f"Fehler beim Senden an {endpoint}: {e}")
             return False
 
+    def publish(self, payloads: List[Tuple[str, Dict]]):
+        """Sendet die Payloads eines Zyklus (Multi-Site: parallel über den gemeinsamen Publish-Pool)"""
+        if self.shared is None:
+            for endpoint, data in payloads:
+                self.send_to_api(endpoint, data)
+            return
+        lane = self.shared.lane("publish", self.site_name)
+        for future in [lane.submit(self.send_to_api, endpoint, data) for endpoint, data in payloads]:
+            future.result()
+
     def run_scan_cycle(self, subnet: Optional[str] = None):
-        """Führt einen kompletten Scan-Zyklus durch"""
+        """Führt einen kompletten Scan-Zyklus durch (Traps werden solange zurückgestellt)"""
+        with self._cycle_lock:
+            result = self._scan_cycle(subnet)
+        # Traps nach der Alert-Auswertung des Zyklus nicht bis zum nächsten Zyklus liegen lassen
+        if self.trap_events:
+            self.handle_trap_events([])
+        return result
+
+    def _scan_cycle(self, subnet: Optional[str] = None):
         logger.info("=" * 50)
         logger.info("Starte Scan-Zyklus")
 
-        # 0. ntopng Daten abrufen (schnell, parallel zum Scan)
-        if self.ntopng.enabled:
-            logger.info("Rufe ntopng-Daten ab...")
-            self.ntopng.fetch_interface_data()
-            if self.ntopng.last_data:
-                host_stats = self.ntopng.get_host_stats()
-                logger.info(f"  → ntopng: {host_stats.get('num_hosts', 0)} Hosts, {host_stats.get('num_flows', 0)} Flows")
-
-        # 1. Netzwerk scannen
-        active_hosts = self.scan_network(subnet)
-
-        # 2. SNMP-Daten sammeln
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            future_to_ip = {executor.submit(self.collect_device_data, ip): ip for ip in active_hosts}
+        # 1. Collectors: ntopng, Discovery, Latenz und Plugins gleichzeitig, SNMP sobald Hosts vorliegen
+        self.collected, pending = self.collectors.run(subnet, self.scheduler.deadline("latency"))
+        self._partial.update(pending)
 
-            for future in as_completed(future_to_ip):
-                ip = future_to_ip[future]
-                try:
-                    device_data = future.result()
-                    if device_data:
-                        self.devices[ip] = device_data
-                        logger.info(f"✓ {ip}: {device_data['name']} ({device_data['type']})")
-                except Exception as e:
-                    logger.debug(f"Fehler bei {ip}: {e}")
+        self.last_scan_time = self.clock()
+        self.snmp_profiles.save()
 
-        self.last_scan_time = time.time()
-
-        # 3. Daten aggregieren und senden
+        # 2. Daten aggregieren und senden
         bandwidth_data = self.aggregate_bandwidth_data()
         infrastructure_data = self.build_infrastructure_data()
         gaming_data = self.build_gaming_devices_data()
         alerts_data = self.build_alerts_data()
         hosts_data = self.build_hosts_data()
 
-        # 4. An API senden
-        self.send_to_api("bandwidth", bandwidth_data)
-        self.send_to_api("network-infrastructure", infrastructure_data)
-        self.send_to_api("gaming-devices", gaming_data)
-        self.send_to_api("alerts", {"alerts": alerts_data})
-        self.send_to_api("hosts", hosts_data)
+        # Unvollständige Stufen kennzeichnen (Dashboard zeigt Teil-Aktualisierung)
+        partial = sorted(self._partial)
+        self._partial = set()
+        for payload in (bandwidth_data, infrastructure_data, gaming_data, hosts_data):
+            payload["partial"] = partial
+
+        payloads = [
+            ("bandwidth", bandwidth_data),
+            ("network-infrastructure", infrastructure_data),
+            ("gaming-devices", gaming_data),
+            ("alerts", {"alerts": alerts_data}),
+            ("hosts", hosts_data),
+        ]
+
+        # 3. An API senden
+        self.publish(payloads)
+
+        # 4. Lokale API aktualisieren (einmal serialisieren, beliebig oft ausliefern)
+        if self.local_api:
+            self.local_api.publish_cycle(payloads)
+
+        # 5. Shared-Memory-Snapshot schreiben (lokale Leser ohne HTTP)
+        if self.shared_snapshot:
+            self.shared_snapshot.publish_cycle(payloads, self.devices, time.time())
 
         logger.info(f"Scan-Zyklus abgeschlossen: {len(self.devices)} Geräte gefunden")
         logger.info(f"  → Quelle: {bandwidth_data.get('source', 'unknown')}")
@@ -1087,6 +2184,10 @@ class NetworkScanner:
         logger.info(f"  → Infrastructure: {infrastructure_data['total_devices']} Geräte")
         logger.info(f"  → Gaming: {gaming_data['total_gaming_devices']} Geräte")
         logger.info(f"  → Hosts: {hosts_data['total_hosts']} (online: {hosts_data['online_count']})")
+        if partial:
+            logger.info(f"  → Teilweise: {', '.join(partial)} (Rest folgt im nächsten Zyklus)")
+        if self.snmp_concurrency:
+            logger.debug(f"  → SNMP-Fenster: {self.snmp_concurrency.stats()}")
         logger.info("=" * 50)
 
         return {
@@ -1095,19 +2196,40 @@ class NetworkScanner:
             "infrastructure": infrastructure_data,
             "hosts": hosts_data,
             "alerts": len(alerts_data),
-            "source": bandwidth_data.get("source", "snmp")
+            "source": bandwidth_data.get("source", "snmp"),
+            "partial": partial,
         }
 
+    def run_scheduled_cycle(self, subnet: Optional[str] = None, start: Optional[float] = None):
+        """Ein Zyklus mit den Stufen-Deadlines ab start (monotonic Rasterpunkt)"""
+        self.scheduler.begin_cycle(time.monotonic() if start is None else start)
+        try:
+            return self.run_scan_cycle(subnet)
+        finally:
+            self.scheduler.end_cycle()
+
     def run_continuous(self, subnet: Optional[str] = None):
         """Kontinuierlicher Scan-Loop"""
         logger.info(f"Starte kontinuierliches Monitoring (Intervall: {self.scan_interval}s)")
         if self.ntopng.enabled:
-            logger.info(f"  → ntopng Integration aktiviert: {self.ntopng.base_url}")
+            logger.info(f"  → ntopng Integration aktiviert: {self.ntopng.describe()}")
+        if self.local_api:
+            self.local_api.start()
+        if self.trap_receiver:
+            self.trap_receiver.start()
+        if self.name_resolver:
+            self.name_resolver.start()
 
         while True:
             try:
-                self.run_scan_cycle(subnet)
-                time.sleep(self.scan_interval)
+                if self.scheduler.fixed_rate:
+                    # Start auf dem Zeitraster: Periode = Intervall, unabhängig von der Zyklusdauer
+                    start = self.scheduler.next_start()
+                    time.sleep(max(0.0, start - time.monotonic()))
+                    self.run_scheduled_cycle(subnet, start)
+                else:
+                    self.run_scan_cycle(subnet)
+                    time.sleep(self.scan_interval)
             except KeyboardInterrupt:
                 logger.info("Monitoring gestoppt")
                 break
@@ -1116,6 +2238,18 @@ class NetworkScanner:
                 time.sleep(5)
 
 
+def replay_trace(path: str, overrides: Dict[str, Any]):
+    """Spielt einen aufgezeichneten Trace ohne Netzwerk-I/O ab (CPU-Profiling der Pipeline)"""
+    trace = load_backend("trace").TraceReplayer(path)
+    scanner = NetworkScanner(trace.replay_config(overrides))
+    trace.attach(scanner)
+    result = trace.run(scanner)
+    cycles = max(1, result["cycles"])
+    print(f"\nReplay: {result['cycles']} Zyklen in {result['total_ms']:.1f} ms "
+          f"({result['total_ms'] / cycles:.2f} ms/Zyklus), {result['sent_bytes']} Bytes serialisiert, "
+          f"{result['misses']} Aufrufe nicht im Trace")
+
+
 # ============================================================================
 # Main Entry Point
 # ============================================================================
@@ -1130,12 +2264,18 @@ def main():
     parser.add_argument("--config", help="Pfad zur Konfigurationsdatei")
     parser.add_argument("--ntopng-url", help="ntopng URL (z.B. http://192.168.1.50:3000)")
     parser.add_argument("--ntopng-ifid", type=int, default=1, help="ntopng Interface ID")
+    parser.add_argument("--local-api-port", type=int, help="Lokale Read-API auf diesem Port starten")
+    parser.add_argument("--record", metavar="TRACE", help="Collector-Antworten in eine Trace-Datei aufzeichnen (.jsonl.gz)")
+    parser.add_argument("--replay", metavar="TRACE", help="Trace ohne Netzwerk abspielen und Zykluszeiten ausgeben")
     parser.add_argument("--verbose", "-v", action="store_true", help="Ausführliche Ausgabe")
 
     args = parser.parse_args()
 
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
+    elif args.replay:
+        # Log-Ausgabe pro Gerät würde die gemessene CPU-Zeit dominieren
+        logging.getLogger().setLevel(logging.WARNING)
 
     # Konfiguration laden
     config = {
@@ -1157,11 +2297,33 @@ def main():
     }
 
     # Config-Datei laden wenn vorhanden
+    file_config = {}
     if args.config and os.path.exists(args.config):
         with open(args.config) as f:
             file_config = json.load(f)
             config.update(file_config)
 
+    if args.replay:
+        # Aufgezeichnete Config, Config-Datei nur als Override (z.B. anderes upload_encoding)
+        replay_trace(args.replay, file_config)
+        return
+
+    if args.local_api_port:
+        config["local_api"] = {**config.get("local_api", {}), "enabled": True, "port": args.local_api_port}
+
+    if config.get("sites"):
+        # Mehrere Sites in einem Prozess, gemeinsame Pools (siehe multi_site.py)
+        runner = load_backend("multi_site").MultiSiteRunner(config, NetworkScanner)
+        if args.record:
+            logger.warning("--record wird im Multi-Site-Modus nicht unterstützt, zeichne nicht auf")
+        print(f"  🏟️  Multi-Site: {len(runner.sites)} Sites ({', '.join(runner.sites)})")
+        if args.once:
+            results = runner.run_once()
+            print(f"\nErgebnis: {json.dumps(results, indent=2)}")
+        else:
+            runner.run_continuous()
+        return
+
     scanner = NetworkScanner(config)
 
     print("""
@@ -1173,13 +2335,25 @@ def main():
     """)
 
     if scanner.ntopng.enabled:
-        print(f"  📊 ntopng Integration: {scanner.ntopng.base_url} (ifid={scanner.ntopng.interface_id})")
-
-    if args.once:
-        result = scanner.run_scan_cycle(args.subnet)
-        print(f"\nErgebnis: {json.dumps(result, indent=2)}")
-    else:
-        scanner.run_continuous(args.subnet)
+        print(f"  📊 ntopng Integration: {scanner.ntopng.describe()}")
+    if scanner.local_api:
+        print(f"  🌐 Lokale API: http://{scanner.local_api.host}:{scanner.local_api.port}")
+
+    recorder = None
+    if args.record:
+        recorder = load_backend("trace").TraceRecorder(args.record)
+        recorder.attach(scanner)
+
+    try:
+        if args.once:
+            # Auch der Einzellauf hält die Stufen-Deadlines ein (ein stummer Host blockiert nicht)
+            result = scanner.run_scheduled_cycle(args.subnet)
+            print(f"\nErgebnis: {json.dumps(result, indent=2)}")
+        else:
+            scanner.run_continuous(args.subnet)
+    finally:
+        if recorder:
+            recorder.close()
 
 
 if __name__ == "__main__":
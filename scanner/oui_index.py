@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+OUI Index - Hersteller-Lookup über das MAC-Präfix (IEEE MA-L/MA-M/MA-S).
+Die Registry wird einmal in eine sortierte Indexdatei mit Records fester Breite
+übersetzt. Der Scanner bildet sie per mmap ab (kein Parsen beim Start) und sucht
+binär, so kosten Hersteller und Geräteklasse eines Hosts wenige Mikrosekunden,
+ganz ohne SNMP-Versuch.
+
+    python oui_index.py build -o oui.idx oui.csv mam.csv oas.csv
+    python oui_index.py lookup -i oui.idx 7c:bb:8a:12:34:56
+
+Quellen: IEEE-CSV (https://standards-oui.ieee.org/oui/oui.csv, mam.csv, oas.csv),
+Wireshark "manuf" oder nmap-mac-prefixes.
+"""
+
+import os
+import re
+import csv
+import mmap
+import struct
+import logging
+import argparse
+from typing import Dict, List, Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GNOUI001"
+VERSION = 1
+
+# Header: magic, version, Anzahl Records, Offset der String-Tabelle, vorhandene Präfixlängen (Bitmaske)
+HEADER = struct.Struct("<8sIIIQ")
+# Record: Präfix (6 Bytes, nach Länge maskiert), Präfixlänge in Bit, Hersteller (Offset, Länge).
+# Die ersten 7 Bytes sind der Sortierschlüssel
+RECORD = struct.Struct("<6sBxIH")
+KEY_SIZE = 7
+
+# Hersteller-Stichwort (Kleinschreibung) -> Geräteklasse. Microsoft fehlt bewusst: dieselben
+# Präfixe tragen Hyper-V-VMs und Surface-Geräte, Xbox-Präfixe stehen in oui.prefixes
+DEFAULT_CLASSES = {
+    "nintendo": "nintendo",
+    "sony interactive": "playstation",
+}
+
+MAC_HEX = re.compile(r"[^0-9a-fA-F]")
+
+
+def mac_bytes(mac: str) -> Optional[bytes]:
+    """aa:bb:cc:dd:ee:ff / aa-bb-... / aabb.ccdd.eeff -> 6 Bytes"""
+    digits = MAC_HEX.sub("", mac or "")
+    if len(digits) != 12:
+        return None
+    return bytes.fromhex(digits)
+
+
+def _mask(raw: bytes, bits: int) -> bytes:
+    value = int.from_bytes(raw, "big") >> (48 - bits) << (48 - bits)
+    return value.to_bytes(6, "big")
+
+
+# ============================================================================
+# Index bauen
+# ============================================================================
+
+def parse_source(path: str) -> List[Tuple[bytes, int, str]]:
+    """Liest IEEE-CSV, Wireshark-manuf oder nmap-mac-prefixes -> (Präfix, Bits, Hersteller)"""
+    entries = []
+    with open(path, encoding="utf-8", errors="replace", newline="") as f:
+        first = f.readline()
+        f.seek(0)
+        if first.startswith("Registry,"):
+            # IEEE: Registry,Assignment,Organization Name,Organization Address
+            for row in csv.DictReader(f):
+                assignment = row.get("Assignment", "").strip()
+                name = row.get("Organization Name", "").strip()
+                if assignment and name:
+                    bits = len(assignment) * 4
+                    entries.append((_mask(bytes.fromhex(assignment.ljust(12, "0")), bits), bits, name))
+            return entries
+
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if "\t" in line:
+                # Wireshark: 00:1B:C5:00:00:00/36<TAB>Kurzname<TAB>Langname
+                fields = line.split("\t")
+                prefix, _, length = fields[0].partition("/")
+                name = (fields[2] if len(fields) > 2 and fields[2] else fields[1]).strip()
+            else:
+                # nmap: 7CBB8A Nintendo
+                prefix, _, name = line.partition(" ")
+                length = ""
+            digits = MAC_HEX.sub("", prefix)
+            if not digits or not name:
+                continue
+            bits = int(length) if length else len(digits) * 4
+            entries.append((_mask(bytes.fromhex(digits.ljust(12, "0")[:12]), bits), bits, name.strip()))
+    return entries
+
+
+def build_index(sources: List[str], output: str) -> int:
+    """Schreibt den Index (spätere Quellen überschreiben gleiche Präfixe); liefert die Anzahl Records"""
+    prefixes: Dict[Tuple[bytes, int], str] = {}
+    for path in sources:
+        for prefix, bits, name in parse_source(path):
+            prefixes[(prefix, bits)] = name
+
+    strings = bytearray()
+    offsets: Dict[str, Tuple[int, int]] = {}
+    records = bytearray()
+    lengths = 0
+    for (prefix, bits), name in sorted(prefixes.items()):
+        ref = offsets.get(name)
+        if ref is None:
+            encoded = name.encode("utf-8")[:0xFFFF]
+            ref = offsets[name] = (len(strings), len(encoded))
+            strings += encoded
+        records += RECORD.pack(prefix, bits, *ref)
+        lengths |= 1 << bits
+
+    temp_path = f"{output}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(prefixes), HEADER.size + len(records), lengths))
+        f.write(records)
+        f.write(strings)
+    os.replace(temp_path, output)
+    return len(prefixes)
+
+
+# ============================================================================
+# Lookup
+# ============================================================================
+
+class OuiIndex:
+    """Memory-mapped OUI-Index mit Klassifizierung nach Hersteller (oui-Block der Config)"""
+
+    def __init__(self, config: Dict[str, Any]):
+        oui_config = config.get("oui", {})
+        self.path = oui_config.get("index_file", "oui.idx")
+        # MACs zusätzlich aus der Kernel-Nachbartabelle (lokales Subnetz)
+        self.neighbours = oui_config.get("neighbours", True)
+        self.classes = {k.lower(): v for k, v in {**DEFAULT_CLASSES, **oui_config.get("classes", {})}.items()}
+        # MAC-Präfix (Hex-Ziffern) -> Geräteklasse, vor den Hersteller-Stichwörtern geprüft
+        self.prefixes = {MAC_HEX.sub("", k).lower(): v for k, v in oui_config.get("prefixes", {}).items()}
+        self._prefix_lengths = sorted({len(k) for k in self.prefixes}, reverse=True)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self._strings, lengths = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{self.path}: kein OUI-Index (Version {VERSION})")
+        # Längstes Präfix zuerst: MA-S (36) vor MA-M (28) vor MA-L (24)
+        self._lengths = [bits for bits in range(48, 0, -1) if lengths >> bits & 1]
+        self._class_cache: Dict[str, Optional[str]] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _find(self, key: bytes) -> int:
+        """Binärsuche nach einem Sortierschlüssel; Record-Nummer oder -1"""
+        buffer = self._map
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = HEADER.size + mid * RECORD.size
+            current = buffer[offset:offset + KEY_SIZE]
+            if current < key:
+                lo = mid + 1
+            elif current > key:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def lookup(self, mac: str) -> Optional[str]:
+        """Hersteller einer MAC (None bei unbekanntem oder lokal verwaltetem Präfix)"""
+        raw = mac_bytes(mac)
+        # Lokal verwaltete Adressen (zufällige MACs von Smartphones) haben keinen Hersteller
+        if raw is None or raw[0] & 0x02:
+            return None
+        for bits in self._lengths:
+            row = self._find(_mask(raw, bits) + bytes([bits]))
+            if row >= 0:
+                _, _, offset, length = RECORD.unpack_from(self._map, HEADER.size + row * RECORD.size)
+                start = self._strings + offset
+                return self._map[start:start + length].decode("utf-8", "replace")
+        return None
+
+    def device_class(self, vendor: Optional[str]) -> Optional[str]:
+        """Geräteklasse eines Herstellers (nintendo, playstation oder aus oui.classes)"""
+        if not vendor:
+            return None
+        if vendor not in self._class_cache:
+            vendor_lower = vendor.lower()
+            self._class_cache[vendor] = next(
+                (cls for keyword, cls in self.classes.items() if keyword in vendor_lower), None)
+        return self._class_cache[vendor]
+
+    def classify(self, mac: str) -> Tuple[Optional[str], Optional[str]]:
+        """(Hersteller, Geräteklasse) einer MAC - oui.prefixes vor dem Hersteller"""
+        vendor = self.lookup(mac)
+        if self.prefixes:
+            digits = MAC_HEX.sub("", mac or "").lower()
+            for length in self._prefix_lengths:
+                device_class = self.prefixes.get(digits[:length])
+                if device_class:
+                    return vendor, device_class
+        return vendor, self.device_class(vendor)
+
+    def close(self):
+        self._map.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OUI-Index bauen und abfragen")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="Index aus IEEE-CSV/manuf/nmap-Dateien bauen")
+    build.add_argument("sources", nargs="+", help="oui.csv, mam.csv, oas.csv, manuf oder nmap-mac-prefixes")
+    build.add_argument("-o", "--output", default="oui.idx", help="Indexdatei (Standard: oui.idx)")
+    lookup = commands.add_parser("lookup", help="Hersteller einer oder mehrerer MACs")
+    lookup.add_argument("macs", nargs="+")
+    lookup.add_argument("-i", "--index", default="oui.idx", help="Indexdatei (Standard: oui.idx)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_index(args.sources, args.output)
+        print(f"{args.output}: {count} Präfixe ({os.path.getsize(args.output) // 1024} KB)")
+        return
+
+    index = OuiIndex({"oui": {"index_file": args.index}})
+    for mac in args.macs:
+        vendor, device_class = index.classify(mac)
+        print(f"{mac}\t{vendor or '-'}\t{device_class or '-'}")
+
+
+if __name__ == "__main__":
+    main()
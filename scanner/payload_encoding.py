@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Payload-Encoding für Uploads an die Edge Functions.
+Kompaktes JSON (ohne Leerzeichen), MessagePack oder CBOR, optional gzip/deflate
+komprimiert. Jeder Payload wird pro Zyklus genau einmal serialisiert. Lehnt eine
+Edge Function das Format ab (415), fällt der Endpoint dauerhaft auf JSON zurück.
+"""
+
+import json
+import zlib
+import logging
+from typing import Dict, Optional, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "msgpack": "application/msgpack",
+    "cbor": "application/cbor",
+}
+
+# zlib wbits: 31 = gzip-Header, 15 = zlib ("deflate" im HTTP-Sinn)
+COMPRESSION_WBITS = {
+    "gzip": 31,
+    "deflate": 15,
+}
+
+
+class EncodedPayload:
+    """Fertig serialisierter Body inkl. Header"""
+
+    __slots__ = ("body", "headers", "raw_size")
+
+    def __init__(self, body: bytes, headers: Dict[str, str], raw_size: int):
+        self.body = body
+        self.headers = headers
+        self.raw_size = raw_size
+
+
+class PayloadEncoder:
+    """Serialisiert Payloads im konfigurierten Format (upload_encoding-Block der Config)"""
+
+    def __init__(self, config: Dict[str, Any], packer: Optional[Callable[[Any], bytes]] = None):
+        encoding_config = config.get("upload_encoding", {})
+        self.format = encoding_config.get("format", "json")
+        self.compression = encoding_config.get("compression", "gzip")
+        # Level 1: kaum größer als 6, aber deutlich weniger CPU pro Zyklus
+        self.level = encoding_config.get("level", 1)
+        # Kleine Payloads (z.B. einzelne Trap-Alerts) lohnen die Kompression nicht
+        self.min_bytes = encoding_config.get("min_bytes", 1024)
+        if self.format not in CONTENT_TYPES:
+            logger.warning(f"Unbekanntes Upload-Format '{self.format}', verwende json")
+            self.format = "json"
+        if self.compression not in COMPRESSION_WBITS:
+            self.compression = "none"
+        # Binärformat-Serialisierer (msgpack.packb / cbor2.dumps), vom Scanner geladen
+        self.packer = packer
+        self._json = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False, default=str)
+        self._json_only: set = set()
+
+    def encode(self, data: Any, endpoint: Optional[str] = None) -> EncodedPayload:
+        """Serialisiert und komprimiert einen Payload"""
+        fmt = self.format
+        if endpoint in self._json_only or (fmt != "json" and self.packer is None):
+            fmt = "json"
+
+        if fmt == "json":
+            raw = self._json.encode(data).encode("utf-8")
+        else:
+            raw = self.packer(data)
+
+        headers = {"Content-Type": CONTENT_TYPES[fmt]}
+        body = raw
+        if self.compression != "none" and len(raw) >= self.min_bytes and endpoint not in self._json_only:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, COMPRESSION_WBITS[self.compression])
+            body = compressor.compress(raw) + compressor.flush()
+            headers["Content-Encoding"] = self.compression
+
+        return EncodedPayload(body, headers, len(raw))
+
+    def refused(self, endpoint: str) -> bool:
+        """Endpoint hat das Format abgelehnt -> künftig unkomprimiertes JSON. False wenn schon JSON."""
+        if endpoint in self._json_only or (self.format == "json" and self.compression == "none"):
+            return False
+        logger.warning(f"{endpoint}: Upload-Format {self.format}/{self.compression} abgelehnt, verwende JSON")
+        self._json_only.add(endpoint)
+        return True
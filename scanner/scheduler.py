@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Zyklus-Scheduler - Fester Takt mit Deadlines pro Stufe.
+Zyklen starten auf einem Zeitraster (Start + k * Intervall) statt Intervall nach
+dem Ende des letzten Zyklus. Jede Stufe (Discovery, SNMP, Latenz) bekommt einen
+Anteil des Intervalls; was bis zur Deadline fertig ist, wird veröffentlicht,
+der Rest läuft weiter bzw. wird in den nächsten Zyklus übernommen.
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Dict, List, Optional, Any, Callable, Hashable, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Anteil des Scan-Intervalls pro Stufe (Deadlines kumulativ ab Zyklusstart)
+DEFAULT_STAGE_BUDGETS = {
+    "discovery": 0.3,
+    "snmp": 0.4,
+    "latency": 0.2,
+}
+
+STAGE_ORDER = ("discovery", "snmp", "latency")
+
+
+class CycleScheduler:
+    """Zeitraster für Zyklusstarts und Deadlines der Stufen (scheduler-Block der Config)"""
+
+    def __init__(self, config: Dict[str, Any], interval: float):
+        scheduler_config = config.get("scheduler", {})
+        self.fixed_rate = scheduler_config.get("fixed_rate", True)
+        self.interval = float(interval)
+        self.budgets = {**DEFAULT_STAGE_BUDGETS, **scheduler_config.get("stage_budgets", {})}
+        self.origin: Optional[float] = None
+        self._tick = 0
+        self.cycle_start: Optional[float] = None
+        self.skipped = 0
+
+    def next_start(self, now: Optional[float] = None) -> float:
+        """Nächster Rasterpunkt (monotonic); verpasste Rasterpunkte werden übersprungen statt nachgeholt"""
+        now = time.monotonic() if now is None else now
+        if self.origin is None:
+            self.origin = now
+            self._tick = 0
+            return now
+        tick = self._tick + 1
+        if now > self.origin + tick * self.interval:
+            late = int((now - self.origin) // self.interval) + 1
+            self.skipped += late - tick
+            logger.warning(f"Zyklus überzog das Intervall, {late - tick} Rasterpunkt(e) übersprungen")
+            tick = late
+        self._tick = tick
+        return self.origin + tick * self.interval
+
+    def begin_cycle(self, start: float):
+        self.cycle_start = start
+
+    def end_cycle(self):
+        self.cycle_start = None
+
+    def deadline(self, stage: str) -> Optional[float]:
+        """Absolute Deadline (monotonic) einer Stufe, None ohne festen Takt bzw. außerhalb eines Zyklus"""
+        if not self.fixed_rate or self.cycle_start is None:
+            return None
+        share = 0.0
+        for name in STAGE_ORDER:
+            share += self.budgets.get(name, 0)
+            if name == stage:
+                break
+        return self.cycle_start + min(share, 1.0) * self.interval
+
+    def expired(self, stage: str) -> bool:
+        deadline = self.deadline(stage)
+        return deadline is not None and time.monotonic() >= deadline
+
+
+class DeadlineStage:
+    """
+    Stufe mit dauerhaftem Thread-Pool. run() wartet höchstens bis zur Deadline;
+    noch laufende Aufgaben werden im nächsten Zyklus eingesammelt, nicht gestartete
+    stehen dann vorne in der Warteschlange.
+    """
+
+    def __init__(self, name: str, max_workers: int, executor: Optional[Any] = None):
+        self.name = name
+        # Eigener Pool oder eine Lane eines gemeinsamen Pools (Multi-Site, siehe multi_site.py)
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.in_flight: Dict[Hashable, Future] = {}
+        self.carry: List[Hashable] = []
+
+    def run(self, keys: Iterable[Hashable], func: Callable[[Hashable], Any],
+            deadline: Optional[float] = None) -> Tuple[Dict[Hashable, Any], List[Hashable]]:
+        """Führt func(key) für alle keys aus. (Ergebnisse, unfertige keys)"""
+        results: Dict[Hashable, Any] = {}
+
+        # Späte Ergebnisse aus dem letzten Zyklus zählen für diesen
+        for key, future in list(self.in_flight.items()):
+            if future.done():
+                del self.in_flight[key]
+                self._collect(key, future, results)
+
+        wanted = list(dict.fromkeys([*self.carry, *keys]))
+        self.carry = []
+        futures = {
+            self.executor.submit(func, key): key
+            for key in wanted if key not in results and key not in self.in_flight
+        }
+        # Noch laufende Aufgaben aus dem letzten Zyklus bekommen dieselbe Deadline
+        futures.update({future: key for key, future in self.in_flight.items()})
+        self.in_flight = {}
+
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        done, not_done = wait(futures, timeout=timeout)
+        for future in done:
+            self._collect(futures[future], future, results)
+
+        pending = []
+        for future in not_done:
+            key = futures[future]
+            if future.cancel():
+                self.carry.append(key)
+            else:
+                self.in_flight[key] = future
+            pending.append(key)
+
+        if pending:
+            logger.info(f"{self.name}: Deadline erreicht, {len(pending)} Aufgabe(n) in den nächsten Zyklus übernommen")
+        return results, pending
+
+    def _collect(self, key: Hashable, future: Future, results: Dict[Hashable, Any]):
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            logger.debug(f"{self.name}: Fehler bei {key}: {e}")
+
+    def shutdown(self):
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
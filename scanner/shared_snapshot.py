@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Shared Snapshot - Zustand jedes Zyklus als memory-mapped Datei für lokale Tools.
+Festes Binärlayout (Header mit Seqlock-Zähler, Geräte- und Interface-Records fester
+Breite, String-Tabelle; siehe snapshot_reader.py). Der Body wird im Speicher
+aufgebaut und mit einer Kopie in die Datei geschrieben; der Zähler ist währenddessen
+ungerade, Leser wiederholen dann ihren Lesevorgang.
+"""
+
+import os
+import math
+import mmap
+import socket
+import logging
+from typing import Dict, List, Optional, Any, Tuple
+
+from snapshot_reader import (
+    MAGIC, VERSION, HEADER_SIZE, HEADER, SEQ, SEQ_OFFSET, DEVICE, INTERFACE,
+    FLAG_TRUNCATED, DEVICE_FLAG_GAMING, DEVICE_FLAG_SNMP, default_path, layout,
+)
+
+logger = logging.getLogger(__name__)
+
+NAN = math.nan
+
+
+def _number(value: Any) -> float:
+    try:
+        return NAN if value is None else float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+def _ip_key(ip: str) -> Optional[bytes]:
+    try:
+        return socket.inet_aton(ip)
+    except (OSError, TypeError):
+        return None
+
+
+class StringTable:
+    """UTF-8-Strings hintereinander, gleiche Strings nur einmal (Typen, Vendor, Status)"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = bytearray()
+        self.index: Dict[str, Tuple[int, int]] = {}
+        self.truncated = False
+
+    def add(self, value: Any) -> Tuple[int, int]:
+        value = "" if value is None else str(value)
+        ref = self.index.get(value)
+        if ref is not None:
+            return ref
+        encoded = value.encode("utf-8")[:0xFFFF]
+        if len(self.data) + len(encoded) > self.capacity:
+            self.truncated = True
+            return 0, 0
+        ref = (len(self.data), len(encoded))
+        self.data += encoded
+        self.index[value] = ref
+        return ref
+
+
+class SnapshotWriter:
+    """Schreibt den Zustand eines Zyklus in die Snapshot-Datei (shared_snapshot-Block der Config)"""
+
+    def __init__(self, config: Dict[str, Any]):
+        snapshot_config = config.get("shared_snapshot", {})
+        self.site = config.get("name", "default")
+        self.path = snapshot_config.get("path") or default_path(self.site)
+        self.max_devices = snapshot_config.get("max_devices", 4096)
+        self.max_interfaces = snapshot_config.get("max_interfaces", 65536)
+        self.string_capacity = snapshot_config.get("string_bytes", 1 << 20)
+        self.layout = layout(self.max_devices, self.max_interfaces, self.string_capacity)
+        self.cycle = 0
+        self._map: Optional[mmap.mmap] = None
+        self._seq = 0
+
+    def _open(self):
+        """Bestehende Datei mit passendem Layout weiterverwenden, sonst atomar ersetzen"""
+        size = self.layout["size"]
+        try:
+            with open(self.path, "r+b") as f:
+                header = f.read(HEADER.size)
+                if len(header) == HEADER.size and os.fstat(f.fileno()).st_size == size:
+                    fields = HEADER.unpack(header)
+                    if fields[:3] == (MAGIC, VERSION, HEADER_SIZE) and \
+                            fields[6:9] == (self.max_devices, self.max_interfaces, self.string_capacity):
+                        self._map = mmap.mmap(f.fileno(), size)
+                        # Zähler fortsetzen: Leser warten auf einen Wechsel
+                        self._seq = fields[3] + (fields[3] % 2)
+                        self.cycle = fields[4]
+                        return
+        except FileNotFoundError:
+            pass
+
+        # Neue Datei: Leser mit der alten Abbildung lesen gefahrlos weiter und öffnen beim Inode-Wechsel neu
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w+b") as f:
+            f.truncate(size)
+            f.write(HEADER.pack(MAGIC, VERSION, HEADER_SIZE, 0, 0, 0.0,
+                                self.max_devices, self.max_interfaces, self.string_capacity,
+                                0, 0, 0, 0, 0.0, 0.0, 0.0, 0.0, 0, 0, 0, 0, 0, 0))
+            f.flush()
+            os.replace(temp_path, self.path)
+            self._map = mmap.mmap(f.fileno(), size)
+        self._seq = 0
+        logger.info(f"Shared Snapshot: {self.path} ({size // 1024} KB, {self.max_devices} Geräte, "
+                    f"{self.max_interfaces} Interfaces)")
+
+    def publish_cycle(self, payloads: List[Tuple[str, Any]], devices: Dict[str, Dict], now: float):
+        """Übernimmt die Payloads eines Zyklus plus die SNMP-Geräte (Interfaces, Raten)"""
+        try:
+            self._publish(dict(payloads), devices, now)
+        except Exception as e:
+            logger.error(f"Shared Snapshot: Fehler beim Schreiben: {e}")
+
+    def _publish(self, payloads: Dict[str, Any], devices: Dict[str, Dict], now: float):
+        if self._map is None:
+            self._open()
+
+        bandwidth = payloads.get("bandwidth", {})
+        hosts = payloads.get("hosts", {}).get("hosts", [])
+        gaming = {d.get("ip"): d for d in payloads.get("gaming-devices", {}).get("devices", []) if d.get("ip")}
+
+        # Ein Record pro IP: Host-Liste (ntopng + SNMP), ergänzt um Gaming-Latenzen und SNMP-Details
+        records: Dict[bytes, Dict[str, Any]] = {}
+        for host in hosts:
+            key = _ip_key(host.get("ip"))
+            if key:
+                records[key] = {"host": host}
+        for ip, device in gaming.items():
+            key = _ip_key(ip)
+            if key:
+                records.setdefault(key, {})["gaming"] = device
+        for ip, device in devices.items():
+            key = _ip_key(ip)
+            if key:
+                records.setdefault(key, {})["snmp"] = device
+
+        strings = StringTable(self.string_capacity)
+        device_buffer = bytearray(DEVICE.size * min(len(records), self.max_devices))
+        interface_rows: List[bytes] = []
+        truncated = len(records) > self.max_devices
+
+        # Nach IP sortiert: Leser finden Geräte per Binärsuche
+        for row, key in enumerate(sorted(records)[:self.max_devices]):
+            record = records[key]
+            host = record.get("host", {})
+            game = record.get("gaming", {})
+            snmp = record.get("snmp", {})
+            metrics = snmp.get("metrics", {})
+            bw = metrics.get("bandwidth", {})
+
+            first = len(interface_rows)
+            for interface in snmp.get("interfaces", []):
+                if len(interface_rows) >= self.max_interfaces:
+                    truncated = True
+                    break
+                try:
+                    if_index = int(interface.get("index", 0))
+                except (TypeError, ValueError):
+                    if_index = 0
+                interface_rows.append(INTERFACE.pack(
+                    row, if_index, *strings.add(interface.get("name")),
+                    1 if interface.get("status") == "up" else 0,
+                    float(interface.get("speed", 0) or 0),
+                    int(interface.get("in_octets", 0) or 0) & 0xFFFFFFFFFFFFFFFF,
+                    int(interface.get("out_octets", 0) or 0) & 0xFFFFFFFFFFFFFFFF,
+                    _number(interface.get("anomaly")),
+                ))
+
+            flags = (DEVICE_FLAG_GAMING if game else 0) | (DEVICE_FLAG_SNMP if snmp else 0)
+            ping = game.get("ping", host.get("ping"))
+            DEVICE.pack_into(
+                device_buffer, row * DEVICE.size, key,
+                *strings.add(game.get("name") or snmp.get("name") or host.get("name") or socket.inet_ntoa(key)),
+                *strings.add(game.get("type") or snmp.get("type") or host.get("type", "unknown")),
+                *strings.add(snmp.get("vendor") or host.get("vendor", "Unknown")),
+                *strings.add(game.get("status") or host.get("status", "online")),
+                flags, first, len(interface_rows) - first,
+                _number(bw.get("in_bps")), _number(bw.get("out_bps")),
+                _number(ping), _number(game.get("packetLoss")),
+                _number(metrics.get("cpuUsage", host.get("cpu"))), _number(game.get("anomaly")),
+            )
+
+        source = strings.add(bandwidth.get("source", ""))
+        site = strings.add(self.site)
+        partial = strings.add(",".join(bandwidth.get("partial", [])))
+        truncated = truncated or strings.truncated
+        if truncated:
+            logger.warning("Shared Snapshot: Kapazität überschritten, Snapshot gekürzt")
+
+        interface_buffer = b"".join(interface_rows)
+        offsets = self.layout
+        buffer = self._map
+        self.cycle += 1
+
+        # Seqlock: ungerade während des Schreibens
+        self._seq += 1
+        SEQ.pack_into(buffer, SEQ_OFFSET, self._seq)
+        buffer[offsets["devices"]:offsets["devices"] + len(device_buffer)] = device_buffer
+        buffer[offsets["interfaces"]:offsets["interfaces"] + len(interface_buffer)] = interface_buffer
+        buffer[offsets["strings"]:offsets["strings"] + len(strings.data)] = strings.data
+        HEADER.pack_into(
+            buffer, 0, MAGIC, VERSION, HEADER_SIZE, self._seq, self.cycle, now,
+            self.max_devices, self.max_interfaces, self.string_capacity,
+            len(device_buffer) // DEVICE.size, len(interface_rows), len(strings.data),
+            FLAG_TRUNCATED if truncated else 0,
+            _number(bandwidth.get("upstream_gbps")), _number(bandwidth.get("downstream_gbps")),
+            _number(bandwidth.get("wifi_gbps")), _number(bandwidth.get("upstream_percent")),
+            *source, *site, *partial,
+        )
+        self._seq += 1
+        SEQ.pack_into(buffer, SEQ_OFFSET, self._seq)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
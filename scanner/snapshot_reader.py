@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Snapshot Reader - Lesezugriff auf den Shared-Memory-Snapshot des Scanners.
+Der Scanner schreibt nach jedem Zyklus Geräte, Interfaces, Bandbreite und Latenzen
+in eine memory-mapped Datei mit festem Binärlayout (siehe shared_snapshot.py).
+Lokale Tools (Wall-Displays, Bots, Bridges) lesen sie ohne Locks und ohne HTTP;
+ein Seqlock-Zähler im Header erkennt gleichzeitige Schreibvorgänge.
+Benötigt nur die Standardbibliothek und kann einzeln kopiert werden.
+
+    from snapshot_reader import SnapshotReader
+    reader = SnapshotReader()
+    snapshot = reader.read()
+    reader.wait_for_update(snapshot["seq"], timeout=60)
+
+    python snapshot_reader.py [--path PATH] [--watch]
+"""
+
+import os
+import sys
+import json
+import math
+import mmap
+import time
+import socket
+import struct
+import tempfile
+import argparse
+from typing import Dict, List, Optional, Any, Iterator
+
+MAGIC = b"GNSNAP01"
+VERSION = 1
+HEADER_SIZE = 128
+
+# Header (little-endian). seq steht auf Offset 16: ungerade = Schreibvorgang läuft
+HEADER = struct.Struct(
+    "<8sII"     # magic, version, header_size
+    "QQd"       # seq, cycle, timestamp
+    "III"       # max_devices, max_interfaces, string_capacity
+    "IIII"      # device_count, interface_count, string_size, flags
+    "dddd"      # upstream_gbps, downstream_gbps, wifi_gbps, upstream_percent
+    "IHIHIH"    # source, site, partial (String-Referenzen: Offset, Länge)
+)
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 16
+
+# Gerät: ip, name, type, vendor, status, flags, erstes Interface, Anzahl Interfaces,
+# in/out bps, ping ms, Paketverlust %, CPU %, Latenz-Anomalie-Score
+DEVICE = struct.Struct("<4sIHIHIHIHBxIHdddddd")
+# Interface: Geräte-Index, ifIndex, Name, Status (1 = up), Speed bps, in/out Octets, Anomalie-Score
+INTERFACE = struct.Struct("<IIIHBxdQQd")
+
+FLAG_TRUNCATED = 1
+DEVICE_FLAG_GAMING = 1
+DEVICE_FLAG_SNMP = 2
+
+# Wartezeit zwischen zwei Leseversuchen, wenn der Writer gerade schreibt
+RETRY_SLEEP = 0.0005
+
+
+def default_path(site: Optional[str] = None) -> str:
+    """Standard-Pfad: /dev/shm (RAM) wenn vorhanden, sonst das Temp-Verzeichnis"""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    suffix = f"-{site}" if site and site != "default" else ""
+    return os.path.join(directory, f"gaming-scanner{suffix}.snap")
+
+
+def layout(max_devices: int, max_interfaces: int, string_capacity: int) -> Dict[str, int]:
+    """Offsets der Bereiche und Dateigröße"""
+    devices = HEADER_SIZE
+    interfaces = devices + max_devices * DEVICE.size
+    strings = interfaces + max_interfaces * INTERFACE.size
+    return {"devices": devices, "interfaces": interfaces, "strings": strings, "size": strings + string_capacity}
+
+
+def _float(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+class SnapshotView:
+    """
+    Zero-Copy-Sicht auf einen Snapshot: Felder werden erst beim Zugriff aus der Datei gelesen.
+    Nur gültig, solange valid() True liefert; danach neu mit SnapshotReader.view() holen.
+    """
+
+    def __init__(self, buffer: Any, seq: int, header: tuple):
+        self._buffer = buffer
+        self.seq = seq
+        (_, _, _, _, self.cycle, self.timestamp, max_devices, max_interfaces, string_capacity,
+         self.device_count, self.interface_count, self.string_size, self.flags,
+         self.upstream_gbps, self.downstream_gbps, self.wifi_gbps, self.upstream_percent,
+         *refs) = header
+        offsets = layout(max_devices, max_interfaces, string_capacity)
+        self._devices = offsets["devices"]
+        self._interfaces = offsets["interfaces"]
+        self._strings = offsets["strings"]
+        self._refs = refs
+
+    def valid(self) -> bool:
+        """Unverändert seit dem Öffnen der Sicht (kein Zyklus dazwischen geschrieben)"""
+        return SEQ.unpack_from(self._buffer, SEQ_OFFSET)[0] == self.seq
+
+    def string(self, offset: int, length: int) -> str:
+        start = self._strings + offset
+        return bytes(self._buffer[start:start + length]).decode("utf-8", "replace")
+
+    @property
+    def source(self) -> str:
+        return self.string(self._refs[0], self._refs[1])
+
+    @property
+    def site(self) -> str:
+        return self.string(self._refs[2], self._refs[3])
+
+    @property
+    def partial(self) -> List[str]:
+        value = self.string(self._refs[4], self._refs[5])
+        return value.split(",") if value else []
+
+    def device_ip(self, index: int) -> bytes:
+        start = self._devices + index * DEVICE.size
+        return bytes(self._buffer[start:start + 4])
+
+    def device(self, index: int) -> Dict[str, Any]:
+        (ip, name_off, name_len, type_off, type_len, vendor_off, vendor_len, status_off, status_len,
+         flags, first, count, in_bps, out_bps, ping, loss, cpu, anomaly) = DEVICE.unpack_from(
+            self._buffer, self._devices + index * DEVICE.size)
+        return {
+            "ip": socket.inet_ntoa(ip),
+            "name": self.string(name_off, name_len),
+            "type": self.string(type_off, type_len),
+            "vendor": self.string(vendor_off, vendor_len),
+            "status": self.string(status_off, status_len),
+            "gaming": bool(flags & DEVICE_FLAG_GAMING),
+            "snmp": bool(flags & DEVICE_FLAG_SNMP),
+            "in_bps": _float(in_bps),
+            "out_bps": _float(out_bps),
+            "ping": _float(ping),
+            "packet_loss": _float(loss),
+            "cpu": _float(cpu),
+            "anomaly": _float(anomaly),
+            "interface_range": (first, count),
+        }
+
+    def devices(self) -> Iterator[Dict[str, Any]]:
+        for index in range(self.device_count):
+            yield self.device(index)
+
+    def interface(self, index: int) -> Dict[str, Any]:
+        (device, if_index, name_off, name_len, status, speed, in_octets, out_octets, anomaly) = \
+            INTERFACE.unpack_from(self._buffer, self._interfaces + index * INTERFACE.size)
+        return {
+            "device": device,
+            "index": if_index,
+            "name": self.string(name_off, name_len),
+            "status": "up" if status else "down",
+            "speed": speed,
+            "in_octets": in_octets,
+            "out_octets": out_octets,
+            "anomaly": _float(anomaly),
+        }
+
+    def interfaces(self, device: Dict[str, Any]) -> List[Dict[str, Any]]:
+        first, count = device["interface_range"]
+        return [self.interface(index) for index in range(first, first + count)]
+
+    def find(self, ip: str) -> Optional[Dict[str, Any]]:
+        """Gerät per IP (Binärsuche, Geräte liegen nach IP sortiert)"""
+        key = socket.inet_aton(ip)
+        low, high = 0, self.device_count
+        while low < high:
+            middle = (low + high) // 2
+            if self.device_ip(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.device_count and self.device_ip(low) == key:
+            return self.device(low)
+        return None
+
+
+class SnapshotReader:
+    """Öffnet die Snapshot-Datei read-only (mmap) und liest konsistente Snapshots"""
+
+    def __init__(self, path: Optional[str] = None, site: Optional[str] = None):
+        self.path = path or default_path(site)
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._inode = None
+        self._checked = 0.0
+        self._open()
+
+    def _open(self):
+        self.close()
+        self._file = open(self.path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._inode = stat.st_ino
+        magic, version, header_size = struct.unpack_from("<8sII", self._map, 0)
+        if magic != MAGIC or version != VERSION or header_size != HEADER_SIZE:
+            self.close()
+            raise ValueError(f"{self.path} ist kein Scanner-Snapshot (Version {VERSION})")
+
+    def _reopen_if_replaced(self):
+        """Der Writer ersetzt die Datei, wenn sich die Kapazität ändert (höchstens einmal pro Sekunde geprüft)"""
+        now = time.monotonic()
+        if now - self._checked < 1.0:
+            return
+        self._checked = now
+        try:
+            if os.stat(self.path).st_ino != self._inode:
+                self._open()
+        except FileNotFoundError:
+            pass
+
+    @property
+    def seq(self) -> int:
+        return SEQ.unpack_from(self._map, SEQ_OFFSET)[0]
+
+    def view(self, timeout: float = 1.0) -> SnapshotView:
+        """Zero-Copy-Sicht auf den aktuellen Snapshot (wartet, falls gerade geschrieben wird)"""
+        self._reopen_if_replaced()
+        deadline = time.monotonic() + timeout
+        while True:
+            seq = self.seq
+            if seq % 2 == 0:
+                header = HEADER.unpack_from(self._map, 0)
+                if header[3] == seq:
+                    return SnapshotView(self._map, seq, header)
+            if time.monotonic() > deadline:
+                raise TimeoutError("Snapshot wird zu lange geschrieben")
+            time.sleep(RETRY_SLEEP)
+
+    def read(self, timeout: float = 1.0) -> Dict[str, Any]:
+        """Vollständiger, konsistenter Snapshot als dict (Seqlock: bei Schreibvorgang erneut lesen)"""
+        deadline = time.monotonic() + timeout
+        while True:
+            view = self.view(timeout)
+            # Benutzte Bereiche kopieren (memcpy), danach Seqlock prüfen und ohne Zeitdruck parsen
+            copy = bytearray(view._strings + view.string_size)
+            for start, length in ((0, HEADER_SIZE),
+                                  (view._devices, view.device_count * DEVICE.size),
+                                  (view._interfaces, view.interface_count * INTERFACE.size),
+                                  (view._strings, view.string_size)):
+                copy[start:start + length] = self._map[start:start + length]
+            if not view.valid():
+                if time.monotonic() > deadline:
+                    raise TimeoutError("Kein konsistenter Snapshot lesbar")
+                continue
+            view = SnapshotView(copy, view.seq, HEADER.unpack_from(copy, 0))
+            devices = list(view.devices())
+            for device in devices:
+                device["interfaces"] = view.interfaces(device)
+                del device["interface_range"]
+            snapshot = {
+                "seq": view.seq,
+                "cycle": view.cycle,
+                "timestamp": view.timestamp,
+                "site": view.site,
+                "truncated": bool(view.flags & FLAG_TRUNCATED),
+                "partial": view.partial,
+                "bandwidth": {
+                    "source": view.source,
+                    "upstream_gbps": _float(view.upstream_gbps),
+                    "downstream_gbps": _float(view.downstream_gbps),
+                    "wifi_gbps": _float(view.wifi_gbps),
+                    "upstream_percent": _float(view.upstream_percent),
+                },
+                "devices": devices,
+            }
+            return snapshot
+
+    def wait_for_update(self, seq: int, timeout: Optional[float] = None, interval: float = 0.05) -> bool:
+        """Wartet, bis ein neuer Zyklus geschrieben wurde (prüft nur den Zähler im Header)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._reopen_if_replaced()
+            current = self.seq
+            if current != seq and current % 2 == 0:
+                return True
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(interval)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared-Memory-Snapshot des Scanners lesen")
+    parser.add_argument("--path", help="Snapshot-Datei (Standard: /dev/shm/gaming-scanner.snap)")
+    parser.add_argument("--site", help="Site-Name (Multi-Site)")
+    parser.add_argument("--watch", action="store_true", help="Bei jedem neuen Zyklus ausgeben")
+    args = parser.parse_args()
+
+    reader = SnapshotReader(args.path, args.site)
+    seq = None
+    while True:
+        if seq is not None:
+            reader.wait_for_update(seq)
+        snapshot = reader.read()
+        seq = snapshot["seq"]
+        json.dump(snapshot, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+        if not args.watch:
+            break
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+SNMP BER Codec - Kompakter Encoder/Decoder für SNMPv1/v2c Nachrichten.
+Ohne pysnmp-Abhängigkeit, für Trap-Empfang und den eingebauten SNMP-Client.
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple
+
+# ASN.1 / SNMP Tags
+TAG_INTEGER = 0x02
+TAG_OCTET_STRING = 0x04
+TAG_NULL = 0x05
+TAG_OID = 0x06
+TAG_SEQUENCE = 0x30
+TAG_IP_ADDRESS = 0x40
+TAG_COUNTER32 = 0x41
+TAG_GAUGE32 = 0x42
+TAG_TIMETICKS = 0x43
+TAG_OPAQUE = 0x44
+TAG_COUNTER64 = 0x46
+TAG_NO_SUCH_OBJECT = 0x80
+TAG_NO_SUCH_INSTANCE = 0x81
+TAG_END_OF_MIB_VIEW = 0x82
+
+# PDU Tags
+PDU_GET = 0xA0
+PDU_GETNEXT = 0xA1
+PDU_RESPONSE = 0xA2
+PDU_SET = 0xA3
+PDU_TRAP_V1 = 0xA4
+PDU_GETBULK = 0xA5
+PDU_INFORM = 0xA6
+PDU_TRAP_V2 = 0xA7
+PDU_REPORT = 0xA8
+
+# Werte, die "keine Daten" bedeuten (v2c Exceptions)
+EXCEPTION_TAGS = (TAG_NO_SUCH_OBJECT, TAG_NO_SUCH_INSTANCE, TAG_END_OF_MIB_VIEW)
+
+_UNSIGNED_TAGS = (TAG_COUNTER32, TAG_GAUGE32, TAG_TIMETICKS, TAG_COUNTER64)
+
+
+class BerError(ValueError):
+    """Fehlerhafte oder abgeschnittene BER-Daten"""
+
+
+# ============================================================================
+# Encoder
+# ============================================================================
+def encode_length(length: int) -> bytes:
+    """Kodiert eine BER-Länge (kurze oder lange Form)"""
+    if length < 0x80:
+        return bytes((length,))
+    raw = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes((0x80 | len(raw),)) + raw
+
+
+def encode_tlv(tag: int, content: bytes) -> bytes:
+    """Kodiert ein Tag-Length-Value Element"""
+    return bytes((tag,)) + encode_length(len(content)) + content
+
+
+def encode_integer(value: int, tag: int = TAG_INTEGER) -> bytes:
+    """Kodiert einen INTEGER (Zweierkomplement, minimale Länge)"""
+    if tag in _UNSIGNED_TAGS:
+        # Unsigned: führendes 0x00 falls das oberste Bit gesetzt ist
+        raw = value.to_bytes(max(1, (value.bit_length() + 8) // 8), "big")
+    else:
+        raw = value.to_bytes(max(1, (value.bit_length() + 8) // 8), "big", signed=True)
+    return encode_tlv(tag, raw)
+
+
+@lru_cache(maxsize=4096)
+def encode_oid(oid: str) -> bytes:
+    """Kodiert einen OBJECT IDENTIFIER (gecacht - dieselben OIDs wiederholen sich jeden Zyklus)"""
+    parts = [int(p) for p in oid.strip(".").split(".")]
+    if len(parts) < 2:
+        parts.append(0)
+    content = bytearray()
+    # Die ersten beiden Bögen teilen sich einen Subidentifier (2.999 -> 1079, mehrere Bytes)
+    for part in [parts[0] * 40 + parts[1]] + parts[2:]:
+        chunk = [part & 0x7F]
+        part >>= 7
+        while part:
+            chunk.append(0x80 | (part & 0x7F))
+            part >>= 7
+        content.extend(reversed(chunk))
+    return encode_tlv(TAG_OID, bytes(content))
+
+
+def encode_value(tag: int, value: Any) -> bytes:
+    """Kodiert einen Varbind-Wert"""
+    if tag == TAG_NULL or tag in EXCEPTION_TAGS:
+        return bytes((tag, 0))
+    if tag == TAG_OID:
+        return encode_oid(value)
+    if tag == TAG_IP_ADDRESS:
+        return encode_tlv(tag, bytes(int(p) for p in value.split(".")))
+    if tag in (TAG_OCTET_STRING, TAG_OPAQUE):
+        return encode_tlv(tag, value.encode("utf-8") if isinstance(value, str) else bytes(value))
+    return encode_integer(int(value), tag)
+
+
+_NULL = bytes((TAG_NULL, 0))
+
+
+def encode_message(version: int, community: bytes, pdu_type: int, request_id: int,
+                   varbinds: List[Tuple[str, int, Any]], error_status: int = 0, error_index: int = 0) -> bytes:
+    """
+    Kodiert eine SNMPv1/v2c Nachricht. varbinds: [(oid, tag, value), ...].
+    Bei GETBULK sind error_status/error_index non-repeaters/max-repetitions.
+    """
+    varbind_list = b"".join(
+        encode_tlv(TAG_SEQUENCE, encode_oid(oid) + (_NULL if tag == TAG_NULL else encode_value(tag, value)))
+        for oid, tag, value in varbinds
+    )
+    pdu = encode_tlv(pdu_type,
+                     encode_integer(request_id)
+                     + encode_integer(error_status)
+                     + encode_integer(error_index)
+                     + encode_tlv(TAG_SEQUENCE, varbind_list))
+    return encode_tlv(TAG_SEQUENCE, encode_integer(version) + encode_tlv(TAG_OCTET_STRING, community) + pdu)
+
+
+def encode_request(version: int, community: bytes, pdu_type: int, request_id: int, oids: List[str],
+                   non_repeaters: int = 0, max_repetitions: int = 0) -> bytes:
+    """Kodiert eine GET/GETNEXT/GETBULK-Anfrage (alle Werte NULL)"""
+    varbinds = [(oid, TAG_NULL, None) for oid in oids]
+    if pdu_type == PDU_GETBULK:
+        return encode_message(version, community, pdu_type, request_id, varbinds, non_repeaters, max_repetitions)
+    return encode_message(version, community, pdu_type, request_id, varbinds)
+
+
+# ============================================================================
+# Decoder
+# ============================================================================
+def decode_tlv(data: bytes, offset: int = 0) -> Tuple[int, int, int]:
+    """Liest Tag und Länge. Ergebnis: (tag, value_start, value_end)"""
+    try:
+        tag = data[offset]
+        length = data[offset + 1]
+        offset += 2
+        if length & 0x80:
+            num_bytes = length & 0x7F
+            if num_bytes == 0 or num_bytes > 4:
+                raise BerError("Ungültige BER-Länge")
+            length = int.from_bytes(data[offset:offset + num_bytes], "big")
+            offset += num_bytes
+    except IndexError:
+        raise BerError("Abgeschnittene BER-Daten")
+
+    end = offset + length
+    if end > len(data):
+        raise BerError("Abgeschnittene BER-Daten")
+    return tag, offset, end
+
+
+def decode_integer(data: bytes, signed: bool = True) -> int:
+    """Dekodiert einen INTEGER-Inhalt"""
+    if not data:
+        return 0
+    return int.from_bytes(data, "big", signed=signed)
+
+
+def decode_oid(data: bytes) -> str:
+    """Dekodiert einen OBJECT IDENTIFIER in Punktnotation"""
+    if not data:
+        return ""
+    parts = []
+    value = 0
+    for byte in data:
+        value = (value << 7) | (byte & 0x7F)
+        if not byte & 0x80:
+            if not parts:
+                first = min(value // 40, 2)
+                parts.append(str(first))
+                value -= 40 * first
+            parts.append(str(value))
+            value = 0
+    return ".".join(parts)
+
+
+def decode_value(tag: int, data: bytes) -> Any:
+    """Dekodiert einen Varbind-Wert in einen Python-Typ"""
+    if tag == TAG_INTEGER:
+        return decode_integer(data)
+    if tag in _UNSIGNED_TAGS:
+        return decode_integer(data, signed=False)
+    if tag == TAG_OID:
+        return decode_oid(data)
+    if tag == TAG_IP_ADDRESS:
+        return ".".join(str(b) for b in data)
+    if tag in (TAG_OCTET_STRING, TAG_OPAQUE):
+        return bytes(data)
+    return None
+
+
+def decode_children(data: bytes, start: int, end: int) -> List[Tuple[int, int, int]]:
+    """Liefert alle TLVs innerhalb eines konstruierten Elements"""
+    children = []
+    offset = start
+    while offset < end:
+        tag, value_start, value_end = decode_tlv(data, offset)
+        children.append((tag, value_start, value_end))
+        offset = value_end
+    return children
+
+
+def decode_varbinds(data: bytes, start: int, end: int) -> List[Tuple[str, int, Any]]:
+    """Dekodiert eine VarBindList. Ergebnis: [(oid, tag, value), ...]"""
+    varbinds = []
+    for _, vb_start, vb_end in decode_children(data, start, end):
+        (oid_tag, oid_start, oid_end), (value_tag, value_start, value_end) = decode_children(data, vb_start, vb_end)[:2]
+        if oid_tag != TAG_OID:
+            raise BerError("Varbind ohne OID")
+        varbinds.append((
+            decode_oid(data[oid_start:oid_end]),
+            value_tag,
+            decode_value(value_tag, data[value_start:value_end]),
+        ))
+    return varbinds
+
+
+def decode_message(data: bytes) -> Dict[str, Any]:
+    """
+    Dekodiert eine SNMPv1/v2c Nachricht.
+    Ergebnis enthält version, community, pdu_type und je nach PDU
+    request_id/error_status/error_index bzw. die v1-Trap-Felder sowie varbinds.
+    """
+    tag, start, end = decode_tlv(data)
+    if tag != TAG_SEQUENCE:
+        raise BerError("Keine SNMP-Nachricht")
+
+    children = decode_children(data, start, end)
+    if len(children) < 3:
+        raise BerError("Unvollständige SNMP-Nachricht")
+
+    (_, v_start, v_end), (_, c_start, c_end), (pdu_type, p_start, p_end) = children[:3]
+    message: Dict[str, Any] = {
+        "version": decode_integer(data[v_start:v_end]),
+        "community": bytes(data[c_start:c_end]),
+        "pdu_type": pdu_type,
+    }
+
+    fields = decode_children(data, p_start, p_end)
+    if pdu_type == PDU_TRAP_V1:
+        if len(fields) < 6:
+            raise BerError("Unvollständiger v1-Trap")
+        enterprise, agent_addr, generic, specific, timestamp, varbinds = fields[:6]
+        message.update({
+            "enterprise": decode_oid(data[enterprise[1]:enterprise[2]]),
+            "agent_addr": decode_value(TAG_IP_ADDRESS, data[agent_addr[1]:agent_addr[2]]),
+            "generic_trap": decode_integer(data[generic[1]:generic[2]]),
+            "specific_trap": decode_integer(data[specific[1]:specific[2]]),
+            "timestamp": decode_integer(data[timestamp[1]:timestamp[2]], signed=False),
+            "varbinds": decode_varbinds(data, varbinds[1], varbinds[2]),
+        })
+    else:
+        if len(fields) < 4:
+            raise BerError("Unvollständige PDU")
+        request_id, error_status, error_index, varbinds = fields[:4]
+        message.update({
+            "request_id": decode_integer(data[request_id[1]:request_id[2]]),
+            "error_status": decode_integer(data[error_status[1]:error_status[2]]),
+            "error_index": decode_integer(data[error_index[1]:error_index[2]]),
+            "varbinds": decode_varbinds(data, varbinds[1], varbinds[2]),
+        })
+
+    return message
+
+
+def pretty_value(tag: int, value: Any, hex_strings: bool = False) -> Optional[str]:
+    """
+    Formatiert einen Wert wie pysnmp prettyPrint() (None bei Exceptions).
+    hex_strings: Octet-Strings immer als 0x-Hex (Binärwerte wie PhysAddress, die zufällig
+    druckbares UTF-8 ergeben, z.B. c3:a4:41:42:43:44 -> "äABCD").
+    """
+    if tag in EXCEPTION_TAGS or tag == TAG_NULL:
+        return None
+    if isinstance(value, bytes) and hex_strings:
+        return "0x" + value.hex()
+    if isinstance(value, bytes):
+        try:
+            text = value.decode("utf-8")
+            if text.isprintable():
+                return text
+        except UnicodeDecodeError:
+            pass
+        return "0x" + value.hex()
+    return str(value)
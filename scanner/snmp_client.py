@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Eingebauter SNMPv1/v2c Client - Ein UDP-Socket für alle Ziele.
+Tausende offene Anfragen werden über die request-id zugeordnet; Timeouts und
+Retries laufen in einer einzigen Event-Schleife statt in einem Thread pro Anfrage.
+pysnmp bleibt als optionaler Fallback (snmp_transport: "pysnmp").
+"""
+
+import os
+import math
+import time
+import heapq
+import socket
+import logging
+import selectors
+import threading
+import itertools
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Any, Callable, Tuple
+
+from snmp_ber import (
+    BerError, PDU_GET, PDU_GETNEXT, PDU_GETBULK, PDU_RESPONSE, TAG_END_OF_MIB_VIEW,
+    EXCEPTION_TAGS, decode_message, encode_request, pretty_value,
+)
+
+logger = logging.getLogger(__name__)
+
+# Callback erhält die dekodierte Antwort oder None bei Timeout
+ResponseCallback = Callable[[Optional[Dict[str, Any]]], None]
+
+
+def oid_key(oid: str) -> Tuple[int, ...]:
+    """OID als Zahlentupel (lexikographischer Vergleich wie im Agenten)"""
+    return tuple(int(part) for part in oid.strip(".").split(".") if part)
+
+
+class _Request:
+    __slots__ = ("request_id", "address", "packet", "retries_left", "timeout", "deadline", "callback", "sent_at",
+                 "retransmitted")
+
+    def __init__(self, request_id: int, address: Tuple[str, int], packet: bytes, retries: int, timeout: float,
+                 callback: ResponseCallback):
+        self.request_id = request_id
+        self.address = address
+        self.packet = packet
+        self.retries_left = retries
+        self.timeout = timeout
+        self.deadline = 0.0
+        self.callback = callback
+        self.sent_at = 0.0
+        self.retransmitted = False
+
+
+class WalkResult(dict):
+    """
+    Walk-Ergebnis {index: wert}; timed_out = Walk endete durch Timeout (evtl. unvollständig),
+    error = Walk abgebrochen, weil der Agent keine aufsteigenden OIDs liefert
+    """
+
+    timed_out = False
+    error: Optional[str] = None
+
+
+class SnmpClient:
+    """Multiplexter SNMP-Client: ein Socket, ein I/O-Thread, Zuordnung per request-id"""
+
+    def __init__(self, community: str = "public", version: int = 2, timeout: float = 2.0,
+                 retries: int = 1, max_repetitions: int = 25, port: int = 161, controller: Optional[Any] = None):
+        self.community = community.encode()
+        # SNMP-Versionsfeld: 0 = v1, 1 = v2c
+        self.version = 1 if version == 2 else 0
+        self.timeout = timeout
+        self.retries = retries
+        self.max_repetitions = max_repetitions
+        self.port = port
+        # Optionaler ConcurrencyController (AIMD-Fenster + Paketraten), siehe concurrency.py
+        self.controller = controller
+
+        self._sock: Optional[socket.socket] = None
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wakeup_r: Optional[socket.socket] = None
+        self._wakeup_w: Optional[socket.socket] = None
+        self._submitted: deque = deque()
+        self._pending: Dict[int, _Request] = {}
+        # Vom Controller zurückgehaltene Anfragen, pro Ziel, Round-Robin
+        self._waiting: Dict[str, deque] = {}
+        self._waiting_order: deque = deque()
+        self._timers: List[Tuple[float, int]] = []
+        self._request_ids = itertools.count(int.from_bytes(os.urandom(3), "big"))
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._start_lock = threading.Lock()
+
+        # Statistik (für Benchmarks/Logging)
+        self.pdus_sent = 0
+        self.pdus_received = 0
+        self.timeouts = 0
+
+    # ------------------------------------------------------------------
+    # Lebenszyklus
+    # ------------------------------------------------------------------
+    def start(self):
+        """Öffnet den UDP-Socket und startet den I/O-Thread (idempotent)"""
+        with self._start_lock:
+            if self._running:
+                return
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setblocking(False)
+            # Großer Empfangspuffer: viele Antworten kommen gleichzeitig an
+            try:
+                self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+            except OSError:
+                pass
+            self._wakeup_r, self._wakeup_w = socket.socketpair()
+            self._wakeup_r.setblocking(False)
+            self._wakeup_w.setblocking(False)
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self._sock, selectors.EVENT_READ, "snmp")
+            self._selector.register(self._wakeup_r, selectors.EVENT_READ, "wakeup")
+            self._running = True
+            self._thread = threading.Thread(target=self._loop, name="snmp-client", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Stoppt den I/O-Thread; offene Anfragen enden mit Timeout-Ergebnis"""
+        if not self._running:
+            return
+        self._running = False
+        self._wake()
+        if self._thread:
+            self._thread.join(timeout=2)
+        for request in list(self._pending.values()):
+            request.callback(None)
+        self._pending.clear()
+        for waiting in self._waiting.values():
+            for request in waiting:
+                request.callback(None)
+        self._waiting.clear()
+        for sock in (self._sock, self._wakeup_r, self._wakeup_w):
+            if sock:
+                sock.close()
+        if self._selector:
+            self._selector.close()
+
+    # ------------------------------------------------------------------
+    # Low-Level API
+    # ------------------------------------------------------------------
+    def request(self, ip: str, pdu_type: int, oids: List[str], callback: ResponseCallback,
+                max_repetitions: Optional[int] = None, version: Optional[int] = None,
+                community: Optional[str] = None, timeout: Optional[float] = None):
+        """
+        Stellt eine Anfrage in die Warteschlange (thread-safe, blockiert nicht).
+        version (1/2), community und timeout (pro Versuch) überschreiben die Client-Werte für diese Anfrage.
+        """
+        if not self._running:
+            self.start()
+        version_field = self._version_field(version)
+        if pdu_type == PDU_GETBULK and version_field == 0:
+            # v1 kennt kein GETBULK
+            pdu_type = PDU_GETNEXT
+        self._submitted.append((ip, pdu_type, oids, callback, max_repetitions, version_field,
+                                community.encode() if community else None, timeout))
+        self._wake()
+
+    def _version_field(self, version: Optional[int]) -> int:
+        if version is None:
+            return self.version
+        return 1 if version == 2 else 0
+
+    def _wake(self):
+        if self._wakeup_w:
+            try:
+                self._wakeup_w.send(b"\0")
+            except (BlockingIOError, OSError):
+                pass
+
+    def _next_request_id(self) -> int:
+        return next(self._request_ids) & 0x7FFFFFFF
+
+    def _send(self, ip: str, pdu_type: int, oids: List[str], callback: ResponseCallback,
+              max_repetitions: Optional[int] = None, version_field: Optional[int] = None,
+              community: Optional[bytes] = None, timeout: Optional[float] = None):
+        """Nur im I/O-Thread aufrufen"""
+        request_id = self._next_request_id()
+        repetitions = max_repetitions or self.max_repetitions
+        if version_field is None:
+            version_field = self.version
+        packet = encode_request(version_field, community or self.community, pdu_type, request_id, oids,
+                                0, repetitions if pdu_type == PDU_GETBULK else 0)
+        request = _Request(request_id, (ip, self.port), packet, self.retries, timeout or self.timeout, callback)
+        if self.controller is None:
+            self._start(request)
+            return
+        if ip not in self._waiting:
+            self._waiting[ip] = deque()
+            self._waiting_order.append(ip)
+        self._waiting[ip].append(request)
+
+    def _start(self, request: _Request):
+        self._pending[request.request_id] = request
+        request.sent_at = time.monotonic()
+        self._transmit(request)
+
+    def _pump(self) -> Optional[float]:
+        """Sendet wartende Anfragen, soweit Fenster und Paketrate es erlauben. Liefert die nächste Wartezeit."""
+        next_wait = None
+        for _ in range(len(self._waiting_order)):
+            ip = self._waiting_order.popleft()
+            waiting = self._waiting[ip]
+            while waiting:
+                wait = self.controller.try_acquire(ip)
+                if wait:
+                    if wait != math.inf:
+                        next_wait = wait if next_wait is None else min(next_wait, wait)
+                    break
+                self._start(waiting.popleft())
+            if waiting:
+                self._waiting_order.append(ip)
+            else:
+                del self._waiting[ip]
+        return next_wait
+
+    def _transmit(self, request: _Request):
+        request.deadline = time.monotonic() + request.timeout
+        heapq.heappush(self._timers, (request.deadline, request.request_id))
+        try:
+            self._sock.sendto(request.packet, request.address)
+            self.pdus_sent += 1
+        except OSError as e:
+            logger.debug(f"SNMP sendto {request.address[0]} fehlgeschlagen: {e}")
+
+    def _loop(self):
+        while self._running:
+            # Neue Anfragen aus anderen Threads übernehmen
+            while self._submitted:
+                self._send(*self._submitted.popleft())
+
+            # Erst senden: _pump startet Anfragen und legt dabei deren Timer an
+            timeout = self._pump() if self._waiting else None
+            if self._timers:
+                until_timer = max(0.0, self._timers[0][0] - time.monotonic())
+                timeout = until_timer if timeout is None else min(timeout, until_timer)
+
+            for key, _ in self._selector.select(timeout):
+                if key.data == "wakeup":
+                    try:
+                        while self._wakeup_r.recv(4096):
+                            pass
+                    except (BlockingIOError, OSError):
+                        pass
+                else:
+                    self._receive()
+
+            # Abgelaufene Anfragen: Retry oder Timeout-Callback
+            now = time.monotonic()
+            while self._timers and self._timers[0][0] <= now:
+                deadline, request_id = heapq.heappop(self._timers)
+                request = self._pending.get(request_id)
+                if request is None or request.deadline != deadline:
+                    continue
+                if request.retries_left > 0:
+                    request.retries_left -= 1
+                    request.retransmitted = True
+                    if self.controller:
+                        self.controller.retransmit(request.address[0])
+                    self._transmit(request)
+                else:
+                    del self._pending[request_id]
+                    self.timeouts += 1
+                    if self.controller:
+                        self.controller.release(request.address[0], None, timed_out=True)
+                    self._dispatch(request.callback, None)
+
+    def _receive(self):
+        while True:
+            try:
+                data, (source_ip, _) = self._sock.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                # z.B. ICMP port unreachable (ECONNREFUSED) - Timeout greift später
+                continue
+
+            try:
+                message = decode_message(data)
+            except (BerError, ValueError, IndexError):
+                continue
+
+            if message["pdu_type"] != PDU_RESPONSE:
+                continue
+            request = self._pending.get(message.get("request_id"))
+            if request is None or request.address[0] != source_ip:
+                continue
+
+            del self._pending[request.request_id]
+            self.pdus_received += 1
+            if self.controller:
+                # Karn: nach Retransmit ist die RTT nicht eindeutig zuordenbar
+                rtt = None if request.retransmitted else time.monotonic() - request.sent_at
+                self.controller.release(source_ip, rtt)
+            self._dispatch(request.callback, message)
+
+    def _dispatch(self, callback: ResponseCallback, message: Optional[Dict[str, Any]]):
+        try:
+            callback(message)
+        except Exception as e:
+            logger.error(f"SNMP Callback-Fehler: {e}")
+
+    # ------------------------------------------------------------------
+    # High-Level API (Futures)
+    # ------------------------------------------------------------------
+    def get(self, ip: str, oids: List[str], version: Optional[int] = None, community: Optional[str] = None,
+            timeout: Optional[float] = None) -> "Future[Optional[Dict[str, Optional[str]]]]":
+        """
+        GET mit mehreren OIDs in einer PDU.
+        Ergebnis: {oid: wert} (None bei noSuchObject), {} bei Fehlerstatus, None bei Timeout.
+        """
+        future: Future = Future()
+
+        def on_response(message: Optional[Dict[str, Any]]):
+            if message is None:
+                future.set_result(None)
+            elif message["error_status"]:
+                future.set_result({})
+            else:
+                future.set_result({oid: pretty_value(tag, value) for oid, tag, value in message["varbinds"]})
+
+        self.request(ip, PDU_GET, list(oids), on_response, version=version, community=community, timeout=timeout)
+        return future
+
+    def walk(self, ip: str, root_oid: str, max_repetitions: Optional[int] = None,
+             version: Optional[int] = None, community: Optional[str] = None,
+             hex_strings: bool = False, timeout: Optional[float] = None) -> "Future[WalkResult]":
+        """
+        Läuft einen Teilbaum per GETBULK (v1: GETNEXT) ab.
+        Ergebnis: WalkResult {index: wert}, index = OID-Suffix unterhalb von root_oid.
+        hex_strings: Octet-Strings als 0x-Hex (Binärspalten wie PhysAddress).
+        """
+        future: Future = Future()
+        prefix = root_oid.rstrip(".") + "."
+        results = WalkResult()
+        version_field = self._version_field(version)
+        community_field = community.encode() if community else None
+        pdu_type = PDU_GETBULK if version_field else PDU_GETNEXT
+
+        # Zuletzt gelesene OID als Zahlentupel: fehlerhafte Agenten liefern dieselbe oder eine
+        # kleinere OID, der Walk liefe dann endlos (wie pysnmp: abbrechen)
+        previous = [oid_key(root_oid)]
+
+        def on_response(message: Optional[Dict[str, Any]]):
+            if message is None or message["error_status"]:
+                results.timed_out = message is None
+                future.set_result(results)
+                return
+
+            last_oid = None
+            for oid, tag, value in message["varbinds"]:
+                if tag == TAG_END_OF_MIB_VIEW or not oid.startswith(prefix):
+                    future.set_result(results)
+                    return
+                key = oid_key(oid)
+                if key <= previous[0]:
+                    logger.debug(f"{ip}: OID nicht aufsteigend ({oid}), Walk von {root_oid} abgebrochen")
+                    results.error = "oid_not_increasing"
+                    future.set_result(results)
+                    return
+                previous[0] = key
+                if tag not in EXCEPTION_TAGS:
+                    results[oid[len(prefix):]] = pretty_value(tag, value, hex_strings)
+                last_oid = oid
+
+            if last_oid is None:
+                future.set_result(results)
+                return
+            # Nächster Block ab der letzten OID (läuft bereits im I/O-Thread)
+            self._send(ip, pdu_type, [last_oid], on_response, max_repetitions, version_field, community_field,
+                       timeout)
+
+        self.request(ip, pdu_type, [root_oid], on_response, max_repetitions, version, community, timeout)
+        return future
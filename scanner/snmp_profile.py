@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+SNMP Capability-Profile - Gelerntes Verhalten pro Gerät.
+Merkt sich SNMP-Version, HC-Counter-Unterstützung, antwortende Vendor-OIDs und
+eine funktionierende GETBULK-Größe (bei Timeouts halbiert, danach schrittweise
+wieder angehoben), damit Folge-Polls nur noch abfragen, was
+das Gerät tatsächlich liefert. Nach Neustart oder Ablauf wird neu gelernt.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Any
+
+logger = logging.getLogger(__name__)
+
+# Kleinste GETBULK-Größe, auf die bei Timeouts reduziert wird
+MIN_MAX_REPETITIONS = 5
+# Anhebung nach jedem Walk ohne Timeout (additiv, bis snmp_max_repetitions)
+MAX_REPETITIONS_STEP = 5
+
+# counters: welche Interface-Counter abgefragt werden
+COUNTERS_HC = "hc"          # ifHCIn/OutOctets für alle Interfaces vorhanden
+COUNTERS_32BIT = "32bit"    # keine ifXTable
+COUNTERS_BOTH = "both"      # ifXTable lückenhaft -> beide Tabellen
+
+
+def parse_uptime(value: Any) -> Optional[int]:
+    """sysUpTime (TimeTicks) als Zahl; None wenn nicht lesbar"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SnmpProfile:
+    """Fähigkeiten eines Geräts. None bedeutet jeweils: noch nicht gelernt."""
+
+    __slots__ = ("version", "max_repetitions", "counters", "vendor_metrics", "interfaces", "uptime", "learned_at")
+
+    def __init__(self, version: int, max_repetitions: int):
+        self.version = version
+        self.max_repetitions = max_repetitions
+        self.counters: Optional[str] = None
+        self.vendor_metrics: Optional[List[str]] = None
+        # Ausgewählte Interfaces {ifIndex: ifDescr} (siehe interface_selection)
+        self.interfaces: Optional[Dict[str, str]] = None
+        self.uptime: Optional[int] = None
+        self.learned_at = time.time()
+
+    def walk_timed_out(self) -> bool:
+        """GETBULK-Antworten gehen verloren: max_repetitions halbieren. True wenn geändert."""
+        if self.max_repetitions <= MIN_MAX_REPETITIONS:
+            return False
+        self.max_repetitions = max(MIN_MAX_REPETITIONS, self.max_repetitions // 2)
+        return True
+
+    def walk_succeeded(self, limit: int) -> bool:
+        """Walk ohne Timeout: max_repetitions schrittweise wieder anheben, höchstens bis limit. True wenn geändert."""
+        if self.max_repetitions >= limit:
+            return False
+        self.max_repetitions = min(limit, self.max_repetitions + MAX_REPETITIONS_STEP)
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SnmpProfile":
+        profile = cls(data.get("version", 2), data.get("max_repetitions", 25))
+        profile.counters = data.get("counters")
+        profile.vendor_metrics = data.get("vendor_metrics")
+        profile.interfaces = data.get("interfaces")
+        profile.uptime = data.get("uptime")
+        profile.learned_at = data.get("learned_at", 0)
+        return profile
+
+
+class SnmpProfileStore:
+    """Profile aller Geräte, optional in einer JSON-Datei über Neustarts hinweg gehalten"""
+
+    def __init__(self, config: Dict[str, Any]):
+        profile_config = config.get("snmp_profiles", {})
+        self.enabled = profile_config.get("enabled", True)
+        # Profile werden nach dieser Zeit (Sekunden) komplett neu gelernt
+        self.refresh_interval = profile_config.get("refresh_interval", 6 * 3600)
+        self.cache_file = profile_config.get("cache_file", "")
+        # Hosts ohne v2c-Antwort werden erst nach dieser Zeit (Sekunden) wieder per v1 gefragt
+        self.v1_retry_interval = profile_config.get("v1_retry_interval", 3600)
+        self.profiles: Dict[str, SnmpProfile] = {}
+        # ip -> Zeitpunkt, ab dem wieder ein v1-Versuch erlaubt ist (nur im Speicher)
+        self.v1_retry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def get(self, ip: str) -> Optional[SnmpProfile]:
+        """Gültiges Profil oder None (unbekannt, abgelaufen oder deaktiviert)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            profile = self.profiles.get(ip)
+            if profile and time.time() - profile.learned_at > self.refresh_interval:
+                logger.debug(f"SNMP-Profil {ip} abgelaufen, lerne neu")
+                del self.profiles[ip]
+                self._dirty = True
+                profile = None
+            return profile
+
+    def version(self, ip: str, default: int) -> int:
+        """Gelernte SNMP-Version eines Hosts (auch aus einem abgelaufenen Profil), sonst default"""
+        with self._lock:
+            profile = self.profiles.get(ip) if self.enabled else None
+            return profile.version if profile else default
+
+    def put(self, ip: str, profile: SnmpProfile):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.profiles[ip] = profile
+            self._dirty = True
+
+    def invalidate(self, ip: str):
+        """Verwirft ein Profil (z.B. nach coldStart/warmStart-Trap)"""
+        with self._lock:
+            if self.profiles.pop(ip, None):
+                self._dirty = True
+
+    def v1_due(self, ip: str) -> bool:
+        """False solange der letzte v1-Versuch für ip erfolglos war und noch nicht abgelaufen ist"""
+        with self._lock:
+            return time.time() >= self.v1_retry.get(ip, 0)
+
+    def v1_failed(self, ip: str):
+        """Merkt sich einen erfolglosen v1-Versuch für v1_retry_interval Sekunden"""
+        with self._lock:
+            self.v1_retry[ip] = time.time() + self.v1_retry_interval
+
+    def rebooted(self, ip: str, uptime: Any) -> bool:
+        """Prüft auf Neustart (sysUpTime kleiner als beim letzten Poll) und merkt sich den Wert"""
+        ticks = parse_uptime(uptime)
+        with self._lock:
+            profile = self.profiles.get(ip)
+            if profile is None or ticks is None:
+                return False
+            if profile.uptime is not None and ticks < profile.uptime:
+                del self.profiles[ip]
+                self._dirty = True
+                return True
+            profile.uptime = ticks
+            return False
+
+    def load(self):
+        """Lädt gespeicherte Profile (fehlende oder defekte Datei = leer starten)"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+            self.profiles = {ip: SnmpProfile.from_dict(p) for ip, p in data.items()}
+            logger.debug(f"{len(self.profiles)} SNMP-Profile geladen")
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"SNMP-Profile konnten nicht geladen werden: {e}")
+
+    def save(self):
+        """Schreibt geänderte Profile atomar in die Cache-Datei"""
+        if not self.cache_file or not self._dirty:
+            return
+        with self._lock:
+            data = {ip: p.to_dict() for ip, p in self.profiles.items()}
+            self._dirty = False
+        tmp = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.cache_file)
+        except OSError as e:
+            logger.warning(f"SNMP-Profile konnten nicht gespeichert werden: {e}")
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+SNMP Trap Receiver - Ereignisgesteuerte Updates für Interface- und Gerätestatus.
+Empfängt linkDown/linkUp/coldStart/warmStart (v1 und v2c) auf einem UDP-Socket,
+damit Statusänderungen nicht erst beim nächsten Poll sichtbar werden. INFORMs
+werden mit einer Response bestätigt.
+"""
+
+import time
+import queue
+import socket
+import logging
+import threading
+from typing import Dict, List, Optional, Any, Callable
+
+from snmp_ber import (
+    BerError, PDU_TRAP_V1, PDU_TRAP_V2, PDU_INFORM, PDU_RESPONSE, decode_message, encode_message
+)
+
+logger = logging.getLogger(__name__)
+
+# v1 generic-trap Nummern
+GENERIC_TRAPS = {
+    0: "coldStart",
+    1: "warmStart",
+    2: "linkDown",
+    3: "linkUp",
+}
+
+# v2c snmpTrapOID.0 Werte
+SNMP_TRAP_OID = "1.3.6.1.6.3.1.1.4.1.0"
+TRAP_OIDS = {
+    "1.3.6.1.6.3.1.1.5.1": "coldStart",
+    "1.3.6.1.6.3.1.1.5.2": "warmStart",
+    "1.3.6.1.6.3.1.1.5.3": "linkDown",
+    "1.3.6.1.6.3.1.1.5.4": "linkUp",
+}
+
+IF_INDEX_PREFIX = "1.3.6.1.2.1.2.2.1.1."
+IF_OPER_STATUS_PREFIX = "1.3.6.1.2.1.2.2.1.8."
+
+
+class TrapEvent:
+    """Ein dekodiertes, relevantes Trap-Ereignis"""
+
+    __slots__ = ("ip", "event", "if_index", "received")
+
+    def __init__(self, ip: str, event: str, if_index: Optional[str] = None):
+        self.ip = ip
+        self.event = event
+        self.if_index = if_index
+        self.received = time.time()
+
+    def __repr__(self) -> str:
+        return f"TrapEvent({self.ip}, {self.event}, ifIndex={self.if_index})"
+
+
+def decode_trap(data: bytes, source_ip: str, community: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Dekodiert ein Trap-Paket. None bei ungültigem Paket oder fremder Community."""
+    try:
+        message = decode_message(data)
+    except (BerError, ValueError, IndexError):
+        logger.debug(f"Trap von {source_ip}: ungültiges Paket")
+        return None
+
+    if community and message["community"] != community.encode():
+        logger.debug(f"Trap von {source_ip}: falsche Community")
+        return None
+    return message
+
+
+def inform_response(message: Dict[str, Any]) -> bytes:
+    """Bestätigung eines INFORMs: Response mit gleicher request-id und gleichen Varbinds"""
+    return encode_message(message["version"], message["community"], PDU_RESPONSE,
+                          message["request_id"], message["varbinds"])
+
+
+def parse_trap(data: bytes, source_ip: str, community: Optional[str] = None) -> Optional[TrapEvent]:
+    """Dekodiert ein Trap-Paket. None bei fremder Community oder irrelevantem Trap."""
+    message = decode_trap(data, source_ip, community)
+    return trap_event(message, source_ip) if message else None
+
+
+def trap_event(message: Dict[str, Any], source_ip: str) -> Optional[TrapEvent]:
+    """Relevantes Ereignis einer dekodierten Trap-Nachricht (None bei irrelevantem Trap)"""
+    pdu_type = message["pdu_type"]
+    varbinds = message["varbinds"]
+    event = None
+    ip = source_ip
+
+    if pdu_type == PDU_TRAP_V1:
+        event = GENERIC_TRAPS.get(message["generic_trap"])
+        # agent-addr bevorzugen (Traps können über Relays kommen)
+        if message.get("agent_addr") and message["agent_addr"] != "0.0.0.0":
+            ip = message["agent_addr"]
+    elif pdu_type in (PDU_TRAP_V2, PDU_INFORM):
+        for oid, _, value in varbinds:
+            if oid == SNMP_TRAP_OID:
+                event = TRAP_OIDS.get(value)
+                break
+
+    if not event:
+        return None
+
+    if_index = None
+    for oid, _, value in varbinds:
+        if oid.startswith(IF_INDEX_PREFIX):
+            if_index = str(value)
+            break
+        if oid.startswith(IF_OPER_STATUS_PREFIX):
+            if_index = oid[len(IF_OPER_STATUS_PREFIX):]
+
+    return TrapEvent(ip, event, if_index)
+
+
+class TrapReceiver:
+    """Optionaler UDP-Listener für SNMP-Traps"""
+
+    def __init__(self, config: Dict[str, Any], on_events: Callable[[List[TrapEvent]], None]):
+        trap_config = config.get("snmp_traps", {})
+        self.enabled = trap_config.get("enabled", False)
+        self.host = trap_config.get("host", "0.0.0.0")
+        self.port = trap_config.get("port", 162)
+        self.community = trap_config.get("community", config.get("snmp_community", "public"))
+        # Ereignisse innerhalb dieses Fensters werden gebündelt verarbeitet (Trap-Stürme)
+        self.debounce = trap_config.get("debounce", 1.0)
+        self.on_events = on_events
+        self._queue: "queue.Queue[TrapEvent]" = queue.Queue()
+        self._sock: Optional[socket.socket] = None
+        self._running = False
+
+    def start(self) -> bool:
+        """Startet Listener- und Verarbeitungs-Thread"""
+        if not self.enabled or self._running:
+            return False
+
+        try:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._sock.bind((self.host, self.port))
+        except OSError as e:
+            logger.error(f"Trap-Receiver konnte nicht starten ({self.host}:{self.port}): {e}")
+            self._sock = None
+            return False
+
+        self._running = True
+        threading.Thread(target=self._listen, name="snmp-traps", daemon=True).start()
+        threading.Thread(target=self._dispatch, name="snmp-trap-dispatch", daemon=True).start()
+        logger.info(f"SNMP Trap-Receiver läuft auf UDP {self.host}:{self.port}")
+        return True
+
+    def stop(self):
+        """Stoppt den Listener"""
+        self._running = False
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+
+    def _listen(self):
+        while self._running and self._sock:
+            try:
+                data, address = self._sock.recvfrom(65535)
+            except OSError:
+                break
+
+            source_ip = address[0]
+            message = decode_trap(data, source_ip, self.community)
+            if message is None:
+                continue
+            if message["pdu_type"] == PDU_INFORM:
+                # Unbestätigte INFORMs wiederholt der Agent bis zum Timeout
+                try:
+                    self._sock.sendto(inform_response(message), address)
+                except (OSError, AttributeError) as e:
+                    logger.debug(f"INFORM von {source_ip} nicht bestätigt: {e}")
+
+            event = trap_event(message, source_ip)
+            if event:
+                logger.debug(f"Trap empfangen: {event}")
+                self._queue.put(event)
+
+    def _dispatch(self):
+        while self._running:
+            try:
+                first = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+            # Kurz sammeln, damit ein Trap-Sturm nur einen Push auslöst
+            events = [first]
+            deadline = time.time() + self.debounce
+            while True:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    events.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                self.on_events(events)
+            except Exception as e:
+                logger.error(f"Fehler bei der Trap-Verarbeitung: {e}")
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+TCP Connect Probing - Findet Hosts, die ICMP ignorieren (Konsolen, gehärtete Hosts).
+Tausende nicht-blockierende connect()-Versuche laufen in einer einzigen selectors-Schleife,
+ohne Thread pro Host. Die Handshake-RTT dient gleichzeitig als Latenzquelle.
+"""
+
+import time
+import errno
+import socket
+import logging
+import selectors
+from typing import Dict, List, Optional, Any, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Ports pro Geräteklasse. Ein RST (connection refused) zählt ebenfalls als
+# Lebenszeichen, daher reichen auch Ports, auf denen das Gerät nicht lauscht.
+DEFAULT_PORT_PROFILES = {
+    "default": [80, 443, 22, 445, 3389, 8080],
+    "playstation": [3478, 3479, 3480, 9295, 80, 443],   # PSN / Remote Play
+    "xbox": [3074, 53, 80, 443],                         # Xbox Live
+    "nintendo": [6667, 12400, 28910, 29900, 443],        # Nintendo Online
+}
+
+# connect()-Fehler, die bedeuten: Host hat geantwortet (RST), Port nur zu
+_ALIVE_ERRNOS = {errno.ECONNREFUSED, errno.ECONNRESET}
+_PENDING_ERRNOS = {errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY, getattr(errno, "WSAEWOULDBLOCK", -1)}
+
+
+class TcpProber:
+    """Asynchrone TCP-Connect-Probes mit Timeout pro Ziel"""
+
+    def __init__(self, config: Dict[str, Any]):
+        probe_config = config.get("tcp_probe", {})
+        self.enabled = probe_config.get("enabled", False)
+        self.timeout = probe_config.get("timeout", config.get("timeout", 2))
+        self.max_concurrency = probe_config.get("max_concurrency", 1024)
+        self.port_profiles: Dict[str, List[int]] = dict(DEFAULT_PORT_PROFILES)
+        self.port_profiles.update(probe_config.get("ports", {}))
+        # Adressen ohne Antwort auf allen Ports werden so lange (Sekunden) nicht erneut probiert
+        self.negative_ttl = probe_config.get("negative_ttl", 300)
+        # ip -> monotonic-Zeitpunkt, ab dem wieder probiert wird
+        self.silent: Dict[str, float] = {}
+
+    def ports_for(self, device_class: Optional[str] = None) -> List[int]:
+        """Liefert die Port-Liste für eine Geräteklasse (Fallback: default)"""
+        return self.port_profiles.get(device_class or "default", self.port_profiles["default"])
+
+    def discovery_ports(self) -> List[int]:
+        """Vereinigung aller Profile-Ports für die Host-Erkennung"""
+        ports: List[int] = []
+        for profile in self.port_profiles.values():
+            for port in profile:
+                if port not in ports:
+                    ports.append(port)
+        return ports
+
+    def probe(self, targets: Iterable[Tuple[str, int]], timeout: Optional[float] = None,
+              deadline: Optional[float] = None) -> Dict[Tuple[str, int], Optional[float]]:
+        """
+        Führt connect()-Probes für alle (ip, port)-Ziele aus.
+        Ergebnis: RTT in ms wenn der Host geantwortet hat (SYN-ACK oder RST), sonst None.
+        deadline (monotonic): danach keine neuen Connects, offene werden verworfen;
+        diese Ziele fehlen im Ergebnis.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        pending = list(targets)
+        pending.reverse()
+        results: Dict[Tuple[str, int], Optional[float]] = {}
+        in_flight: Dict[socket.socket, Tuple[Tuple[str, int], float]] = {}
+        selector = selectors.DefaultSelector()
+
+        def finish(sock: socket.socket, rtt: Optional[float]):
+            target, _ = in_flight.pop(sock)
+            results[target] = rtt
+            try:
+                selector.unregister(sock)
+            except (KeyError, ValueError):
+                pass
+            sock.close()
+
+        try:
+            while pending or in_flight:
+                if deadline is not None and time.monotonic() >= deadline:
+                    logger.debug(f"TCP-Probe: Deadline erreicht, {len(pending) + len(in_flight)} Ziel(e) offen")
+                    break
+
+                # Neue Verbindungen bis zum Concurrency-Limit starten
+                while pending and len(in_flight) < self.max_concurrency:
+                    target = pending.pop()
+                    try:
+                        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    except OSError as e:
+                        # Dateideskriptoren erschöpft - erst laufende Probes abarbeiten
+                        logger.debug(f"TCP-Probe: Socket-Limit erreicht ({e})")
+                        if in_flight:
+                            pending.append(target)
+                        else:
+                            results[target] = None
+                        break
+                    sock.setblocking(False)
+                    started = time.perf_counter()
+                    err = sock.connect_ex(target)
+                    in_flight[sock] = (target, started)
+                    if err == 0 or err in _ALIVE_ERRNOS:
+                        finish(sock, (time.perf_counter() - started) * 1000)
+                    elif err in _PENDING_ERRNOS:
+                        selector.register(sock, selectors.EVENT_WRITE)
+                    else:
+                        finish(sock, None)
+
+                if not in_flight:
+                    continue
+
+                # in_flight ist nach Startzeit geordnet (Insertion Order)
+                oldest = next(iter(in_flight.values()))[1]
+                wait = max(0.0, oldest + timeout - time.perf_counter())
+                if deadline is not None:
+                    wait = min(wait, max(0.0, deadline - time.monotonic()))
+
+                for key, _ in selector.select(wait):
+                    sock = key.fileobj
+                    _, started = in_flight[sock]
+                    rtt = (time.perf_counter() - started) * 1000
+                    err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    finish(sock, rtt if err == 0 or err in _ALIVE_ERRNOS else None)
+
+                # Timeouts pro Ziel
+                now = time.perf_counter()
+                expired = []
+                for sock, (_, started) in in_flight.items():
+                    if now - started < timeout:
+                        break
+                    expired.append(sock)
+                for sock in expired:
+                    finish(sock, None)
+        finally:
+            for sock in list(in_flight):
+                sock.close()
+            selector.close()
+
+        return results
+
+    def discover(self, ips: Iterable[str], ports: Optional[List[int]] = None,
+                 deadline: Optional[float] = None) -> List[str]:
+        """
+        Liefert alle IPs, die auf mindestens einem Port geantwortet haben. Stumme Adressen
+        werden für negative_ttl Sekunden übersprungen (sonst ~15 Connects pro freier IP und Zyklus).
+        Bis zur deadline nicht fertig geprüfte Adressen gelten weder als lebend noch als stumm.
+        """
+        ports = ports or self.discovery_ports()
+        now = time.monotonic()
+        candidates = [ip for ip in ips if self.silent.get(ip, 0) <= now]
+        results = self.probe(((ip, port) for ip in candidates for port in ports), deadline=deadline)
+        alive = {ip for (ip, _), rtt in results.items() if rtt is not None}
+
+        expires = time.monotonic() + self.negative_ttl
+        for ip in candidates:
+            if ip in alive:
+                self.silent.pop(ip, None)
+            elif all((ip, port) in results for port in ports):
+                self.silent[ip] = expires
+        return sorted(alive, key=lambda x: [int(p) for p in x.split(".")])
+
+    def measure_latency(self, ip: str, count: int = 5, device_class: Optional[str] = None) -> Dict[str, float]:
+        """Misst die Latenz über die TCP-Handshake-RTT (gleiches Format wie ICMP)"""
+        return self.measure_latency_many([(ip, count, device_class)])[0]
+
+    def measure_latency_many(self, targets: List[Tuple[str, int, Optional[str]]],
+                             deadline: Optional[float] = None) -> List[Dict[str, float]]:
+        """
+        Latenz für viele (ip, count, device_class) auf einmal: jede Runde ist ein probe()-Aufruf
+        über alle Hosts (eine Selector-Schleife, kein Thread pro Host). Ergebnisse in Reihenfolge
+        von targets; nach der deadline zählen nur die bis dahin gesammelten Samples.
+        """
+        # Erster Durchgang über alle Ports findet pro Host den schnellsten antwortenden Port
+        first = self.probe([(ip, port) for ip, _, device_class in targets for port in self.ports_for(device_class)],
+                           deadline=deadline)
+        best: Dict[str, Tuple[float, int]] = {}
+        for (ip, port), rtt in first.items():
+            if rtt is not None and (ip not in best or rtt < best[ip][0]):
+                best[ip] = (rtt, port)
+
+        # Ein Eintrag pro Runde (None = keine Antwort); dieselbe IP mit verschiedenem count teilt sich die Runden
+        samples: Dict[str, List[Optional[float]]] = {ip: [rtt] for ip, (rtt, _) in best.items()}
+        for round_number in range(1, max((count for _, count, _ in targets), default=0)):
+            wanted = {(ip, best[ip][1]) for ip, count, _ in targets if ip in best and count > round_number}
+            if not wanted or (deadline is not None and time.monotonic() >= deadline):
+                break
+            for (ip, _), rtt in self.probe(wanted, deadline=deadline).items():
+                samples[ip].append(rtt)
+
+        results = []
+        for ip, count, _ in targets:
+            attempted = samples.get(ip, [])[:count]
+            rtts = [rtt for rtt in attempted if rtt is not None]
+            if not rtts:
+                results.append({"avg": 0, "min": 0, "max": 0, "loss": 100})
+                continue
+            results.append({
+                "avg": sum(rtts) / len(rtts),
+                "min": min(rtts),
+                "max": max(rtts),
+                "loss": (len(attempted) - len(rtts)) * 100.0 / len(attempted),
+            })
+        return results
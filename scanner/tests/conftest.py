@@ -0,0 +1,93 @@
+"""
+Gemeinsame Fixtures der Scanner-Tests. Die Module liegen flach in scanner/,
+daher wird das Verzeichnis wie beim Start per python network_scanner.py importierbar gemacht.
+
+    cd scanner && python -m pytest -q
+"""
+
+import os
+import sys
+import socket
+import bisect
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pytest
+
+SCANNER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCANNER_DIR not in sys.path:
+    sys.path.insert(0, SCANNER_DIR)
+
+from snmp_ber import (  # noqa: E402
+    PDU_GET, PDU_GETBULK, PDU_RESPONSE, TAG_END_OF_MIB_VIEW, TAG_NO_SUCH_OBJECT,
+    decode_message, encode_message,
+)
+
+
+def oid_tuple(oid: str) -> Tuple[int, ...]:
+    return tuple(int(part) for part in oid.split("."))
+
+
+class FakeAgent:
+    """
+    Minimaler SNMP-Agent auf 127.0.0.1 (GET, GETNEXT, GETBULK) über einer festen MIB.
+    next_oid lässt sich ersetzen, um fehlerhafte Agenten nachzustellen.
+    """
+
+    def __init__(self, mib: Dict[str, Tuple[int, Any]]):
+        self.mib = mib
+        self.keys = sorted(mib, key=oid_tuple)
+        self._sorted = [oid_tuple(oid) for oid in self.keys]
+        self.requests: List[Dict[str, Any]] = []
+        self.next_oid: Callable[[str], Optional[str]] = self._next
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.port = self.sock.getsockname()[1]
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _next(self, oid: str) -> Optional[str]:
+        position = bisect.bisect_right(self._sorted, oid_tuple(oid))
+        return self.keys[position] if position < len(self.keys) else None
+
+    def _serve(self):
+        while True:
+            try:
+                data, address = self.sock.recvfrom(65535)
+            except OSError:
+                return
+            message = decode_message(data)
+            self.requests.append(message)
+            varbinds = []
+            for oid, _, _ in message["varbinds"]:
+                if message["pdu_type"] == PDU_GET:
+                    tag, value = self.mib.get(oid, (TAG_NO_SUCH_OBJECT, None))
+                    varbinds.append((oid, tag, value))
+                    continue
+                repetitions = message["error_index"] if message["pdu_type"] == PDU_GETBULK else 1
+                current = oid
+                for _ in range(max(1, repetitions)):
+                    current = self.next_oid(current)
+                    if current is None:
+                        varbinds.append((oid, TAG_END_OF_MIB_VIEW, None))
+                        break
+                    varbinds.append((current, *self.mib[current]))
+            self.sock.sendto(encode_message(message["version"], message["community"], PDU_RESPONSE,
+                                            message["request_id"], varbinds), address)
+
+    def close(self):
+        self.sock.close()
+
+
+@pytest.fixture
+def fake_agent():
+    agents: List[FakeAgent] = []
+
+    def start(mib: Dict[str, Tuple[int, Any]]) -> FakeAgent:
+        agent = FakeAgent(mib)
+        agents.append(agent)
+        return agent
+
+    yield start
+    for agent in agents:
+        agent.close()
@@ -0,0 +1,116 @@
+"""Schwellwerte, Hysterese und Lebenszyklus der AlertEngine (alert_engine.py)"""
+
+import math
+
+import pytest
+
+from alert_engine import AlertEngine, AlertRule
+
+
+@pytest.fixture
+def engine():
+    # Standardwerte: CPU warning 80 / critical 95, Hysterese 10%, expire_cycles 3
+    return AlertEngine({})
+
+
+def cpu(engine, value, key="10.0.0.1", cycle=True):
+    engine.update(key, "sw1", {"cpu": value})
+    return [(t["state"], t["level"]) for t in engine.evaluate(cycle=cycle)]
+
+
+@pytest.mark.parametrize("value,current,expected", [
+    (50, None, None),
+    (81, None, "warning"),
+    (96, None, "critical"),
+    (75, "warning", "warning"),
+    (72, "warning", None),
+    (90, "critical", "critical"),
+    (80, "critical", "warning"),
+    (math.nan, "critical", "critical"),
+    (math.nan, None, None),
+])
+def test_level_for_hysteresis(value, current, expected):
+    rule = AlertRule("cpu", "cpu", [("critical", 95), ("warning", 80)], "")
+    assert rule.level_for(value, current, 0.1) == expected
+
+
+def test_lifecycle(engine):
+    assert cpu(engine, 50) == []
+    assert cpu(engine, 85) == [("raised", "warning")]
+    # Innerhalb der Hysterese: kein neuer Zustandswechsel
+    assert cpu(engine, 76) == []
+    assert cpu(engine, 97) == [("ongoing", "critical")]
+    assert cpu(engine, 88) == []
+    assert cpu(engine, 84) == [("ongoing", "warning")]
+    assert cpu(engine, 60) == [("cleared", "warning")]
+    assert engine.active == {}
+
+
+def test_alert_id_stable_across_transitions(engine):
+    engine.update("10.0.0.1", "sw1", {"cpu": 85})
+    raised, = engine.evaluate()
+    engine.update("10.0.0.1", "sw1", {"cpu": 99})
+    ongoing, = engine.evaluate()
+    engine.update("10.0.0.1", "sw1", {"cpu": 10})
+    cleared, = engine.evaluate()
+    assert raised["id"] == ongoing["id"] == cleared["id"]
+    assert raised["id"].startswith("10.0.0.1:cpu:")
+    assert raised["since"] == cleared["since"]
+    assert cleared["msg"].endswith("(behoben)")
+
+
+def test_unchanged_values_are_not_reevaluated(engine):
+    assert cpu(engine, 85) == [("raised", "warning")]
+    assert engine.table.dirty == set()
+    engine.update("10.0.0.1", "sw1", {"cpu": 85})
+    assert engine.table.dirty == set()
+
+
+def test_missing_value_keeps_state(engine):
+    assert cpu(engine, 85) == [("raised", "warning")]
+    assert cpu(engine, None) == []
+    assert (0, "cpu") in engine.active
+
+
+def test_rows_are_independent(engine):
+    assert cpu(engine, 85, key="a") == [("raised", "warning")]
+    assert cpu(engine, 99, key="b") == [("raised", "critical")]
+    assert cpu(engine, 10, key="a") == [("cleared", "warning")]
+    assert list(engine.active) == [(1, "cpu")]
+
+
+def test_expire_after_missed_cycles(engine):
+    assert cpu(engine, 90) == [("raised", "warning")]
+    assert engine.evaluate() == []
+    assert engine.evaluate() == []
+    expired = engine.evaluate()
+    assert [(t["state"], t["level"]) for t in expired] == [("cleared", "warning")]
+    assert "90" in expired[0]["msg"]
+    assert engine.active == {} and engine.missed == {}
+    # Kommt das Gerät zurück, wird es neu ausgewertet
+    assert cpu(engine, 90) == [("raised", "warning")]
+
+
+def test_values_reset_expiry(engine):
+    assert cpu(engine, 90) == [("raised", "warning")]
+    engine.evaluate()
+    engine.evaluate()
+    assert cpu(engine, 90) == []
+    assert engine.evaluate() == []
+    assert (0, "cpu") in engine.active
+
+
+def test_intermediate_evaluation_does_not_expire(engine):
+    assert cpu(engine, 90) == [("raised", "warning")]
+    for _ in range(5):
+        assert engine.evaluate(cycle=False) == []
+    assert (0, "cpu") in engine.active
+
+
+def test_configured_thresholds():
+    engine = AlertEngine({"alert_thresholds": {"cpu_warning_percent": 50, "hysteresis_percent": 0,
+                                               "expire_cycles": 1}})
+    assert cpu(engine, 51) == [("raised", "warning")]
+    assert cpu(engine, 49) == [("cleared", "warning")]
+    assert cpu(engine, 51) == [("raised", "warning")]
+    assert [t["state"] for t in engine.evaluate()] == ["cleared"]
@@ -0,0 +1,54 @@
+"""Bandbreiten-Payload (aggregate_bandwidth_data) und ntopng-Abrufe über mehrere Interfaces"""
+
+import threading
+
+from network_scanner import NetworkScanner, NtopngClient
+
+
+def device(kind, in_bps, out_bps):
+    return {"name": kind, "type": kind, "metrics": {"bandwidth": {"in_bps": in_bps, "out_bps": out_bps}}}
+
+
+def test_snmp_wifi_is_unknown_without_access_points():
+    scanner = NetworkScanner({})
+    scanner.devices = {"10.0.0.1": device("switch", 4e9, 1e9)}
+    bandwidth = scanner.aggregate_bandwidth_data()
+    assert bandwidth["source"] == "snmp" and bandwidth["downstream_gbps"] == 4.0
+    assert bandwidth["wifi_gbps"] is None
+
+
+def test_snmp_wifi_from_access_points():
+    scanner = NetworkScanner({})
+    scanner.devices = {"10.0.0.1": device("switch", 4e9, 1e9), "10.0.0.2": device("access_point", 3e8, 2e8)}
+    assert scanner.aggregate_bandwidth_data()["wifi_gbps"] == 0.5
+
+
+def test_ntopng_wifi_is_unknown_without_wifi_interface_or_access_points():
+    scanner = NetworkScanner({"ntopng": {"enabled": True}})
+    scanner.ntopng._get = lambda instance, path, ifid, params=None, deadline=None: {
+        "throughput": {"download": {"bps": 1e9, "pps": 1}, "upload": {"bps": 1e8, "pps": 1}}}
+    bandwidth = scanner.aggregate_bandwidth_data()
+    assert bandwidth["source"] == "ntopng" and bandwidth["wifi_gbps"] is None
+
+
+def test_ntopng_reuses_one_executor():
+    client = NtopngClient({"ntopng": {"enabled": True, "instances": [
+        {"name": "a", "url": "http://a", "interfaces": [{"id": 1, "role": "wan"}, {"id": 2, "role": "wifi"}]},
+    ]}})
+    threads = set()
+
+    def get(instance, path, ifid, params=None, deadline=None):
+        threads.add(threading.current_thread().name)
+        return {"throughput": {"download": {"bps": ifid * 1e9, "pps": 1}, "upload": {"bps": 0, "pps": 0}}}
+
+    client._get = get
+    executor = client._executor
+    for _ in range(5):
+        client.fetch_interface_data()
+    assert client._executor is executor and len(threads) <= 2
+    assert all(name.startswith("ntopng") for name in threads)
+    assert client.get_role_throughput("wifi")["download_bps"] == 2e9
+
+
+def test_single_interface_needs_no_executor():
+    assert NtopngClient({"ntopng": {"enabled": True}})._executor is None
@@ -0,0 +1,114 @@
+"""CollectorScheduler (collectors.py): Übernahme der Ausgaben, Deadlines, ntopng-Abruf pro Zyklus"""
+
+import threading
+import time
+
+import pytest
+
+from collectors import BUILTIN_COLLECTORS, Collector, CollectorScheduler
+from multi_site import Lane, SharedPools
+from network_scanner import NetworkScanner
+
+RELEASE = threading.Event()
+
+
+class SlowCollector(Collector):
+    """Wartet auf RELEASE; apply() schreibt in scanner.devices"""
+
+    name = "slow"
+    outputs = ("slow",)
+
+    def collect(self, data):
+        RELEASE.wait(5)
+        return {"slow": {"10.0.0.9": {"name": "late", "type": "switch"}}}
+
+    def apply(self, outputs):
+        self.scanner.devices.update(outputs["slow"])
+
+
+def only(*plugins):
+    return {"collectors": {"entry_points": False, "disabled": list(BUILTIN_COLLECTORS),
+                           "plugins": [f"test_collectors:{plugin.__name__}" for plugin in plugins]}}
+
+
+@pytest.fixture
+def scanner():
+    RELEASE.clear()
+    scanner = NetworkScanner(only(SlowCollector))
+    yield scanner
+    RELEASE.set()
+    scanner.collectors.shutdown()
+
+
+def test_overrun_is_applied_in_a_later_cycle(scanner):
+    data, pending = scanner.collectors.run(None, time.monotonic() + 0.1)
+    assert pending == ["slow"] and "slow" not in data
+    # Der Lauf endet während die Payloads gebaut würden: der Zustand bleibt unverändert
+    RELEASE.set()
+    time.sleep(0.1)
+    assert scanner.devices == {}
+
+    data, pending = scanner.collectors.run(None, time.monotonic() + 2)
+    assert pending == [] and scanner.devices["10.0.0.9"]["name"] == "late"
+    assert data["slow"] == {"10.0.0.9": {"name": "late", "type": "switch"}}
+
+
+def test_collect_receives_deadline(scanner, monkeypatch):
+    seen = []
+    monkeypatch.setattr(SlowCollector, "collect", lambda self, data: seen.append(data) or {})
+    deadline = time.monotonic() + 2
+    scanner.collectors.run("10.0.0.0/24", deadline)
+    assert seen == [{"subnet": "10.0.0.0/24", "deadline": deadline}]
+
+
+def test_multi_site_uses_the_shared_collector_pool():
+    shared = SharedPools({})
+    scanner = NetworkScanner({**only(SlowCollector), "name": "halle-a"}, shared=shared)
+    RELEASE.set()
+    scanner.collectors.run(None, time.monotonic() + 2)
+    executor = scanner.collectors._executor
+    assert isinstance(executor, Lane) and executor.pool is shared.pools["collectors"]
+    assert executor.key == "halle-a"
+
+
+def test_ntopng_is_fetched_once_per_cycle():
+    scanner = NetworkScanner({"ntopng": {"enabled": True}, **only()})
+    scanner.collectors.config["collectors"]["disabled"].remove("ntopng")
+    calls = []
+
+    def get(instance, path, ifid, params=None, deadline=None):
+        calls.append(path)
+        if "host" in path:
+            return [{"ip": "10.0.0.5", "bytes_sent": 1000, "bytes_rcvd": 2000}]
+        return {"throughput": {"download": {"bps": 2e9, "pps": 1}, "upload": {"bps": 1e9, "pps": 1}}, "speed": 10000}
+
+    scanner.ntopng._get = get
+    scanner.collectors.run(None, time.monotonic() + 2)
+    bandwidth = scanner.aggregate_bandwidth_data()
+    assert bandwidth["source"] == "ntopng" and bandwidth["downstream_gbps"] == 2.0
+    assert sum("interface" in path for path in calls) == 1
+    assert scanner.ntopng.last_hosts == [{"ip": "10.0.0.5", "bytes_sent": 1000, "bytes_rcvd": 2000}]
+    scanner.collectors.shutdown()
+
+
+def test_ntopng_collector_is_bounded():
+    scanner = NetworkScanner({"ntopng": {"enabled": True},
+                              "collectors": {"entry_points": False, "disabled": ["discovery", "snmp", "latency"],
+                                             "options": {"ntopng": {"timeout": 0.3}}}})
+    timeouts = []
+
+    class HangingSession:
+        def get(self, url, params=None, timeout=None):
+            # ntopng antwortet nicht: jeder Request läuft in seinen Timeout
+            timeouts.append(timeout)
+            time.sleep(timeout)
+            raise TimeoutError("timeout")
+
+    scanner.ntopng.session = lambda instance: HangingSession()
+    started = time.monotonic()
+    data, pending = scanner.collectors.run()
+    # Interface-Abruf schöpft das Budget aus, der Host-Abruf startet danach nicht mehr
+    assert time.monotonic() - started < 0.6
+    assert len(timeouts) == 1 and timeouts[0] <= 0.3
+    assert pending == [] and data["ntopng_hosts"] is None
+    scanner.collectors.shutdown()
@@ -0,0 +1,110 @@
+"""AIMD-Fenster und Paketraten (concurrency.py) sowie deren Anbindung an Ping und SNMP-Client"""
+
+import math
+import time
+
+import pytest
+
+from concurrency import AimdWindow, ConcurrencyController, MIN_ROUND_SAMPLES, TokenBucket
+from network_scanner import NetworkScanner
+from snmp_client import SnmpClient
+
+
+def window(initial=8, minimum=2, maximum=64):
+    return AimdWindow(initial, minimum, maximum, timeout_rate=0.05, rtt_inflation=2.0)
+
+
+def run_round(aimd, rtt=0.01, timeouts=0):
+    samples = max(MIN_ROUND_SAMPLES, int(aimd.limit))
+    for index in range(samples):
+        aimd.in_flight += 1
+        aimd.complete(None if index < timeouts else rtt, timed_out=index < timeouts)
+
+
+def test_slow_start_doubles_until_max():
+    aimd = window()
+    run_round(aimd)
+    assert aimd.limit == 16 and aimd.slow_start
+    for _ in range(5):
+        run_round(aimd)
+    assert aimd.limit == 64
+
+
+def test_timeouts_halve_then_grow_additively():
+    aimd = window(initial=32)
+    run_round(aimd, timeouts=4)
+    assert aimd.limit == 16 and not aimd.slow_start
+    run_round(aimd)
+    assert aimd.limit == 17
+
+
+def test_rtt_inflation_halves():
+    aimd = window(initial=16)
+    run_round(aimd, rtt=0.01)
+    run_round(aimd, rtt=0.01)
+    limit = aimd.limit
+    for _ in range(3):
+        run_round(aimd, rtt=0.1)
+    assert aimd.limit < limit
+
+
+def test_window_never_below_minimum():
+    aimd = window(initial=8, minimum=4)
+    for _ in range(5):
+        run_round(aimd, timeouts=8)
+    assert aimd.limit == 4
+
+
+def test_token_bucket_delay():
+    bucket = TokenBucket(10)
+    now = bucket.updated
+    for _ in range(10):
+        assert bucket.delay(now) == 0
+        bucket.take(now)
+    assert bucket.delay(now) == pytest.approx(0.1)
+    assert bucket.delay(now + 0.1) == 0
+
+
+def test_controller_window_and_release():
+    controller = ConcurrencyController({"adaptive_concurrency": {"snmp": {
+        "initial": 2, "per_target_initial": 1, "global_pps": 0, "per_target_pps": 0}}}, "snmp")
+    assert controller.try_acquire("a") == 0
+    # Fenster pro Ziel voll, anderes Ziel frei
+    assert controller.try_acquire("a") == math.inf
+    assert controller.try_acquire("b") == 0
+    # Globales Fenster voll
+    assert controller.try_acquire("c") == math.inf
+    controller.release("a", 0.01)
+    assert controller.try_acquire("c") == 0
+    assert controller.stats()["in_flight"] == 2
+
+
+def test_controller_packet_rate():
+    controller = ConcurrencyController({"adaptive_concurrency": {"snmp": {
+        "global_pps": 0, "per_target_pps": 2, "per_target_initial": 32}}}, "snmp")
+    now = time.monotonic()
+    assert controller.try_acquire("a", now) == 0
+    assert controller.try_acquire("a", now) == 0
+    assert controller.try_acquire("a", now) == pytest.approx(0.5)
+
+
+def test_snmp_client_times_out_silent_target_with_controller():
+    client = SnmpClient(timeout=0.3, retries=0, controller=ConcurrencyController({}, "snmp"))
+    client.start()
+    try:
+        started = time.monotonic()
+        assert client.get("192.0.2.1", ["1.3.6.1.2.1.1.5.0"]).result(3) is None
+        assert time.monotonic() - started < 2
+        assert client.controller.stats()["in_flight"] == 0
+    finally:
+        client.close()
+
+
+def test_ping_reports_icmp_rtt_and_timeouts():
+    scanner = NetworkScanner({})
+    released = []
+    scanner.ping_concurrency.release = lambda ip, rtt, timed_out=False: released.append((ip, rtt, timed_out))
+    replies = {"10.0.0.1": 12.5, "10.0.0.2": None, "10.0.0.3": math.nan}
+    scanner.ping_rtt = replies.get
+    assert [scanner.ping_host_paced(ip) for ip in replies] == [True, False, True]
+    assert released == [("10.0.0.1", 0.0125, False), ("10.0.0.2", None, True), ("10.0.0.3", None, False)]
@@ -0,0 +1,125 @@
+"""Lokale Read-API (local_api.py)"""
+
+import gzip
+import json
+import http.client
+
+import pytest
+
+from local_api import MAX_ALERTS, LocalApiServer, SnapshotStore
+
+
+@pytest.fixture
+def store():
+    return SnapshotStore()
+
+
+def alerts(store, **params):
+    return json.loads(store.get("alerts", params).body)
+
+
+def age_alerts(store, seconds):
+    entries = store._states["alerts"]["alerts"]
+    for position, (alert, ts) in enumerate(entries):
+        entries[position] = (alert, ts - seconds)
+
+
+def test_alert_transitions_replace_by_id(store):
+    store.publish("alerts", {"alerts": [{"id": "a", "level": "warning", "state": "raised"}]})
+    store.publish("alerts", {"alerts": [{"id": "a", "level": "critical", "state": "ongoing"}]})
+    body = alerts(store)
+    assert [(a["id"], a["level"], a["state"]) for a in body["data"]] == [("a", "critical", "ongoing")]
+    assert (body["critical"], body["warning"]) == (1, 0)
+
+
+def test_open_alerts_outlive_the_hours_window(store):
+    store.publish("alerts", {"alerts": [{"id": "open", "level": "critical", "state": "raised"},
+                                        {"id": "done", "level": "warning", "state": "cleared"},
+                                        {"id": "legacy", "level": "warning"}]})
+    age_alerts(store, 2 * 3600)
+    # Das hours-Fenster wird beim nächsten Zyklus ausgewertet
+    store.publish("alerts", {"alerts": []})
+    body = alerts(store)
+    assert [a["id"] for a in body["data"]] == ["open"]
+    assert alerts(store, hours="3")["count"] == 3
+
+
+def test_cleared_alerts_are_not_counted(store):
+    store.publish("alerts", {"alerts": [{"id": "a", "level": "critical", "state": "raised"}]})
+    store.publish("alerts", {"alerts": [{"id": "a", "level": "critical", "state": "cleared"}]})
+    body = alerts(store)
+    assert body["count"] == 1 and body["data"][0]["state"] == "cleared"
+    assert (body["critical"], body["warning"]) == (0, 0)
+
+
+def test_overflow_drops_cleared_alerts_first(store):
+    store.publish("alerts", {"alerts": [{"id": "open", "level": "warning", "state": "raised"}]})
+    store.publish("alerts", {"alerts": [{"id": f"c{index}", "level": "warning", "state": "cleared"}
+                                        for index in range(MAX_ALERTS + 5)]})
+    body = alerts(store, hours="1")
+    assert body["count"] == MAX_ALERTS
+    assert body["data"][-1]["id"] == "open"
+
+
+def test_alerts_are_serialized_once_per_cycle(store):
+    store.publish("alerts", {"alerts": [{"id": "a", "level": "warning", "state": "raised"}]})
+    assert store.get("alerts", {}) is store.get("alerts", {})
+    assert store.get("alerts", {"hours": "3"}) is store.get("alerts", {"hours": "3"})
+    before = store.get("alerts", {})
+    store.publish("alerts", {"alerts": []})
+    assert store.get("alerts", {}) is not before
+    # Keine Änderung im Inhalt: gleicher ETag
+    assert store.get("alerts", {}).etag == before.etag
+
+
+@pytest.fixture
+def server():
+    api = LocalApiServer({"local_api": {"enabled": True, "host": "127.0.0.1", "port": 0, "gzip_min_bytes": 64}})
+    assert api.start()
+    yield api, api._server.server_address[1]
+    api.stop()
+
+
+def fetch(port, path, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_etag_not_modified(server):
+    api, port = server
+    api.publish("hosts", {"hosts": [{"ip": "10.0.0.1", "name": "sw1", "status": "online"}]})
+    status, headers, body = fetch(port, "/hosts")
+    assert status == 200 and [h["ip"] for h in json.loads(body)["data"]["hosts"]] == ["10.0.0.1"]
+    etag = headers["ETag"]
+
+    status, _, body = fetch(port, "/functions/v1/hosts", {"If-None-Match": etag})
+    assert (status, body) == (304, b"")
+    status, _, _ = fetch(port, "/hosts", {"If-None-Match": f'"other", {etag}'})
+    assert status == 304
+
+    api.publish("hosts", {"hosts": []})
+    status, headers, _ = fetch(port, "/hosts", {"If-None-Match": etag})
+    assert status == 200 and headers["ETag"] != etag
+
+
+def test_gzip_and_filters(server):
+    api, port = server
+    api.publish("hosts", {"hosts": [{"ip": f"10.0.0.{index}", "name": f"host{index}", "status": "online"}
+                                    for index in range(1, 40)]})
+    status, headers, body = fetch(port, "/hosts?search=host3", {"Accept-Encoding": "gzip"})
+    assert status == 200 and headers["Content-Encoding"] == "gzip"
+    data = json.loads(gzip.decompress(body))
+    assert sorted(host["name"] for host in data["data"]["hosts"]) == ["host3"] + [f"host3{i}" for i in range(10)]
+
+    status, headers, body = fetch(port, "/hosts?search=host3")
+    assert "Content-Encoding" not in headers and json.loads(body) == data
+
+
+def test_unknown_resource(server):
+    _, port = server
+    assert fetch(port, "/nope")[0] == 404
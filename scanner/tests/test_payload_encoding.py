@@ -0,0 +1,108 @@
+"""Upload-Encoding (payload_encoding.py) und JSON-Rückfall bei 415 in send_to_api"""
+
+import json
+import zlib
+
+import pytest
+
+from network_scanner import NetworkScanner
+from payload_encoding import PayloadEncoder
+
+DATA = {"hosts": [{"ip": f"10.0.0.{index}", "name": f"host{index}"} for index in range(100)]}
+
+
+def packer(data):
+    return b"PACK" + json.dumps(data).encode("utf-8")
+
+
+def encoder(**options):
+    return PayloadEncoder({"upload_encoding": options}, packer=packer)
+
+
+def test_compact_json_below_min_bytes():
+    payload = encoder(min_bytes=1 << 20).encode({"a": 1, "b": [1, 2]})
+    assert payload.body == b'{"a":1,"b":[1,2]}'
+    assert payload.headers == {"Content-Type": "application/json"}
+    assert payload.raw_size == len(payload.body)
+
+
+@pytest.mark.parametrize("compression,wbits", [("gzip", 31), ("deflate", 15)])
+def test_compression(compression, wbits):
+    payload = encoder(compression=compression).encode(DATA)
+    assert payload.headers["Content-Encoding"] == compression
+    raw = zlib.decompress(payload.body, wbits)
+    assert json.loads(raw) == DATA and payload.raw_size == len(raw)
+    assert len(payload.body) < payload.raw_size
+
+
+def test_binary_format_uses_packer():
+    payload = encoder(format="msgpack", compression="none").encode(DATA)
+    assert payload.headers == {"Content-Type": "application/msgpack"}
+    assert payload.body == packer(DATA)
+
+
+def test_binary_format_without_packer_falls_back_to_json():
+    payload = PayloadEncoder({"upload_encoding": {"format": "cbor", "compression": "none"}}).encode(DATA)
+    assert payload.headers["Content-Type"] == "application/json"
+
+
+def test_unknown_options_are_normalized():
+    unknown = encoder(format="xml", compression="brotli")
+    assert (unknown.format, unknown.compression) == ("json", "none")
+
+
+def test_refused_endpoint_gets_plain_json():
+    msgpack = encoder(format="msgpack")
+    assert msgpack.refused("hosts")
+    # Nur einmal zurückfallen, andere Endpoints behalten das Format
+    assert not msgpack.refused("hosts")
+    assert msgpack.encode(DATA, "hosts").headers == {"Content-Type": "application/json"}
+    assert msgpack.encode(DATA, "alerts").headers["Content-Type"] == "application/msgpack"
+    assert not encoder(compression="none").refused("hosts")
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+        self.text = ""
+
+
+class FakeSession:
+    """Antwortet mit den vorgegebenen Statuscodes und merkt sich die Requests"""
+
+    def __init__(self, *status_codes):
+        self.status_codes = list(status_codes)
+        self.requests = []
+
+    def post(self, url, data, headers, timeout):
+        self.requests.append((url, data, headers))
+        return FakeResponse(self.status_codes.pop(0))
+
+
+def scanner_with(session, **options):
+    scanner = NetworkScanner({"api_url": "http://api", "api_key": "key", "upload_encoding": options})
+    scanner.payload_encoder.packer = packer
+    scanner._api_session = session
+    return scanner
+
+
+def test_send_to_api_415_falls_back_to_json():
+    session = FakeSession(415, 200, 200)
+    scanner = scanner_with(session, format="msgpack")
+    assert scanner.send_to_api("hosts", DATA)
+    (url, first, first_headers), (_, retry, retry_headers) = session.requests
+    assert url == "http://api/hosts" and first_headers["Authorization"] == "Bearer key"
+    assert first_headers["Content-Type"] == "application/msgpack" and "Content-Encoding" in first_headers
+    assert retry_headers["Content-Type"] == "application/json" and "Content-Encoding" not in retry_headers
+    assert json.loads(retry) == DATA
+
+    # Der Rückfall bleibt bestehen, ohne erneuten Versuch im Binärformat
+    assert scanner.send_to_api("hosts", DATA)
+    assert session.requests[2][2]["Content-Type"] == "application/json"
+
+
+def test_send_to_api_415_with_plain_json_is_an_error():
+    session = FakeSession(415)
+    scanner = scanner_with(session, compression="none")
+    assert not scanner.send_to_api("hosts", DATA)
+    assert len(session.requests) == 1
@@ -0,0 +1,104 @@
+"""Zeitraster, Stufen-Deadlines und DeadlineStage (scheduler.py) sowie deren Einsatz im Scanner"""
+
+import threading
+import time
+
+import pytest
+
+from network_scanner import LATENCY_NOT_MEASURED, NetworkScanner
+from scheduler import CycleScheduler, DeadlineStage
+
+
+def test_grid_start_times():
+    scheduler = CycleScheduler({}, 10)
+    assert scheduler.next_start(100.0) == 100.0
+    assert scheduler.next_start(103.0) == 110.0
+    assert scheduler.next_start(110.5) == 120.0
+    assert scheduler.skipped == 0
+
+
+def test_overrun_skips_grid_points():
+    scheduler = CycleScheduler({}, 10)
+    scheduler.next_start(100.0)
+    # Zyklus dauerte 35 s: 110, 120 und 130 sind verpasst
+    assert scheduler.next_start(135.0) == 140.0
+    assert scheduler.skipped == 3
+
+
+def test_stage_deadlines_are_cumulative():
+    scheduler = CycleScheduler({"scheduler": {"stage_budgets": {"snmp": 0.5}}}, 10)
+    assert scheduler.deadline("discovery") is None
+    scheduler.begin_cycle(100.0)
+    assert scheduler.deadline("discovery") == pytest.approx(103.0)
+    assert scheduler.deadline("snmp") == pytest.approx(108.0)
+    # Summe der Anteile wird bei 1.0 gekappt
+    assert scheduler.deadline("latency") == pytest.approx(110.0)
+    scheduler.end_cycle()
+    assert scheduler.deadline("snmp") is None
+
+
+def test_no_deadlines_without_fixed_rate():
+    scheduler = CycleScheduler({"scheduler": {"fixed_rate": False}}, 10)
+    scheduler.begin_cycle(time.monotonic() - 100)
+    assert scheduler.deadline("snmp") is None and not scheduler.expired("snmp")
+
+
+def test_expired():
+    scheduler = CycleScheduler({}, 10)
+    scheduler.begin_cycle(time.monotonic() - 3.5)
+    assert scheduler.expired("discovery") and not scheduler.expired("snmp")
+
+
+def test_deadline_stage_carries_unfinished_work():
+    stage = DeadlineStage("test", 1)
+    release = threading.Event()
+
+    def work(key):
+        if key == "slow":
+            release.wait(5)
+        return key.upper()
+
+    try:
+        results, pending = stage.run(["slow", "queued"], work, time.monotonic() + 0.1)
+        assert results == {} and sorted(pending) == ["queued", "slow"]
+        # "slow" läuft weiter, "queued" wurde nicht gestartet und kommt zuerst dran
+        assert list(stage.in_flight) == ["slow"] and stage.carry == ["queued"]
+
+        release.set()
+        results, pending = stage.run(["new"], work, time.monotonic() + 2)
+        assert results == {"slow": "SLOW", "queued": "QUEUED", "new": "NEW"} and pending == []
+    finally:
+        release.set()
+        stage.shutdown()
+
+
+def test_deadline_stage_without_deadline_waits():
+    stage = DeadlineStage("test", 4)
+    try:
+        results, pending = stage.run(range(8), lambda key: key * 2)
+        assert results == {key: key * 2 for key in range(8)} and pending == []
+    finally:
+        stage.shutdown()
+
+
+def test_single_shot_cycle_has_deadlines():
+    scanner = NetworkScanner({"scan_interval": 10})
+    seen = {}
+
+    def cycle(subnet=None):
+        seen["snmp"] = scanner.scheduler.deadline("snmp")
+        return {}
+
+    scanner._scan_cycle = cycle
+    started = time.monotonic()
+    scanner.run_scheduled_cycle()
+    assert seen["snmp"] == pytest.approx(started + 7, abs=0.5)
+    assert scanner.scheduler.cycle_start is None
+
+
+def test_unmeasured_infrastructure_ping_stays_numeric():
+    scanner = NetworkScanner({})
+    scanner.devices = {"10.0.0.1": {"name": "gw", "type": "router", "status": "online"}}
+    scanner.measure_latency = lambda ip, count=5, device_class=None: dict(LATENCY_NOT_MEASURED)
+    devices = scanner.build_infrastructure_data()["devices"]
+    assert [device["ping"] for device in devices] == [0]
@@ -0,0 +1,171 @@
+"""SnapshotWriter/SnapshotReader: Round-Trip und Seqlock (shared_snapshot.py, snapshot_reader.py)"""
+
+import threading
+
+import pytest
+
+from shared_snapshot import SnapshotWriter
+from snapshot_reader import SEQ, SEQ_OFFSET, SnapshotReader
+
+
+def make_writer(path, **snapshot):
+    return SnapshotWriter({"name": "lan", "shared_snapshot": {"path": str(path), **snapshot}})
+
+
+def cycle_payloads(value: float, count: int = 3):
+    hosts = [{"ip": f"10.0.0.{index}", "name": f"host{index}-{value:.0f}", "cpu": value}
+             for index in range(count, 0, -1)]
+    payloads = [
+        ("bandwidth", {"source": "snmp", "upstream_gbps": value, "downstream_gbps": 2.5,
+                       "partial": ["10.0.0.9"]}),
+        ("hosts", {"hosts": hosts}),
+        ("gaming-devices", {"devices": [{"ip": "10.0.0.2", "name": "PS5", "ping": 12.5, "packetLoss": 0.0}]}),
+    ]
+    devices = {"10.0.0.1": {"name": "sw1", "type": "switch", "metrics": {"bandwidth": {"in_bps": 1e6}},
+                            "interfaces": [{"index": "1", "name": "Gi0/1", "status": "up", "speed": 1e9,
+                                            "in_octets": 2 ** 64 - 1, "out_octets": 5},
+                                           {"index": "2", "name": "Gi0/2", "status": "down"}]}}
+    return payloads, devices
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    writer = make_writer(tmp_path / "snapshot.bin")
+    readers = []
+
+    def reader():
+        readers.append(SnapshotReader(writer.path))
+        return readers[-1]
+
+    yield writer, reader
+    for opened in readers:
+        opened.close()
+    writer.close()
+
+
+def test_roundtrip(snapshot):
+    writer, reader = snapshot
+    writer.publish_cycle(*cycle_payloads(1.5), now=1000.0)
+    data = reader().read()
+    assert (data["seq"], data["cycle"], data["timestamp"], data["site"]) == (2, 1, 1000.0, "lan")
+    assert data["partial"] == ["10.0.0.9"] and not data["truncated"]
+    assert data["bandwidth"]["source"] == "snmp"
+    assert data["bandwidth"]["upstream_gbps"] == 1.5 and data["bandwidth"]["wifi_gbps"] is None
+    assert [device["ip"] for device in data["devices"]] == ["10.0.0.1", "10.0.0.2", "10.0.0.3"]
+
+    switch, console, _ = data["devices"]
+    assert (switch["name"], switch["type"], switch["snmp"], switch["in_bps"]) == ("sw1", "switch", True, 1e6)
+    assert [(i["index"], i["name"], i["status"]) for i in switch["interfaces"]] == [(1, "Gi0/1", "up"),
+                                                                                    (2, "Gi0/2", "down")]
+    assert switch["interfaces"][0]["in_octets"] == 2 ** 64 - 1
+    assert (console["name"], console["gaming"], console["ping"], console["packet_loss"]) == ("PS5", True, 12.5, 0.0)
+
+
+def test_find(snapshot):
+    writer, reader = snapshot
+    writer.publish_cycle(*cycle_payloads(1, count=50), now=0.0)
+    view = reader().view()
+    assert view.find("10.0.0.37")["name"] == "host37-1"
+    assert view.find("10.0.0.1")["name"] == "sw1"
+    assert view.find("10.0.0.51") is None
+    assert view.find("9.255.255.255") is None
+
+
+def test_seq_advances_by_two(snapshot):
+    writer, reader = snapshot
+    writer.publish_cycle(*cycle_payloads(1), now=0.0)
+    opened = reader()
+    view = opened.view()
+    assert opened.seq == 2 and view.valid()
+    writer.publish_cycle(*cycle_payloads(2), now=1.0)
+    assert opened.seq == 4 and not view.valid()
+    assert opened.wait_for_update(2, timeout=0)
+    assert not opened.wait_for_update(4, timeout=0)
+
+
+def test_view_waits_while_writing(snapshot):
+    writer, reader = snapshot
+    writer.publish_cycle(*cycle_payloads(1), now=0.0)
+    opened = reader()
+    # Writer mitten im Zyklus: ungerader Zähler
+    SEQ.pack_into(writer._map, SEQ_OFFSET, 3)
+    with pytest.raises(TimeoutError):
+        opened.view(timeout=0.01)
+    with pytest.raises(TimeoutError):
+        opened.read(timeout=0.01)
+    assert not opened.wait_for_update(2, timeout=0)
+    SEQ.pack_into(writer._map, SEQ_OFFSET, 2)
+    assert opened.read()["cycle"] == 1
+
+
+def test_concurrent_reads_are_consistent(snapshot):
+    writer, reader = snapshot
+    writer.publish_cycle(*cycle_payloads(0, count=200), now=0.0)
+    stop = threading.Event()
+
+    def publish():
+        cycle = 0
+        while not stop.is_set():
+            cycle += 1
+            writer.publish_cycle(*cycle_payloads(cycle, count=200), now=float(cycle))
+
+    thread = threading.Thread(target=publish, daemon=True)
+    thread.start()
+    opened = reader()
+    try:
+        seen = set()
+        for _ in range(200):
+            data = opened.read(timeout=5)
+            assert data["seq"] % 2 == 0
+            values = {data["bandwidth"]["upstream_gbps"], data["timestamp"]}
+            values |= {device["cpu"] for device in data["devices"]
+                       if not device["snmp"] and not device["gaming"]}
+            values |= {float(device["name"].rsplit("-", 1)[1]) for device in data["devices"]
+                       if not device["snmp"] and not device["gaming"]}
+            assert len(values) == 1, f"Snapshot aus mehreren Zyklen: {sorted(values)}"
+            seen.add(data["cycle"])
+    finally:
+        stop.set()
+        thread.join(timeout=5)
+    assert len(seen) > 1
+
+
+def test_reopen_continues_seq(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    writer = make_writer(path)
+    writer.publish_cycle(*cycle_payloads(1), now=0.0)
+    # Abgebrochener Schreibvorgang hinterlässt einen ungeraden Zähler
+    SEQ.pack_into(writer._map, SEQ_OFFSET, 3)
+    writer.close()
+
+    writer = make_writer(path)
+    writer.publish_cycle(*cycle_payloads(2), now=1.0)
+    opened = SnapshotReader(str(path))
+    try:
+        data = opened.read()
+        assert data["seq"] % 2 == 0 and data["seq"] > 3
+        assert data["cycle"] == 2
+    finally:
+        opened.close()
+        writer.close()
+
+
+def test_truncated(tmp_path):
+    writer = make_writer(tmp_path / "snapshot.bin", max_devices=2, max_interfaces=1)
+    writer.publish_cycle(*cycle_payloads(1), now=0.0)
+    opened = SnapshotReader(writer.path)
+    try:
+        data = opened.read()
+        assert data["truncated"]
+        assert [device["ip"] for device in data["devices"]] == ["10.0.0.1", "10.0.0.2"]
+        assert len(data["devices"][0]["interfaces"]) == 1
+    finally:
+        opened.close()
+        writer.close()
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 256)
+    with pytest.raises(ValueError):
+        SnapshotReader(str(path))
@@ -0,0 +1,129 @@
+"""Round-Trip und Randfälle des BER-Codecs (snmp_ber.py)"""
+
+import pytest
+
+from snmp_ber import (
+    PDU_GET, PDU_GETBULK, PDU_RESPONSE, PDU_TRAP_V1,
+    TAG_COUNTER32, TAG_COUNTER64, TAG_GAUGE32, TAG_INTEGER, TAG_IP_ADDRESS, TAG_NO_SUCH_INSTANCE,
+    TAG_NULL, TAG_OCTET_STRING, TAG_OID, TAG_SEQUENCE, TAG_TIMETICKS,
+    BerError, decode_message, decode_oid, decode_tlv, encode_integer, encode_length, encode_message,
+    encode_oid, encode_request, encode_tlv, pretty_value,
+)
+
+
+def roundtrip(varbinds, pdu_type=PDU_RESPONSE, **kwargs):
+    data = encode_message(1, b"public", pdu_type, 1234, varbinds, **kwargs)
+    return decode_message(data)
+
+
+@pytest.mark.parametrize("value", [0, 1, -1, 127, 128, 255, 256, -128, -129, 2 ** 31 - 1, -2 ** 31])
+def test_integer_roundtrip(value):
+    message = roundtrip([("1.3.6.1.2.1.1.7.0", TAG_INTEGER, value)])
+    assert message["varbinds"][0][2] == value
+
+
+@pytest.mark.parametrize("tag,value", [
+    (TAG_COUNTER32, 2 ** 32 - 1),
+    (TAG_GAUGE32, 2 ** 31),
+    (TAG_TIMETICKS, 0),
+    (TAG_COUNTER64, 2 ** 64 - 1),
+    (TAG_COUNTER64, 2 ** 63),
+])
+def test_unsigned_roundtrip(tag, value):
+    message = roundtrip([("1.3.6.1.2.1.31.1.1.1.6.1", tag, value)])
+    assert message["varbinds"][0] == ("1.3.6.1.2.1.31.1.1.1.6.1", tag, value)
+
+
+def test_unsigned_gets_leading_zero_byte():
+    # Oberstes Bit gesetzt: ohne 0x00 wäre der Wert negativ
+    assert encode_integer(0x80, TAG_COUNTER32) == bytes((TAG_COUNTER32, 2, 0x00, 0x80))
+    assert encode_integer(0x80) == bytes((TAG_INTEGER, 2, 0x00, 0x80))
+    assert encode_integer(-1) == bytes((TAG_INTEGER, 1, 0xFF))
+
+
+@pytest.mark.parametrize("oid", [
+    "1.3.6.1.2.1.1.1.0",
+    "1.3.6.1.4.1.41112.1.4.7.1.2",
+    "1.3.6.1.2.1.4.35.1.4.3.1.4.192.168.1.10",
+    "1.3.6.1.4.1.127.128.16383.16384.4294967295",
+    "2.999.1",
+])
+def test_oid_roundtrip(oid):
+    tag, start, end = decode_tlv(encode_oid(oid))
+    assert tag == TAG_OID
+    assert decode_oid(encode_oid(oid)[start:end]) == oid
+
+
+def test_value_types_roundtrip():
+    varbinds = [
+        ("1.3.6.1.2.1.1.5.0", TAG_OCTET_STRING, b"sw1"),
+        ("1.3.6.1.2.1.1.2.0", TAG_OID, "1.3.6.1.4.1.9.1.1208"),
+        ("1.3.6.1.2.1.4.20.1.1.10.0.0.1", TAG_IP_ADDRESS, "10.0.0.1"),
+        ("1.3.6.1.2.1.1.9.0", TAG_NO_SUCH_INSTANCE, None),
+        ("1.3.6.1.2.1.1.4.0", TAG_NULL, None),
+    ]
+    assert roundtrip(varbinds)["varbinds"] == varbinds
+
+
+@pytest.mark.parametrize("length", [0, 1, 127, 128, 255, 256, 65535, 70000])
+def test_length_forms(length):
+    encoded = encode_tlv(TAG_OCTET_STRING, b"x" * length)
+    tag, start, end = decode_tlv(encoded)
+    assert (tag, end - start, end) == (TAG_OCTET_STRING, length, len(encoded))
+    assert len(encode_length(length)) == (1 if length < 0x80 else 1 + (length.bit_length() + 7) // 8)
+
+
+def test_getbulk_header_fields():
+    data = encode_request(1, b"public", PDU_GETBULK, 99, ["1.3.6.1.2.1.2.2.1.2"], non_repeaters=0, max_repetitions=25)
+    message = decode_message(data)
+    assert message["pdu_type"] == PDU_GETBULK
+    assert (message["request_id"], message["error_status"], message["error_index"]) == (99, 0, 25)
+    assert message["varbinds"] == [("1.3.6.1.2.1.2.2.1.2", TAG_NULL, None)]
+
+
+def test_v1_trap_fields():
+    pdu = encode_tlv(PDU_TRAP_V1,
+                     encode_oid("1.3.6.1.4.1.9")
+                     + encode_tlv(TAG_IP_ADDRESS, bytes((192, 168, 1, 2)))
+                     + encode_integer(2) + encode_integer(0) + encode_integer(12345, TAG_TIMETICKS)
+                     + encode_tlv(TAG_SEQUENCE, encode_tlv(
+                         TAG_SEQUENCE, encode_oid("1.3.6.1.2.1.2.2.1.1.3") + encode_integer(3))))
+    data = encode_tlv(TAG_SEQUENCE, encode_integer(0) + encode_tlv(TAG_OCTET_STRING, b"public") + pdu)
+    message = decode_message(data)
+    assert message["agent_addr"] == "192.168.1.2"
+    assert (message["generic_trap"], message["timestamp"]) == (2, 12345)
+    assert message["varbinds"] == [("1.3.6.1.2.1.2.2.1.1.3", TAG_INTEGER, 3)]
+
+
+@pytest.mark.parametrize("cut", [1, 5, 10, 20])
+def test_truncated_message_raises(cut):
+    data = encode_message(1, b"public", PDU_GET, 1, [("1.3.6.1.2.1.1.1.0", TAG_NULL, None)])
+    with pytest.raises(BerError):
+        decode_message(data[:-cut])
+
+
+def test_invalid_length_form_raises():
+    with pytest.raises(BerError):
+        decode_tlv(bytes((TAG_OCTET_STRING, 0x80)))
+    with pytest.raises(BerError):
+        decode_tlv(bytes((TAG_OCTET_STRING, 0x85, 1, 1, 1, 1, 1)))
+
+
+def test_not_a_sequence_raises():
+    with pytest.raises(BerError):
+        decode_message(encode_integer(1))
+
+
+def test_pretty_value():
+    assert pretty_value(TAG_OCTET_STRING, b"Gi0/1") == "Gi0/1"
+    assert pretty_value(TAG_OCTET_STRING, bytes.fromhex("001122334455")) == "0x001122334455"
+    assert pretty_value(TAG_COUNTER64, 2 ** 64 - 1) == str(2 ** 64 - 1)
+    assert pretty_value(TAG_NO_SUCH_INSTANCE, None) is None
+
+
+def test_pretty_value_hex_strings_keeps_printable_mac():
+    # c3:a4 ist gültiges UTF-8 ("ä"): ohne hex_strings wird die MAC zu Text
+    mac = bytes.fromhex("c3a441424344")
+    assert pretty_value(TAG_OCTET_STRING, mac) == "äABCD"
+    assert pretty_value(TAG_OCTET_STRING, mac, hex_strings=True) == "0xc3a441424344"
+    assert pretty_value(TAG_INTEGER, 3, hex_strings=True) == "3"
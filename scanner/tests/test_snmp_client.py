@@ -0,0 +1,108 @@
+"""SnmpClient gegen einen lokalen Fake-Agenten (conftest.FakeAgent)"""
+
+import socket
+
+import pytest
+
+from snmp_ber import PDU_GETBULK, PDU_GETNEXT, TAG_COUNTER64, TAG_INTEGER, TAG_OCTET_STRING
+from snmp_client import SnmpClient
+
+IF_DESCR = "1.3.6.1.2.1.2.2.1.2"
+IF_HC_IN = "1.3.6.1.2.1.31.1.1.1.6"
+PHYS_ADDRESS = "1.3.6.1.2.1.4.22.1.2"
+
+
+def interface_mib(count: int):
+    mib = {"1.3.6.1.2.1.1.5.0": (TAG_OCTET_STRING, b"sw1")}
+    for index in range(1, count + 1):
+        mib[f"{IF_DESCR}.{index}"] = (TAG_OCTET_STRING, f"port{index}".encode())
+        mib[f"{IF_HC_IN}.{index}"] = (TAG_COUNTER64, 2 ** 63 + index)
+    return mib
+
+
+@pytest.fixture
+def client():
+    snmp = SnmpClient(timeout=0.3, retries=0, max_repetitions=10)
+    snmp.start()
+    yield snmp
+    snmp.close()
+
+
+def test_get(client, fake_agent):
+    agent = fake_agent(interface_mib(2))
+    client.port = agent.port
+    result = client.get("127.0.0.1", ["1.3.6.1.2.1.1.5.0", f"{IF_HC_IN}.2", "1.3.6.1.2.1.1.99.0"]).result(2)
+    assert result == {"1.3.6.1.2.1.1.5.0": "sw1", f"{IF_HC_IN}.2": str(2 ** 63 + 2), "1.3.6.1.2.1.1.99.0": None}
+
+
+def test_walk_spans_several_getbulk_blocks(client, fake_agent):
+    agent = fake_agent(interface_mib(35))
+    client.port = agent.port
+    result = client.walk("127.0.0.1", IF_DESCR).result(2)
+    assert result == {str(index): f"port{index}" for index in range(1, 36)}
+    assert not result.timed_out and result.error is None
+    bulks = [request for request in agent.requests if request["pdu_type"] == PDU_GETBULK]
+    assert len(bulks) == 4
+    assert [request["varbinds"][0][0] for request in bulks[:2]] == [IF_DESCR, f"{IF_DESCR}.10"]
+
+
+def test_walk_v1_uses_getnext(client, fake_agent):
+    agent = fake_agent(interface_mib(3))
+    client.port = agent.port
+    result = client.walk("127.0.0.1", IF_HC_IN, version=1).result(2)
+    assert result == {str(index): str(2 ** 63 + index) for index in range(1, 4)}
+    assert {request["pdu_type"] for request in agent.requests} == {PDU_GETNEXT}
+
+
+def test_walk_empty_subtree(client, fake_agent):
+    agent = fake_agent(interface_mib(2))
+    client.port = agent.port
+    result = client.walk("127.0.0.1", "1.3.6.1.4.1.9").result(2)
+    assert result == {} and result.error is None
+
+
+def test_walk_stops_on_non_increasing_oid(client, fake_agent):
+    agent = fake_agent(interface_mib(5))
+    client.port = agent.port
+    # Defekter Agent: hinter .3 kommt wieder .2
+    agent.next_oid = lambda oid: f"{IF_DESCR}.2" if oid == f"{IF_DESCR}.3" else agent._next(oid)
+    result = client.walk("127.0.0.1", IF_DESCR, max_repetitions=1).result(2)
+    assert result.error == "oid_not_increasing"
+    assert result == {"1": "port1", "2": "port2", "3": "port3"}
+    assert len(agent.requests) < 10
+
+
+def test_walk_hex_strings(client, fake_agent):
+    mac = bytes.fromhex("c3a441424344")
+    agent = fake_agent({f"{PHYS_ADDRESS}.3.192.168.1.10": (TAG_OCTET_STRING, mac),
+                        "1.3.6.1.2.1.4.22.1.4.3.192.168.1.10": (TAG_INTEGER, 3)})
+    client.port = agent.port
+    assert client.walk("127.0.0.1", PHYS_ADDRESS).result(2) == {"3.192.168.1.10": "äABCD"}
+    result = client.walk("127.0.0.1", PHYS_ADDRESS, hex_strings=True).result(2)
+    assert result == {"3.192.168.1.10": "0xc3a441424344"}
+
+
+def test_timeout(client):
+    silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    silent.bind(("127.0.0.1", 0))
+    client.port = silent.getsockname()[1]
+    try:
+        assert client.get("127.0.0.1", ["1.3.6.1.2.1.1.5.0"]).result(2) is None
+        result = client.walk("127.0.0.1", IF_DESCR).result(2)
+        assert result == {} and result.timed_out
+    finally:
+        silent.close()
+
+
+def test_per_request_timeout():
+    snmp = SnmpClient(timeout=5, retries=0)
+    silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    silent.bind(("127.0.0.1", 0))
+    snmp.port = silent.getsockname()[1]
+    try:
+        # Client-Timeout 5 s, die Anfrage selbst verlangt 0.2 s
+        assert snmp.get("127.0.0.1", ["1.3.6.1.2.1.1.5.0"], timeout=0.2).result(1.5) is None
+        assert snmp.walk("127.0.0.1", IF_DESCR, timeout=0.2).result(1.5).timed_out
+    finally:
+        snmp.close()
+        silent.close()
@@ -0,0 +1,43 @@
+"""Gelernte SNMP-Profile (snmp_profile.py)"""
+
+import time
+
+from snmp_profile import MIN_MAX_REPETITIONS, SnmpProfile, SnmpProfileStore
+
+
+def test_max_repetitions_aimd():
+    profile = SnmpProfile(2, 40)
+    assert profile.walk_timed_out() and profile.max_repetitions == 20
+    assert profile.walk_timed_out() and profile.walk_timed_out() and profile.max_repetitions == MIN_MAX_REPETITIONS
+    assert not profile.walk_timed_out()
+
+    steps = []
+    while profile.walk_succeeded(40):
+        steps.append(profile.max_repetitions)
+    assert steps == [10, 15, 20, 25, 30, 35, 40]
+    assert not profile.walk_succeeded(40) and profile.max_repetitions == 40
+
+
+def test_growth_is_capped_by_the_configured_limit():
+    profile = SnmpProfile(2, 20)
+    assert profile.walk_succeeded(22) and profile.max_repetitions == 22
+    # Limit gesenkt: kein Wachstum, aber auch kein Sprung nach unten
+    assert not profile.walk_succeeded(10) and profile.max_repetitions == 22
+
+
+def test_round_trip():
+    profile = SnmpProfile(1, 15)
+    profile.counters = "hc"
+    profile.interfaces = {"1": "Gi0/1"}
+    restored = SnmpProfile.from_dict(profile.to_dict())
+    assert restored.to_dict() == profile.to_dict()
+
+
+def test_version_survives_expiry():
+    store = SnmpProfileStore({"snmp_profiles": {"refresh_interval": 10}})
+    profile = SnmpProfile(1, 25)
+    profile.learned_at = time.time() - 60
+    store.put("10.0.0.1", profile)
+    assert store.version("10.0.0.1", 2) == 1
+    assert store.get("10.0.0.1") is None
+    assert store.version("10.0.0.1", 2) == 2
@@ -0,0 +1,69 @@
+"""SNMP-Anfragen des Scanners: Version pro Host, Timeout pro Site, v1-Einzelabfragen"""
+
+from concurrent.futures import Future
+
+from network_scanner import NetworkScanner
+from snmp_profile import SnmpProfile
+
+SYS_DESCR = "1.3.6.1.2.1.1.1.0"
+SYS_NAME = "1.3.6.1.2.1.1.5.0"
+UNKNOWN = "1.3.6.1.4.1.99999.1.0"
+
+
+def done(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class RecordingClient:
+    """Steht für einen (mit anderen Sites geteilten) SnmpClient: v1-PDUs mit unbekannter OID scheitern"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get(self, ip, oids, version=None, community=None, timeout=None):
+        self.calls.append(("get", tuple(oids), version, community, timeout))
+        if version == 1 and UNKNOWN in oids:
+            return done({} if len(oids) > 1 else {UNKNOWN: None})
+        return done({oid: "value" for oid in oids})
+
+    def walk(self, ip, oid, max_repetitions=None, version=None, community=None, hex_strings=False, timeout=None):
+        self.calls.append(("walk", (oid,), version, community, timeout))
+        return done({"1": "value"})
+
+
+def scanner_with(client, **config):
+    scanner = NetworkScanner({"snmp_community": "halleA", "timeout": 0.7, **config})
+    scanner._snmp_client = client
+    return scanner
+
+
+def test_version_and_timeout_per_request():
+    client = RecordingClient()
+    scanner = scanner_with(client)
+    scanner.snmp_profiles.put("10.0.0.1", SnmpProfile(1, 10))
+    scanner.snmp_walk("10.0.0.1", "1.3.6.1.2.1.2.2.1.2")
+    scanner.snmp_get("10.0.0.2", SYS_NAME)
+    assert client.calls == [
+        ("walk", ("1.3.6.1.2.1.2.2.1.2",), 1, "halleA", 0.7),
+        ("get", (SYS_NAME,), 2, "halleA", 0.7),
+    ]
+
+
+def test_v1_unknown_oid_is_asked_one_by_one():
+    client = RecordingClient()
+    scanner = scanner_with(client)
+    assert scanner.snmp_get_many("10.0.0.1", [SYS_DESCR, UNKNOWN, SYS_NAME], 1) == {
+        SYS_DESCR: "value", SYS_NAME: "value"}
+    assert [oids for _, oids, _, _, _ in client.calls] == [
+        (SYS_DESCR, UNKNOWN, SYS_NAME), (SYS_DESCR,), (UNKNOWN,), (SYS_NAME,)]
+
+
+def test_v1_fallback_stops_on_timeout():
+    client = RecordingClient()
+    scanner = scanner_with(client)
+    client.get = lambda ip, oids, version=None, community=None, timeout=None: (
+        client.calls.append(oids) or done({} if len(oids) > 1 else None))
+    assert scanner._snmp_get_each("10.0.0.1", [SYS_DESCR, SYS_NAME], 1) is None
+    assert client.calls == [[SYS_DESCR]]
@@ -0,0 +1,107 @@
+"""Nicht-blockierende TCP-Connect-Probes (tcp_probe.py) gegen lokale Sockets"""
+
+import socket
+import time
+
+import pytest
+
+from tcp_probe import TcpProber
+
+# TCP zu Multicast-Adressen lehnt der Kernel sofort ab: zählt als "keine Antwort"
+SILENT_IP = "224.0.0.1"
+# TEST-NET-1 (RFC 5737): Connects bleiben hängen, sofern nichts dazwischen antwortet
+BLACKHOLE_IP = "192.0.2.1"
+
+
+@pytest.fixture
+def listener():
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(("127.0.0.1", 0))
+    server.listen(16)
+    yield server.getsockname()[1]
+    server.close()
+
+
+@pytest.fixture
+def closed_port():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def prober(ports, **options):
+    return TcpProber({"tcp_probe": {"enabled": True, "timeout": 0.3, "ports": {"default": ports}, **options}})
+
+
+def record_probes(tcp):
+    """Protokolliert die Ziele jedes probe()-Aufrufs"""
+    calls = []
+    original = tcp.probe
+
+    def probe(targets, **kwargs):
+        calls.append(list(targets))
+        return original(calls[-1], **kwargs)
+
+    tcp.probe = probe
+    return calls
+
+
+def test_open_and_refused_ports_count_as_alive(listener, closed_port):
+    results = prober([listener]).probe([("127.0.0.1", listener), ("127.0.0.1", closed_port)])
+    assert set(results) == {("127.0.0.1", listener), ("127.0.0.1", closed_port)}
+    assert all(rtt is not None and rtt >= 0 for rtt in results.values())
+
+
+def test_discover_negative_caches_silent_hosts(listener):
+    tcp = prober([listener])
+    assert tcp.discover(["127.0.0.1", SILENT_IP]) == ["127.0.0.1"]
+    assert SILENT_IP in tcp.silent and "127.0.0.1" not in tcp.silent
+
+    calls = record_probes(tcp)
+    tcp.discover(["127.0.0.1", SILENT_IP])
+    assert {ip for ip, _ in calls[0]} == {"127.0.0.1"}
+
+
+def test_passed_deadline_issues_no_connects(listener):
+    tcp = prober([listener])
+    assert tcp.probe([("127.0.0.1", listener)], deadline=time.monotonic() - 1) == {}
+    # Nicht geprüfte Adressen gelten nicht als stumm
+    assert tcp.discover(["127.0.0.1", SILENT_IP], deadline=time.monotonic() - 1) == []
+    assert tcp.silent == {}
+
+
+def test_deadline_bounds_waiting():
+    tcp = prober([9], timeout=30)
+    started = time.monotonic()
+    tcp.probe([(BLACKHOLE_IP, 9)], deadline=started + 0.2)
+    assert time.monotonic() - started < 2
+
+
+def test_max_concurrency_limits_open_sockets(listener):
+    tcp = prober([listener], max_concurrency=2)
+    # Nur 127.0.0.1 lauscht, die übrigen Loopback-Adressen antworten mit RST
+    targets = [(f"127.0.0.{index}", listener) for index in range(1, 11)]
+    results = tcp.probe(targets)
+    assert sorted(results) == sorted(targets) and all(rtt is not None for rtt in results.values())
+
+
+def test_batched_latency(listener, closed_port):
+    tcp = prober([closed_port, listener])
+    calls = record_probes(tcp)
+
+    alive, single, silent = tcp.measure_latency_many([("127.0.0.1", 3, None), ("127.0.0.1", 1, None),
+                                                      (SILENT_IP, 3, None)])
+    assert alive["loss"] == 0 and 0 <= alive["min"] <= alive["avg"] <= alive["max"]
+    assert single["loss"] == 0
+    assert silent == {"avg": 0, "min": 0, "max": 0, "loss": 100}
+    # Eine Runde über alle Ports, danach pro Runde ein Probe über alle Hosts mit bestem Port
+    assert len(calls) == 3
+    assert {ip for ip, _ in calls[0]} == {"127.0.0.1", SILENT_IP}
+    assert [len(targets) for targets in calls[1:]] == [1, 1]
+
+
+def test_measure_latency_wrapper(listener):
+    latency = prober([listener]).measure_latency("127.0.0.1", count=2)
+    assert latency["loss"] == 0 and latency["avg"] >= 0
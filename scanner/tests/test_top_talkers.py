@@ -0,0 +1,69 @@
+"""Raten und Top-K pro Host aus ntopng-Snapshots (top_talkers.py)"""
+
+from network_scanner import NtopngClient
+from top_talkers import HostRateTracker
+
+
+def host(ip, sent, rcvd=0):
+    return {"ip": ip, "name": ip, "bytes_sent": sent, "bytes_rcvd": rcvd}
+
+
+def test_rates_and_top():
+    tracker = HostRateTracker({"top_talkers": {"count": 1}})
+    tracker.update([host("10.0.0.1", 0, 0), host("10.0.0.2", 0, 0)], 100.0)
+    tracker.update([host("10.0.0.1", 1_000_000, 0), host("10.0.0.2", 2_000_000, 500_000)], 110.0)
+    top = tracker.top(110.0)
+    assert top["senders"] == [{"ip": "10.0.0.2", "name": "10.0.0.2", "mbps": 1.6}]
+    assert top["receivers"] == [{"ip": "10.0.0.2", "name": "10.0.0.2", "mbps": 0.4}]
+
+
+def test_counter_reset_is_not_negative():
+    tracker = HostRateTracker({})
+    tracker.update([host("10.0.0.1", 5_000_000)], 100.0)
+    tracker.update([host("10.0.0.1", 1_000)], 110.0)
+    assert tracker.top(110.0)["senders"] == []
+
+
+def test_missing_hosts_drop_to_zero():
+    tracker = HostRateTracker({})
+    tracker.update([host("10.0.0.1", 0), host("10.0.0.2", 0)], 100.0)
+    tracker.update([host("10.0.0.1", 1_000_000), host("10.0.0.2", 1_000_000)], 110.0)
+    tracker.update([host("10.0.0.1", 2_000_000)], 120.0)
+    assert [t["ip"] for t in tracker.top(120.0)["senders"]] == ["10.0.0.1"]
+    assert tracker.active == [tracker.index["10.0.0.1"]]
+
+
+def test_idle_rows_are_evicted_and_reused():
+    tracker = HostRateTracker({"top_talkers": {"evict_cycles": 2}})
+    tracker.update([host("10.0.0.1", 0), host("10.0.0.2", 0)], 100.0)
+    tracker.update([host("10.0.0.1", 0)], 110.0)
+    assert "10.0.0.2" in tracker.index
+    tracker.update([host("10.0.0.1", 0)], 120.0)
+    assert "10.0.0.2" not in tracker.index and len(tracker.ips) == 2
+
+    # Neuer Host übernimmt die freie Zeile ohne alte Zählerstände
+    tracker.update([host("10.0.0.1", 0), host("10.0.0.3", 9_000_000)], 130.0)
+    assert len(tracker.ips) == 2 and tracker.index["10.0.0.3"] == 1
+    tracker.update([host("10.0.0.1", 0), host("10.0.0.3", 10_000_000)], 140.0)
+    assert tracker.top(140.0)["senders"] == [{"ip": "10.0.0.3", "name": "10.0.0.3", "mbps": 0.8}]
+
+
+def test_returning_host_is_not_evicted():
+    tracker = HostRateTracker({"top_talkers": {"evict_cycles": 2}})
+    tracker.update([host("10.0.0.1", 0), host("10.0.0.2", 0)], 100.0)
+    tracker.update([host("10.0.0.1", 0)], 110.0)
+    tracker.update([host("10.0.0.1", 0), host("10.0.0.2", 0)], 120.0)
+    tracker.update([host("10.0.0.1", 0), host("10.0.0.2", 0)], 130.0)
+    assert "10.0.0.2" in tracker.index
+
+
+def test_hosts_on_several_interfaces_take_the_largest_counter():
+    client = NtopngClient({"ntopng": {"enabled": True, "instances": [
+        {"name": "a", "url": "http://a", "interfaces": [{"id": 1, "role": "wan"}, {"id": 2, "role": "lan"}]},
+    ]}})
+    entries = {1: [host("10.0.0.1", 500, 9_000), host("10.0.0.2", 1)],
+               2: [host("10.0.0.1", 7_000, 100), {"ip": "10.0.0.3", "bytes": {"sent": 3, "recvd": 4}}]}
+    client._get_pages = lambda instance, path, ifid, deadline=None: entries[ifid]
+    hosts = {h["ip"]: h for h in client.read_hosts()}
+    assert (hosts["10.0.0.1"]["bytes_sent"], hosts["10.0.0.1"]["bytes_rcvd"]) == (7_000, 9_000)
+    assert set(hosts) == {"10.0.0.1", "10.0.0.2", "10.0.0.3"}
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Top Talker - Aktuelle Sende-/Empfangsraten pro Host aus ntopng-Snapshots.
+ntopng liefert kumulative Byte-Zähler; hier werden die Deltas zwischen zwei
+fetch_hosts-Abrufen zu bps. Zähler liegen spaltenweise in array('d') über
+einen Host-Index, die Top-K werden mit einem begrenzten Heap bestimmt.
+Zeilen von Hosts, die evict_cycles Abrufe lang fehlen, kommen auf eine Free-List.
+"""
+
+import time
+import heapq
+import logging
+from array import array
+from collections import deque
+from typing import Dict, List, Optional, Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def host_bytes(host: Dict[str, Any]) -> Tuple[float, float]:
+    """(gesendet, empfangen) aus einem ntopng-Host (flache oder verschachtelte Felder)"""
+    nested = host.get("bytes") if isinstance(host.get("bytes"), dict) else {}
+    sent = host.get("bytes_sent", nested.get("sent", 0)) or 0
+    rcvd = host.get("bytes_rcvd", nested.get("recvd", nested.get("rcvd", 0))) or 0
+    return float(sent), float(rcvd)
+
+
+class HostRateTracker:
+    """Raten pro Host über aufeinanderfolgende Snapshots"""
+
+    def __init__(self, config: Dict[str, Any]):
+        talker_config = config.get("top_talkers", {})
+        self.enabled = talker_config.get("enabled", True)
+        self.count = talker_config.get("count", 10)
+        # Hosts ohne Update seit so vielen Sekunden zählen nicht mehr
+        self.stale_after = talker_config.get("stale_after", 120)
+        # Zeilen von Hosts, die so viele Abrufe lang fehlen, werden freigegeben
+        self.evict_cycles = talker_config.get("evict_cycles", 30)
+
+        self.index: Dict[str, int] = {}
+        self.ips: List[str] = []
+        self.names: List[str] = []
+        self.last_sent = array("d")
+        self.last_rcvd = array("d")
+        self.last_time = array("d")
+        self.sent_bps = array("d")
+        self.rcvd_bps = array("d")
+        # Letzter Abruf (Zähler), in dem der Host enthalten war
+        self.seen = array("q")
+        self.cycle = 0
+        # Zeilen des letzten Abrufs; nur sie können noch eine Rate > 0 haben
+        self.active: List[int] = []
+        # (letzter Abruf, Zeile) für Hosts, die aus dem Abruf gefallen sind, ältester zuerst
+        self._dropped: deque = deque()
+        self._free: List[int] = []
+
+    def _row(self, ip: str, name: str) -> int:
+        row = self.index.get(ip)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+                self.ips[row] = ip
+                self.names[row] = name
+            else:
+                row = len(self.ips)
+                self.ips.append(ip)
+                self.names.append(name)
+                for column in (self.last_sent, self.last_rcvd, self.last_time, self.sent_bps, self.rcvd_bps):
+                    column.append(0.0)
+                self.seen.append(0)
+            self.index[ip] = row
+        elif name:
+            self.names[row] = name
+        return row
+
+    def _evict(self, row: int):
+        """Gibt eine Zeile frei (Zähler zurück auf 0, Rate ist bereits 0)"""
+        del self.index[self.ips[row]]
+        self.ips[row] = ""
+        self.names[row] = ""
+        self.last_sent[row] = 0.0
+        self.last_rcvd[row] = 0.0
+        self.last_time[row] = 0.0
+        self._free.append(row)
+
+    def update(self, hosts: List[Dict[str, Any]], now: Optional[float] = None):
+        """Übernimmt einen fetch_hosts-Snapshot und berechnet die Raten seit dem letzten"""
+        if not self.enabled or not hosts:
+            return
+        now = time.time() if now is None else now
+        self.cycle += 1
+        cycle = self.cycle
+
+        active = []
+        for host in hosts:
+            ip = host.get("ip", host.get("host", ""))
+            if not ip:
+                continue
+            sent, rcvd = host_bytes(host)
+            row = self._row(ip, host.get("name", host.get("symbolic_name", "")) or ip)
+            if self.seen[row] == cycle:
+                continue
+            self.seen[row] = cycle
+            active.append(row)
+
+            previous = self.last_time[row]
+            if previous > 0 and now > previous:
+                elapsed = now - previous
+                # Negative Deltas: Zähler zurückgesetzt (Host neu gesehen, ntopng-Neustart)
+                self.sent_bps[row] = max(0.0, (sent - self.last_sent[row]) * 8 / elapsed)
+                self.rcvd_bps[row] = max(0.0, (rcvd - self.last_rcvd[row]) * 8 / elapsed)
+            self.last_sent[row] = sent
+            self.last_rcvd[row] = rcvd
+            self.last_time[row] = now
+
+        # Hosts, die ntopng nicht mehr liefert (inaktiv, aus der Liste gefallen), senden nichts mehr.
+        # Nur die Zeilen des letzten Abrufs können noch eine Rate haben, der Rest ist schon 0.
+        for row in self.active:
+            if self.seen[row] != cycle:
+                self.sent_bps[row] = 0.0
+                self.rcvd_bps[row] = 0.0
+                self._dropped.append((cycle - 1, row))
+        self.active = active
+
+        # Seit evict_cycles Abrufen fehlende Hosts freigeben (zwischendurch wiedergesehene bleiben)
+        dropped = self._dropped
+        while dropped and dropped[0][0] <= cycle - self.evict_cycles:
+            last_seen, row = dropped.popleft()
+            if self.seen[row] == last_seen:
+                self._evict(row)
+
+    def _top(self, column: array, now: float) -> List[Dict[str, Any]]:
+        cutoff = now - self.stale_after
+        last_time = self.last_time
+        rows = (row for row in self.active if column[row] > 0 and last_time[row] >= cutoff)
+        return [
+            {"ip": self.ips[row], "name": self.names[row], "mbps": round(column[row] / 1_000_000, 3)}
+            for row in heapq.nlargest(self.count, rows, key=column.__getitem__)
+        ]
+
+    def top(self, now: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Top-K Sender (Upload) und Empfänger (Download)"""
+        now = time.time() if now is None else now
+        return {
+            "senders": self._top(self.sent_bps, now),
+            "receivers": self._top(self.rcvd_bps, now),
+        }
@@ -7,6 +7,7 @@ interface Alert {
   level: "critical" | "warning" | "info";
   msg: string;
   time: string;
+  state?: "raised" | "ongoing" | "cleared";
 }
 
 interface AlertsPanelProps {
@@ -35,6 +36,7 @@ const levelConfig = {
 };
 
 export function AlertsPanel({ alerts }: AlertsPanelProps) {
+  const activeCount = alerts.filter((alert) => alert.state !== "cleared").length;
   return (
     <div className="glass-card p-6 border-accent/20">
       <div className="flex items-center gap-2 mb-4">
@@ -42,9 +44,9 @@ export function AlertsPanel({ alerts }: AlertsPanelProps) {
         <h2 className="text-xl font-bold text-accent">
           🔔 Live Alerts & Events
         </h2>
-        {alerts.length > 0 && (
+        {activeCount > 0 && (
           <span className="ml-auto text-xs bg-accent/20 text-accent px-2 py-1 rounded-full animate-pulse">
-            {alerts.length} aktiv
+            {activeCount} aktiv
           </span>
         )}
       </div>
@@ -57,14 +59,16 @@ export function AlertsPanel({ alerts }: AlertsPanelProps) {
         ) : (
           alerts.map((alert) => {
             const config = levelConfig[alert.level];
-            const Icon = config.icon;
+            const cleared = alert.state === "cleared";
+            const Icon = cleared ? CheckCircle : config.icon;
             return (
               <div
                 key={alert.id}
                 className={cn(
                   "bg-muted/30 rounded-lg p-3 border-l-4 flex justify-between items-start",
                   config.border,
-                  config.bg
+                  config.bg,
+                  cleared && "opacity-60"
                 )}
               >
                 <div className="flex gap-3">
@@ -13,7 +13,7 @@ interface BandwidthData {
   time: string;
   upstream: number;
   downstream: number;
-  wifi: number;
+  wifi: number | null;
 }
 
 interface BandwidthChartProps {
@@ -5,7 +5,7 @@ interface BandwidthData {
   time: string;
   upstream: number;
   downstream: number;
-  wifi: number;
+  wifi: number | null;
 }
 
 interface DeviceCluster {
@@ -31,6 +31,7 @@ interface Alert {
   level: "critical" | "warning" | "info";
   msg: string;
   time: string;
+  state?: "raised" | "ongoing" | "cleared";
 }
 
 interface WifiStat {
@@ -43,7 +44,7 @@ interface ApiBandwidthItem {
   timestamp: string;
   upstream_gbps: number;
   downstream_gbps: number;
-  wifi_gbps: number;
+  wifi_gbps: number | null;
 }
 
 interface ApiGamingDevice {
@@ -126,7 +127,7 @@ export function useNetworkData() {
             time: new Date(item.timestamp).toLocaleTimeString("de-DE", { hour: "2-digit", minute: "2-digit" }),
             upstream: item.upstream_gbps,
             downstream: item.downstream_gbps,
-            wifi: item.wifi_gbps,
+            wifi: item.wifi_gbps ?? null,
           }));
           setBandwidth(formattedBandwidth);
           setUseRealApi(true);
@@ -255,7 +256,8 @@ export function useNetworkData() {
   // Calculate current metrics
   const currentUpstream = bandwidth[bandwidth.length - 1]?.upstream || 0;
   const upstreamPercent = (currentUpstream / 10) * 100;
-  const currentWifi = bandwidth[bandwidth.length - 1]?.wifi || 0;
+  // null: the scanner does not know the WiFi traffic (no WiFi interface, no access point bandwidth)
+  const currentWifi = bandwidth.length > 0 ? bandwidth[bandwidth.length - 1].wifi : 0;
   const totalGamingDevices = devices.reduce((acc, d) => acc + d.count, 0);
   const activeNetworkDevices = networkDevices.filter((d) => d.status === "active").length;
 
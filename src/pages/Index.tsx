@@ -47,7 +47,7 @@ const Index = () => {
           />
           <MetricCard
             title="WiFi"
-            value={`${metrics.currentWifi.toFixed(1)} Gbps`}
+            value={metrics.currentWifi === null ? "unbekannt" : `${metrics.currentWifi.toFixed(1)} Gbps`}
             icon={<Wifi className="w-6 h-6" />}
             variant="purple"
             subtitle="8 Access Points • 32 Geräte"
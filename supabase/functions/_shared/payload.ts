@@ -0,0 +1,43 @@
+import { decode as decodeMsgpack } from "npm:@msgpack/msgpack@2.8.0";
+import { decode as decodeCbor } from "npm:cbor-x@1.5.9";
+
+// Upload formats negotiated by the scanner (see scanner/payload_encoding.py)
+const DECODERS: Record<string, (bytes: Uint8Array) => unknown> = {
+  "application/json": (bytes) => JSON.parse(new TextDecoder().decode(bytes)),
+  "application/msgpack": (bytes) => decodeMsgpack(bytes),
+  "application/x-msgpack": (bytes) => decodeMsgpack(bytes),
+  "application/cbor": (bytes) => decodeCbor(bytes),
+};
+
+const COMPRESSIONS = new Set(["gzip", "deflate"]);
+
+export class UnsupportedPayloadError extends Error {}
+
+/** Reads a POST body: JSON, MessagePack or CBOR, optionally gzip/deflate compressed */
+// deno-lint-ignore no-explicit-any
+export async function readPayload(req: Request): Promise<any> {
+  const contentType = (req.headers.get("content-type") || "application/json").split(";")[0].trim().toLowerCase();
+  const encoding = (req.headers.get("content-encoding") || "identity").trim().toLowerCase();
+
+  const decode = DECODERS[contentType];
+  if (!decode) {
+    throw new UnsupportedPayloadError(`Unsupported content-type: ${contentType}`);
+  }
+  if (encoding !== "identity" && !COMPRESSIONS.has(encoding)) {
+    throw new UnsupportedPayloadError(`Unsupported content-encoding: ${encoding}`);
+  }
+  if (!req.body) {
+    return {};
+  }
+
+  const stream = encoding === "identity"
+    ? req.body
+    : req.body.pipeThrough(new DecompressionStream(encoding as CompressionFormat));
+  const bytes = new Uint8Array(await new Response(stream).arrayBuffer());
+  return bytes.length ? decode(bytes) : {};
+}
+
+/** HTTP status for request errors (415 makes the scanner fall back to plain JSON) */
+export function errorStatus(error: unknown): number {
+  return error instanceof UnsupportedPayloadError ? 415 : 500;
+}
@@ -1,6 +1,8 @@
+import { errorStatus, readPayload } from "../_shared/payload.ts";
+
 const corsHeaders = {
   "Access-Control-Allow-Origin": "*",
-  "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type",
+  "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type, content-encoding",
 };
 
 interface Alert {
@@ -10,12 +12,17 @@ interface Alert {
   msg: string;
   time: string;
   timestamp: string;
+  state?: "raised" | "ongoing" | "cleared";
+  since?: string;
 }
 
 // In-memory storage
 const alertsStore: Alert[] = [];
 const MAX_ALERTS = 50;
 
+// Von der Alert-Engine gemeldet und noch nicht aufgehoben
+const isActive = (alert: Alert) => alert.state === "raised" || alert.state === "ongoing";
+
 Deno.serve(async (req: Request) => {
   if (req.method === "OPTIONS") {
     return new Response(null, { headers: corsHeaders });
@@ -25,21 +32,23 @@ Deno.serve(async (req: Request) => {
     const url = new URL(req.url);
 
     if (req.method === "GET") {
-      // Return alerts from last hour by default
+      // Open alerts regardless of age, everything else from the last hour by default
       const hoursBack = parseInt(url.searchParams.get("hours") || "1");
       const cutoff = new Date(Date.now() - hoursBack * 3600000);
       
       const recentAlerts = alertsStore.filter(
-        (alert) => new Date(alert.timestamp) > cutoff
+        (alert) => isActive(alert) || new Date(alert.timestamp) > cutoff
       );
+      const pending = recentAlerts.filter((a) => a.state !== "cleared");
 
       return new Response(
         JSON.stringify({
           success: true,
-          data: recentAlerts.slice(-20),
+          // Open alerts last so the limit of 20 never drops them
+          data: [...recentAlerts.filter((a) => !isActive(a)), ...recentAlerts.filter(isActive)].slice(-20),
           count: recentAlerts.length,
-          critical: recentAlerts.filter((a) => a.level === "critical").length,
-          warning: recentAlerts.filter((a) => a.level === "warning").length,
+          critical: pending.filter((a) => a.level === "critical").length,
+          warning: pending.filter((a) => a.level === "warning").length,
         }),
         { headers: { ...corsHeaders, "Content-Type": "application/json" } }
       );
@@ -56,7 +65,7 @@ Deno.serve(async (req: Request) => {
         );
       }
 
-      const body = await req.json();
+      const body = await readPayload(req);
       const alerts = body.alerts || [body];
       
       const newAlerts: Alert[] = [];
@@ -69,15 +78,24 @@ Deno.serve(async (req: Request) => {
           msg: alert.msg || alert.message || "",
           time: alert.time || "Jetzt",
           timestamp: new Date().toISOString(),
+          state: alert.state,
+          since: alert.since,
         };
-        
+
+        // Zustandswechsel (ongoing/cleared) ersetzen den bestehenden Alert mit gleicher ID
+        const existing = alert.id ? alertsStore.findIndex((a) => a.id === alert.id) : -1;
+        if (existing > -1) {
+          alertsStore.splice(existing, 1);
+        }
+
         alertsStore.push(record);
         newAlerts.push(record);
       }
 
-      // Keep only last MAX_ALERTS
+      // Keep only last MAX_ALERTS, dropping cleared alerts before open ones
       while (alertsStore.length > MAX_ALERTS) {
-        alertsStore.shift();
+        const oldest = alertsStore.findIndex((a) => !isActive(a));
+        alertsStore.splice(oldest > -1 ? oldest : 0, 1);
       }
 
       console.log("✓ Alerts received:", { count: newAlerts.length });
@@ -122,7 +140,7 @@ Deno.serve(async (req: Request) => {
     const message = error instanceof Error ? error.message : "Unknown error";
     return new Response(
       JSON.stringify({ error: message }),
-      { status: 500, headers: { ...corsHeaders, "Content-Type": "application/json" } }
+      { status: errorStatus(error), headers: { ...corsHeaders, "Content-Type": "application/json" } }
     );
   }
 });
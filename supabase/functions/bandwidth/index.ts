@@ -1,6 +1,8 @@
+import { errorStatus, readPayload } from "../_shared/payload.ts";
+
 const corsHeaders = {
   "Access-Control-Allow-Origin": "*",
-  "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type",
+  "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type, content-encoding",
 };
 
 interface NtopngData {
@@ -20,16 +22,31 @@ interface NtopngData {
   tcp_lost?: number;
 }
 
+interface TopTalker {
+  ip: string;
+  name: string;
+  mbps: number;
+}
+
+interface TopTalkers {
+  senders: TopTalker[];
+  receivers: TopTalker[];
+}
+
 interface BandwidthData {
   id: string;
   timestamp: string;
   upstream_gbps: number;
   downstream_gbps: number;
-  wifi_gbps: number;
+  // null = unknown (no WiFi interface in ntopng and no access point bandwidth via SNMP)
+  wifi_gbps: number | null;
   upstream_percent: number;
   interfaces?: Record<string, unknown>;
   source?: string;
   ntopng?: NtopngData;
+  top_talkers?: TopTalkers | null;
+  // Scanner stages that missed their deadline this cycle (data partly from the previous cycle)
+  partial?: string[];
 }
 
 // In-memory storage (for production, use database)
@@ -78,18 +95,20 @@ Deno.serve(async (req: Request) => {
         );
       }
 
-      const body = await req.json();
+      const body = await readPayload(req);
       
       const record: BandwidthData = {
         id: crypto.randomUUID(),
         timestamp: new Date().toISOString(),
         upstream_gbps: body.upstream_gbps || body.upstream || 0,
         downstream_gbps: body.downstream_gbps || body.downstream || 0,
-        wifi_gbps: body.wifi_gbps || body.wifi || 0,
+        wifi_gbps: body.wifi_gbps ?? body.wifi ?? null,
         upstream_percent: body.upstream_percent || ((body.upstream_gbps || body.upstream || 0) / 10) * 100,
         interfaces: body.interfaces,
         source: body.source || "scanner",
         ntopng: body.ntopng,
+        top_talkers: body.top_talkers,
+        partial: body.partial || [],
       };
 
       bandwidthStore.push(record);
@@ -126,7 +145,7 @@ Deno.serve(async (req: Request) => {
     const message = error instanceof Error ? error.message : "Unknown error";
     return new Response(
       JSON.stringify({ error: message }),
-      { status: 500, headers: { ...corsHeaders, "Content-Type": "application/json" } }
+      { status: errorStatus(error), headers: { ...corsHeaders, "Content-Type": "application/json" } }
     );
   }
 });
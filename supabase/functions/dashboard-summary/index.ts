@@ -45,7 +45,7 @@ Deno.serve(async (req: Request) => {
       bandwidth: {
         upstream_gbps: latestBandwidth?.upstream_gbps || 0,
         downstream_gbps: latestBandwidth?.downstream_gbps || 0,
-        wifi_gbps: latestBandwidth?.wifi_gbps || 0,
+        wifi_gbps: latestBandwidth?.wifi_gbps ?? null,
         upstream_percent: upstreamPercent,
         status: upstreamPercent > 80 ? "high" : upstreamPercent > 50 ? "medium" : "normal",
       },
@@ -1,8 +1,23 @@
+import { errorStatus, readPayload } from "../_shared/payload.ts";
+
 const corsHeaders = {
   "Access-Control-Allow-Origin": "*",
-  "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type",
+  "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type, content-encoding",
 };
 
+// Per-client WiFi data from the access point's station table
+interface WifiStation {
+  ap: string;
+  mac: string;
+  rssi: number | null;
+  tx_rate_mbps: number | null;
+  rx_rate_mbps: number | null;
+  tx_bytes: number | null;
+  rx_bytes: number | null;
+  // Signal below weak_rssi_dbm or rate below min_rate_mbps
+  weak: boolean;
+}
+
 interface GamingDevice {
   name: string;
   count: number;
@@ -11,12 +26,17 @@ interface GamingDevice {
   status: "optimal" | "warning" | "critical";
   ip?: string;
   type?: string;
+  // Latency deviation from the device's baseline, in standard deviations
+  anomaly?: number;
+  wifi?: WifiStation;
 }
 
 interface GamingDevicesData {
   timestamp: string;
   devices: GamingDevice[];
   total_gaming_devices: number;
+  // Scanner stages that missed their deadline this cycle (data partly from the previous cycle)
+  partial?: string[];
 }
 
 // In-memory storage
@@ -64,12 +84,13 @@ Deno.serve(async (req: Request) => {
         );
       }
 
-      const body = await req.json();
+      const body = await readPayload(req);
       
       gamingDevicesData = {
         timestamp: new Date().toISOString(),
         devices: body.devices || [],
         total_gaming_devices: body.total_gaming_devices || body.devices?.length || 0,
+        partial: body.partial || [],
       };
 
       console.log("✓ Gaming devices data received:", {
@@ -95,7 +116,7 @@ Deno.serve(async (req: Request) => {
     const message = error instanceof Error ? error.message : "Unknown error";
     return new Response(
       JSON.stringify({ error: message }),
-      { status: 500, headers: { ...corsHeaders, "Content-Type": "application/json" } }
+      { status: errorStatus(error), headers: { ...corsHeaders, "Content-Type": "application/json" } }
     );
   }
 });
@@ -1,12 +1,27 @@
+import { errorStatus, readPayload } from "../_shared/payload.ts";
+
 const corsHeaders = {
   "Access-Control-Allow-Origin": "*",
-  "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type",
+  "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type, content-encoding",
 };
 
+// Per-client WiFi data from the access point's station table
+interface WifiStation {
+  ap: string;
+  mac: string;
+  rssi: number | null;
+  tx_rate_mbps: number | null;
+  rx_rate_mbps: number | null;
+  tx_bytes: number | null;
+  rx_bytes: number | null;
+  // Signal below weak_rssi_dbm or rate below min_rate_mbps
+  weak: boolean;
+}
+
 interface ScannedHost {
   ip: string;
   name: string;
-  type: "router" | "switch" | "access_point" | "server" | "storage" | "printer" | "unknown";
+  type: "router" | "switch" | "access_point" | "server" | "storage" | "printer" | "console" | "unknown";
   vendor: string;
   status: "online" | "offline" | "warning";
   lastSeen: string;
@@ -17,6 +32,7 @@ interface ScannedHost {
   source?: string;
   bytes_sent?: number;
   bytes_rcvd?: number;
+  wifi?: WifiStation;
 }
 
 interface NtopngHostStats {
@@ -35,6 +51,8 @@ interface HostsData {
   offline_count: number;
   warning_count: number;
   ntopng_stats?: NtopngHostStats;
+  // Scanner stages that missed their deadline this cycle (data partly from the previous cycle)
+  partial?: string[];
 }
 
 // In-memory storage
@@ -86,6 +104,7 @@ Deno.serve(async (req: Request) => {
             offline_count: hostsData?.offline_count || 0,
             warning_count: hostsData?.warning_count || 0,
             ntopng_stats: hostsData?.ntopng_stats || null,
+            partial: hostsData?.partial || [],
           },
           lastUpdate: hostsData?.timestamp || null,
         }),
@@ -104,7 +123,7 @@ Deno.serve(async (req: Request) => {
         );
       }
 
-      const body = await req.json();
+      const body = await readPayload(req);
 
       hostsData = {
         timestamp: new Date().toISOString(),
@@ -114,11 +133,15 @@ Deno.serve(async (req: Request) => {
         offline_count: body.offline_count || body.hosts?.filter((h: ScannedHost) => h.status === "offline").length || 0,
         warning_count: body.warning_count || body.hosts?.filter((h: ScannedHost) => h.status === "warning").length || 0,
         ntopng_stats: body.ntopng_stats || null,
+        partial: body.partial || [],
       };
 
       // Count sources
       const ntopngHosts = hostsData.hosts.filter(h => h.source?.includes("ntopng")).length;
       const snmpHosts = hostsData.hosts.filter(h => h.source?.includes("snmp")).length;
+      // Hosts without SNMP, named via reverse DNS, mDNS or NetBIOS
+      const resolvedHosts = hostsData.hosts.filter(h => ["dns", "mdns", "netbios"].includes(h.source ?? "")).length;
+      const weakWifiHosts = hostsData.hosts.filter(h => h.wifi?.weak).length;
 
       console.log("Hosts scan received:", {
         totalHosts: hostsData.total_hosts,
@@ -127,6 +150,8 @@ Deno.serve(async (req: Request) => {
         warning: hostsData.warning_count,
         fromNtopng: ntopngHosts,
         fromSnmp: snmpHosts,
+        fromNameResolution: resolvedHosts,
+        weakWifi: weakWifiHosts,
         ntopngFlows: hostsData.ntopng_stats?.num_flows,
       });
 
@@ -149,7 +174,7 @@ Deno.serve(async (req: Request) => {
     const message = error instanceof Error ? error.message : "Unknown error";
     return new Response(
       JSON.stringify({ error: message }),
-      { status: 500, headers: { ...corsHeaders, "Content-Type": "application/json" } }
+      { status: errorStatus(error), headers: { ...corsHeaders, "Content-Type": "application/json" } }
     );
   }
 });
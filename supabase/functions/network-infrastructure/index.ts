@@ -1,6 +1,8 @@
+import { errorStatus, readPayload } from "../_shared/payload.ts";
+
 const corsHeaders = {
   "Access-Control-Allow-Origin": "*",
-  "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type",
+  "Access-Control-Allow-Headers": "authorization, x-client-info, apikey, content-type, content-encoding",
 };
 
 interface NetworkDevice {
@@ -19,6 +21,8 @@ interface InfrastructureData {
   timestamp: string;
   devices: NetworkDevice[];
   total_devices: number;
+  // Scanner stages that missed their deadline this cycle (data partly from the previous cycle)
+  partial?: string[];
 }
 
 // In-memory storage
@@ -72,12 +76,13 @@ Deno.serve(async (req: Request) => {
         );
       }
 
-      const body = await req.json();
+      const body = await readPayload(req);
       
       infrastructureData = {
         timestamp: new Date().toISOString(),
         devices: body.devices || [],
         total_devices: body.total_devices || body.devices?.length || 0,
+        partial: body.partial || [],
       };
 
       const activeDevices = infrastructureData.devices.filter((d) => d.status === "active").length;
@@ -105,7 +110,7 @@ Deno.serve(async (req: Request) => {
     const message = error instanceof Error ? error.message : "Unknown error";
     return new Response(
       JSON.stringify({ error: message }),
-      { status: 500, headers: { ...corsHeaders, "Content-Type": "application/json" } }
+      { status: errorStatus(error), headers: { ...corsHeaders, "Content-Type": "application/json" } }
     );
   }
 });